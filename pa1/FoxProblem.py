@@ -38,6 +38,17 @@ class FoxProblem:
 
         return filter(lambda s: self.is_legal(s), possible_states)
 
+    # get predecessor states for the given state (used by bidirectional search)
+    def get_predecessors(self, state):
+        # Successors are always legal, so an illegal state (e.g. an unsolvable
+        # goal) can't be reached from anywhere
+        if not self.is_legal(state):
+            return []
+
+        # Every crossing can be undone by sending the same animals back,
+        # so the predecessors are exactly the successors
+        return self.get_successors(state)
+
     def is_goal(self, state):
         (c, f, b) = state
         (goal_c, goal_f, goal_b) = self.goal_state
@@ -0,0 +1,86 @@
+from array import array
+
+class PackedFoxProblem:
+    """Compact version of a chickens-and-foxes problem, where each (c,f,b) state
+    is packed into a single integer index in `range(num_states)`. Legality and
+    the successors of every state are computed once up front (using the wrapped
+    problem) and stored in flat arrays, so expanding a state is just a slice
+    of the successor table.
+
+    The successor table is stored in compressed sparse row form: the
+    successors of state `i` are `successor_indices[successor_offsets[i]:successor_offsets[i + 1]]`.
+    The predecessor table is stored the same way. Illegal states (where the
+    chickens have been eaten) are never expanded, so they have no successors,
+    and are never predecessors.
+
+    Passing `build_tables=False` skips the precomputation, which is useful 
+    when only `encode` and `decode` are needed.
+    """
+    def __init__(self, problem, build_tables=True):
+        self.problem = problem
+
+        self.total_chickens = problem.total_chickens
+        self.total_foxes = problem.total_foxes
+        self.total_boats = problem.total_boats
+
+        self.num_states = (self.total_chickens + 1) * (self.total_foxes + 1) * (self.total_boats + 1)
+
+        self.start_state = self.encode(problem.start_state)
+        self.goal_state = self.encode(problem.goal_state)
+
+        if build_tables:
+            self._build_tables()
+
+    def _build_tables(self):
+        self.legal = bytearray(self.num_states)
+        self.successor_offsets = array('i', [0])
+        self.successor_indices = array('i')
+
+        for index in range(self.num_states):
+            state = self.decode(index)
+            self.legal[index] = self.problem.is_legal(state)
+            if self.legal[index]:
+                self.successor_indices.extend(self.encode(s) for s in self.problem.get_successors(state))
+            self.successor_offsets.append(len(self.successor_indices))
+
+        # Invert the successor table to get the predecessor table. First
+        # count the predecessors of each state to find the row offsets...
+        self.predecessor_offsets = array('i', [0]) * (self.num_states + 1)
+        for successor in self.successor_indices:
+            self.predecessor_offsets[successor + 1] += 1
+        for index in range(self.num_states):
+            self.predecessor_offsets[index + 1] += self.predecessor_offsets[index]
+
+        # ...then fill each row in
+        self.predecessor_indices = array('i', [0]) * len(self.successor_indices)
+        next_slot = array('i', self.predecessor_offsets)
+        for index in range(self.num_states):
+            for successor in self.get_successors(index):
+                self.predecessor_indices[next_slot[successor]] = index
+                next_slot[successor] += 1
+
+    def encode(self, state):
+        """Pack a (c,f,b) tuple into its integer index"""
+        (c, f, b) = state
+        return (c * (self.total_foxes + 1) + f) * (self.total_boats + 1) + b
+
+    def decode(self, index):
+        """Unpack an integer index back into its (c,f,b) tuple"""
+        index, b = divmod(index, self.total_boats + 1)
+        c, f = divmod(index, self.total_foxes + 1)
+        return (c, f, b)
+
+    def get_successors(self, index):
+        return self.successor_indices[self.successor_offsets[index]:self.successor_offsets[index + 1]]
+
+    def get_predecessors(self, index):
+        return self.predecessor_indices[self.predecessor_offsets[index]:self.predecessor_offsets[index + 1]]
+
+    def is_goal(self, index):
+        return index == self.goal_state
+
+    def is_legal(self, index):
+        return self.legal[index] == 1
+
+    def __str__(self):
+        return str(self.problem)
@@ -0,0 +1,129 @@
+from array import array
+import struct
+
+from PackedFoxProblem import PackedFoxProblem
+from RiverCrossingProblem import RiverCrossingProblem
+from SearchSolution import SearchSolution
+
+# Binary file header: magic, then chickens, foxes, boats and boat capacity
+_HEADER_FORMAT = "<4s4i"
+_MAGIC = b"RCDT"
+
+class RiverCrossingDistanceTable:
+    """Distance-to-goal table for every state of a river crossing population.
+
+    All the states of a population (a number of chickens, foxes and boats
+    with a given boat capacity) share the goal state (0, 0, 0), so a single
+    breadth first search backwards from the goal finds the shortest path
+    from every state at once. Afterwards, any number of queries can be
+    answered by following the table, without doing any more searching.
+    """
+    def __init__(self, total_chickens, total_foxes, total_boats=1, boat_capacity=2, build=True):
+        self.problem = RiverCrossingProblem((total_chickens, total_foxes, total_boats), boat_capacity)
+        self.packed = PackedFoxProblem(self.problem, build_tables=build)
+
+        # distances[i] is the number of moves from state i to the goal and
+        # next_states[i] is the next state along that path (-1 if unreachable)
+        self.distances = array('i', [-1]) * self.packed.num_states
+        self.next_states = array('i', [-1]) * self.packed.num_states
+
+        if build:
+            self._build()
+
+    def _build(self):
+        goal = self.packed.goal_state
+
+        # An illegal goal (e.g. more foxes than chickens) can't be reached
+        if not self.packed.is_legal(goal):
+            return
+
+        self.distances[goal] = 0
+        layer = [goal]
+        distance = 0
+
+        while len(layer) > 0:
+            distance += 1
+            next_layer = []
+            for state in layer:
+                for predecessor in self.packed.get_predecessors(state):
+                    if self.distances[predecessor] != -1:
+                        continue
+
+                    self.distances[predecessor] = distance
+                    self.next_states[predecessor] = state
+                    next_layer.append(predecessor)
+            layer = next_layer
+
+    def _index(self, state):
+        """Table index of a (c,f,b) state, checking that it's in the table's population"""
+        (c, f, b) = state
+        if not (0 <= c <= self.problem.total_chickens and 0 <= f <= self.problem.total_foxes
+                and 0 <= b <= self.problem.total_boats):
+            raise ValueError(f"{state} is not a state of {self.problem}")
+        return self.packed.encode(state)
+
+    def distance(self, state):
+        """Number of moves from the state to the goal, or -1 if the goal can't be reached"""
+        return self.distances[self._index(state)]
+
+    def query(self, state):
+        """Find the shortest path from the state to the goal by following the table
+
+        Args:
+            state (Tuple[int]): (c,f,b) state to start from
+
+        Returns:
+            SearchSolution: The solution to the search. Like bfs_search, the path runs
+                from the goal back to the given state.
+        """
+        solution = SearchSolution(problem=f"{self.problem}, from {state}",
+                                  search_method="distance table")
+
+        index = self._index(state)
+        if self.distances[index] == -1:
+            return solution
+
+        while index != -1:
+            solution.path.append(self.packed.decode(index))
+            index = self.next_states[index]
+
+        solution.path.reverse()
+        solution.nodes_visited = len(solution.path)
+        return solution
+
+    def save(self, filename):
+        """Write the table to a binary file, so it can be reloaded with `load`"""
+        with open(filename, "wb") as f:
+            f.write(struct.pack(_HEADER_FORMAT, _MAGIC,
+                                self.problem.total_chickens, self.problem.total_foxes,
+                                self.problem.total_boats, self.problem.boat_capacity))
+            self.distances.tofile(f)
+            self.next_states.tofile(f)
+
+    @staticmethod
+    def load(filename):
+        """Read a table written by `save`
+
+        Args:
+            filename (str): File to load from
+
+        Returns:
+            RiverCrossingDistanceTable: The loaded table
+        """
+        with open(filename, "rb") as f:
+            header = f.read(struct.calcsize(_HEADER_FORMAT))
+            (magic, chickens, foxes, boats, capacity) = struct.unpack(_HEADER_FORMAT, header)
+            if magic != _MAGIC:
+                raise ValueError(f"{filename} is not a river crossing distance table")
+
+            table = RiverCrossingDistanceTable(chickens, foxes, boats, capacity, build=False)
+
+            table.distances = array('i')
+            table.distances.fromfile(f, table.packed.num_states)
+            table.next_states = array('i')
+            table.next_states.fromfile(f, table.packed.num_states)
+
+        return table
+
+    def __str__(self):
+        return f"Distance table for {self.problem}"
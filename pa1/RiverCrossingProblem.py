@@ -0,0 +1,109 @@
+class RiverCrossingProblem:
+    """Generalized version of the Chickens-and-Foxes scenario, where each boat
+    can carry up to `boat_capacity` animals and there may be several boats.
+    Like FoxProblem, the state is represented by the tuple (c,f,b), where c,f,
+    and b are the count of chickens, foxes, and boats on the initial (starting)
+    side of the river. Each move sends a single boat across the river (in
+    either direction) carrying between 1 and `boat_capacity` animals.
+    """
+    def __init__(self, start_state=(3, 3, 1), boat_capacity=2):
+        self.start_state = start_state
+        self.goal_state = (0, 0, 0)
+        self.boat_capacity = boat_capacity
+
+        (chickens, foxes, boats) = start_state
+
+        self.total_foxes = foxes
+        self.total_chickens = chickens
+        self.total_boats = boats
+
+        assert boats >= 1
+        assert boat_capacity >= 1
+
+        # Every (chickens, foxes) load a boat could carry. This is
+        # the same for every state, so it is only built once.
+        self.boat_loads = tuple(
+            (dc, df)
+            for dc in range(boat_capacity + 1)
+            for df in range(boat_capacity + 1 - dc)
+            if dc + df > 0
+        )
+
+    # get successor states for the given state
+    def get_successors(self, state):
+        (c, f, b) = state
+
+        successors = []
+
+        # Send a boat from the starting side to the far side
+        if b > 0:
+            for (dc, df) in self.boat_loads:
+                successor = (c - dc, f - df, b - 1)
+                if self.is_legal(successor):
+                    successors.append(successor)
+
+        # Bring a boat back from the far side
+        if b < self.total_boats:
+            for (dc, df) in self.boat_loads:
+                successor = (c + dc, f + df, b + 1)
+                if self.is_legal(successor):
+                    successors.append(successor)
+
+        return successors
+
+    # get predecessor states for the given state (used by bidirectional search)
+    def get_predecessors(self, state):
+        # Successors are always legal, so an illegal state can't be reached from anywhere
+        if not self.is_legal(state):
+            return []
+
+        # Every crossing can be undone by sending the same boat and load back
+        return self.get_successors(state)
+
+    def is_goal(self, state):
+        return state == self.goal_state
+
+    def is_legal(self, state):
+        (c, f, b) = state
+
+        if not (0 <= c <= self.total_chickens and
+                0 <= f <= self.total_foxes and
+                0 <= b <= self.total_boats):
+            return False
+
+        farside_f = self.total_foxes - f
+        farside_c = self.total_chickens - c
+
+        chickens_survived_near = c == 0 or c >= f
+        chickens_survived_far = farside_c == 0 or farside_c >= farside_f
+
+        return chickens_survived_near and chickens_survived_far
+
+    def mirror_state(self, state):
+        """Swap the two banks of the river. The problem is symmetric under this
+        mapping: a state is legal exactly when its mirror is, and the successors
+        of a mirrored state are the mirrors of the state's successors.
+
+        Args:
+            state (Tuple[int]): State to mirror
+
+        Returns:
+            Tuple[int]: The state with the starting and far sides swapped
+        """
+        (c, f, b) = state
+        return (self.total_chickens - c, self.total_foxes - f, self.total_boats - b)
+
+    def canonical_state(self, state):
+        """Pick a single representative out of a state and its mirror image, so
+        that searches can treat symmetric states as one.
+
+        Args:
+            state (Tuple[int]): State to canonicalize
+
+        Returns:
+            Tuple[int]: The smaller of the state and its mirror
+        """
+        return min(state, self.mirror_state(state))
+
+    def __str__(self):
+        return f"River crossing problem: {self.start_state}, boat capacity {self.boat_capacity}"
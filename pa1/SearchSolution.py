@@ -5,6 +5,13 @@ class SearchSolution:
         self.path = []
         self.nodes_visited = 0
 
+        # Only set when the search was given a SearchStats to record in
+        self.stats = None
+
+        # Only set when the search used a SuccessorCache
+        self.cache_hits = None
+        self.cache_misses = None
+
     def __str__(self):
         string = "----\n"
         string += "{:s}\n"
@@ -22,4 +29,7 @@ class SearchSolution:
             string += "no solution found after visiting {:d} nodes\n"
             string = string.format(self.problem_name, self.search_method, self.nodes_visited)
 
+        if self.cache_hits is not None:
+            string += "successor cache hits: {:d}, misses: {:d}\n".format(self.cache_hits, self.cache_misses)
+
         return string
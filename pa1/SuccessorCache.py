@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+class SuccessorCache:
+    """Wraps a search problem and remembers the successors of the states it
+    has expanded, so that searches which expand the same states over and over
+    (like iterative deepening) don't have to regenerate them. Everything other
+    than `get_successors` is passed through to the wrapped problem.
+
+    If `max_size` is given, the least recently used entries are evicted once
+    the cache grows past that many states.
+    """
+    def __init__(self, problem, max_size=None):
+        self.problem = problem
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_successors(self, state):
+        successors = self.cache.get(state)
+
+        if successors is not None:
+            self.hits += 1
+            if self.max_size is not None:
+                self.cache.move_to_end(state)
+            return successors
+
+        self.misses += 1
+
+        # Store a tuple, since get_successors may return a one-shot iterator
+        successors = tuple(self.problem.get_successors(state))
+        self.cache[state] = successors
+
+        if self.max_size is not None and len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+        return successors
+
+    def __getattr__(self, name):
+        # Only called for missing attributes. While copying or unpickling, that
+        # includes problem itself (and special methods), which can't be passed on
+        if name == "problem" or (name.startswith("__") and name.endswith("__")):
+            raise AttributeError(name)
+        return getattr(self.problem, name)
+
+    def __str__(self):
+        return str(self.problem)
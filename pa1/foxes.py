@@ -1,6 +1,7 @@
 
 from FoxProblem import FoxProblem
-from uninformed_search import bfs_search, dfs_search, ids_search
+from RiverCrossingProblem import RiverCrossingProblem
+from uninformed_search import bfs_search, dfs_search, ids_search, bidirectional_bfs_search
 
 # Create a few test problems:
 problem331 = FoxProblem((3, 3, 1))
@@ -28,4 +29,14 @@ print(ids_search(problem541))
 
 print(bfs_search(problem451))
 print(dfs_search(problem451))
-print(ids_search(problem451))
\ No newline at end of file
+print(ids_search(problem451))
+
+# Larger river crossings, with a bigger boat (and more boats)
+problem_big = RiverCrossingProblem((100, 100, 1), boat_capacity=4)
+problem_boats = RiverCrossingProblem((30, 30, 3), boat_capacity=4)
+
+print(bfs_search(problem_big))
+print(bidirectional_bfs_search(problem_big))
+
+print(bfs_search(problem_boats))
+print(bidirectional_bfs_search(problem_boats))
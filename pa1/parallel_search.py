@@ -0,0 +1,236 @@
+from multiprocessing import Pipe, Process
+from time import perf_counter
+import os
+import pickle
+import traceback
+
+from SearchSolution import SearchSolution
+
+# Messages the main process sends to the workers
+_EXPAND = "expand"
+_PARENT = "parent"
+_COUNT = "count"
+_STOP = "stop"
+
+# Prefix of the message a worker sends when it fails, followed by the pickled
+# exception. Pickles start with a protocol byte (b"\x80"), so it can't be
+# mistaken for a reply or a batch.
+_ERROR = b"error:"
+
+
+def _worker(connection, search_problem, worker_index, num_workers, num_shards):
+    """Worker process for parallel_bfs_search. The worker owns the visited states
+    of every shard `s` with `s % num_workers == worker_index` (mapping each state
+    to its parent), and the part of the frontier made of those states.
+
+    On each _EXPAND message, the worker expands its frontier and sends the main
+    process one pickled batch of successors (mapped to their parents) for every
+    worker, including an empty one for itself. The main process forwards each
+    batch to the worker that owns it, without unpickling it. Once the worker has
+    received the batches sent to it, it drops the successors it has already
+    visited. The rest become its next frontier, and it replies with how many there
+    are and a goal state among them (or None).
+
+    If anything raises, the worker sends the main process the exception (tagged
+    with _ERROR) and exits.
+    """
+    try:
+        _serve(connection, search_problem, worker_index, num_workers, num_shards)
+    except Exception as error:
+        try:
+            message = pickle.dumps(error, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            message = pickle.dumps(RuntimeError(traceback.format_exc()), pickle.HIGHEST_PROTOCOL)
+        try:
+            connection.send_bytes(_ERROR + message)
+        except (ConnectionError, EOFError):
+            pass
+
+
+def _serve(connection, search_problem, worker_index, num_workers, num_shards):
+    """Handle the main process's messages until it sends _STOP (see _worker)"""
+    visited = {}
+    frontier = []
+
+    start_state = search_problem.start_state
+    if hash(start_state) % num_shards % num_workers == worker_index:
+        visited[start_state] = None
+        frontier.append(start_state)
+
+    while True:
+        message = connection.recv()
+
+        if message == _STOP:
+            return
+        elif message == _COUNT:
+            connection.send(len(visited))
+        elif message != _EXPAND:
+            # A (_PARENT, state) request
+            connection.send(visited[message[1]])
+        else:
+            # Successors that are already visited are dropped here, and duplicates
+            # within the batches are dropped as they're built
+            batches = [{} for _ in range(num_workers)]
+            for state in frontier:
+                for successor in search_problem.get_successors(state):
+                    owner = hash(successor) % num_shards % num_workers
+                    if owner == worker_index and successor in visited:
+                        continue
+                    batches[owner].setdefault(successor, state)
+
+            own_batch = batches[worker_index]
+            batches[worker_index] = {}
+            for batch in batches:
+                connection.send_bytes(pickle.dumps(batch, pickle.HIGHEST_PROTOCOL))
+
+            frontier = []
+            goal = None
+            for batch in [own_batch] + [pickle.loads(connection.recv_bytes()) for _ in range(num_workers)]:
+                for (successor, parent) in batch.items():
+                    if successor in visited:
+                        continue
+                    visited[successor] = parent
+                    frontier.append(successor)
+                    if goal is None and search_problem.is_goal(successor):
+                        goal = successor
+
+            connection.send((len(frontier), goal))
+
+
+def _receive(connection, raw=False):
+    """Receive a message from a worker (left pickled if `raw`), raising the worker's
+    exception if it failed, or EOFError if it exited without saying why"""
+    message = connection.recv_bytes()
+    if message.startswith(_ERROR):
+        raise pickle.loads(message[len(_ERROR):])
+    return message if raw else pickle.loads(message)
+
+
+def parallel_bfs_search(search_problem, max_workers=None, num_shards=None):
+    """Perform a level-synchronous breadth first search, where every worker process
+    owns a share of the visited states, picked by hash. Each layer, workers expand
+    the frontier states they own and send each successor to the worker that owns
+    it, which checks it against its visited states and keeps it for the next layer
+    if it's new. The main process only passes the (still pickled) batches of
+    successors between workers, so both expanding states and dropping visited ones
+    happen in the workers.
+
+    Since states are hashed in the worker processes, the problem's states must hash
+    the same way in every process (true of tuples of ints, like the FoxProblem
+    states, but not of strings).
+
+    Every successor crosses between processes, which costs more than a serial search
+    saves for small problems, or when there are fewer cores than workers.
+
+    Args:
+        search_problem (FoxProblem): The search problem to find a solution to. It
+            must be picklable so it can be sent to the worker processes.
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        num_shards (int, optional): Number of visited shards, each owned by a single
+            worker. Defaults to the number of workers.
+
+    Returns:
+        SearchSolution: The solution to the search. Also has a `layer_times` list
+            with a (frontier size, seconds) tuple for each layer.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    num_shards = num_shards or max_workers
+
+    solution = SearchSolution(problem=search_problem,
+                              search_method=f"parallel_bfs_search ({max_workers} workers)")
+    solution.layer_times = []
+
+    start_state = search_problem.start_state
+    goal = start_state if search_problem.is_goal(start_state) else None
+
+    connections = []
+    workers = []
+    for worker_index in range(max_workers):
+        (connection, worker_connection) = Pipe()
+        worker = Process(target=_worker,
+                         args=(worker_connection, search_problem, worker_index, max_workers, num_shards),
+                         daemon=True)
+        worker.start()
+        # Only the worker holds its end, so the pipe closes if the worker exits
+        worker_connection.close()
+        connections.append(connection)
+        workers.append(worker)
+
+    try:
+        frontier_size = 1
+        while frontier_size > 0 and goal is None:
+            layer_start = perf_counter()
+
+            for connection in connections:
+                connection.send(_EXPAND)
+
+            # All the batches are collected before any are forwarded, so that no
+            # worker is sent to while it's still sending
+            batches = [[_receive(connection, raw=True) for _ in range(max_workers)] for connection in connections]
+            for (owner, connection) in enumerate(connections):
+                for sender_batches in batches:
+                    connection.send_bytes(sender_batches[owner])
+            del batches
+
+            layer_size = frontier_size
+            frontier_size = 0
+            for connection in connections:
+                (new_states, worker_goal) = _receive(connection)
+                frontier_size += new_states
+                if goal is None and worker_goal is not None:
+                    goal = worker_goal
+
+            solution.layer_times.append((layer_size, perf_counter() - layer_start))
+
+        for connection in connections:
+            connection.send(_COUNT)
+        solution.nodes_visited = sum(_receive(connection) for connection in connections)
+
+        # Reconstruct the path back to the start state (goal first, like bfs_search),
+        # asking each state's owner for its parent
+        state = goal
+        while state is not None:
+            solution.path.append(state)
+            connection = connections[hash(state) % num_shards % max_workers]
+            connection.send((_PARENT, state))
+            state = _receive(connection)
+
+    finally:
+        # Workers that have failed (or are stuck waiting on one that has) are
+        # terminated if they don't stop
+        for connection in connections:
+            try:
+                connection.send(_STOP)
+            except (ConnectionError, EOFError):
+                pass
+        for worker in workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        for connection in connections:
+            connection.close()
+
+    return solution
+
+
+# Compare timings for different numbers of workers with bfs_search
+if __name__ == "__main__":
+    from RiverCrossingProblem import RiverCrossingProblem
+    from uninformed_search import bfs_search
+
+    problem = RiverCrossingProblem((1000, 1000, 1), boat_capacity=40)
+
+    start = perf_counter()
+    result = bfs_search(problem)
+    print(f"bfs_search: {perf_counter() - start:.2f}s, solution length {len(result.path)}")
+
+    for workers in (1, 2, 4, 8):
+        start = perf_counter()
+        result = parallel_bfs_search(problem, max_workers=workers)
+        total = perf_counter() - start
+
+        widest = max(result.layer_times)
+        print(f"{workers} workers: {total:.2f}s total, {len(result.layer_times)} layers, "
+              f"widest layer of {widest[0]} states took {widest[1] * 1000:.1f}ms, "
+              f"solution length {len(result.path)}")
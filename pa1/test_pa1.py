@@ -10,7 +10,17 @@ assignment #1 for the COSC 276.
 from uninformed_search import *
 from FoxProblem import *
 from SearchSolution import *
+from PackedFoxProblem import *
+from RiverCrossingProblem import *
+from RiverCrossingDistanceTable import *
+from parallel_search import parallel_bfs_search
+from SuccessorCache import SuccessorCache
+from SearchStats import SearchStats
+import copy
+import json
+import pickle
 import random
+import pytest
 
 def test_searchnode_inparent():
     """Ensure that dfs search nodes accurately report when a state is along the explored path """
@@ -110,4 +120,402 @@ def test_fuzztest():
             dfs_found = len(dfs_res.path) > 0
             ids_found = len(ids_res.path) > 0
 
-            assert bfs_found == dfs_found == ids_found
\ No newline at end of file
+            assert bfs_found == dfs_found == ids_found
+
+def test_331_bidirectional_bfs():
+    result = bidirectional_bfs_search(problem331)
+    assert len(result.path) == 12
+    assert result.path[0] == problem331.goal_state
+    assert result.path[-1] == problem331.start_state
+
+def test_551_bidirectional_bfs():
+    result = bidirectional_bfs_search(problem551)
+    assert len(result.path) == 0
+
+def test_bidirectional_bfs_fuzztest():
+    for f in range(0, 7):
+        for c in range(0, 7):
+            problem = FoxProblem((c, f, 1))
+
+            bfs_res = bfs_search(problem)
+            bidirectional_res = bidirectional_bfs_search(problem)
+
+            assert len(bfs_res.path) == len(bidirectional_res.path)
+
+            # Every step along the path must be a legal move
+            path = bidirectional_res.path
+            for i in range(len(path) - 1):
+                assert path[i] in set(problem.get_successors(path[i + 1]))
+
+def test_bidirectional_bfs_large():
+    problem = FoxProblem((200, 199, 1))
+    bfs_res = bfs_search(problem)
+    bidirectional_res = bidirectional_bfs_search(problem)
+
+    assert len(bfs_res.path) == len(bidirectional_res.path) > 0
+
+
+class LineProblem:
+    """A search problem whose states are the integers 0..length, where 
+    each state can move one step in either direction."""
+    def __init__(self, length):
+        self.start_state = 0
+        self.goal_state = length
+
+    def get_successors(self, state):
+        return [s for s in (state + 1, state - 1) if 0 <= s <= self.goal_state]
+
+    def is_goal(self, state):
+        return state == self.goal_state
+
+def test_iterative_dfs_matches_dfs():
+    for f in range(0, 7):
+        for c in range(0, 7):
+            problem = FoxProblem((c, f, 1))
+
+            for depth_limit in (5, 20, 100):
+                dfs_res = dfs_search(problem, depth_limit)
+                iterative_res = iterative_dfs_search(problem, depth_limit)
+
+                assert dfs_res.path == iterative_res.path
+                assert dfs_res.nodes_visited == iterative_res.nodes_visited
+
+def test_iterative_ids_matches_ids():
+    for problem in (problem331, problem541, problem551):
+        ids_res = ids_search(problem)
+        iterative_res = ids_search(problem, dfs_fn=iterative_dfs_search)
+
+        assert ids_res.path == iterative_res.path
+        assert ids_res.nodes_visited == iterative_res.nodes_visited
+
+def test_iterative_dfs_deep():
+    problem = LineProblem(50000)
+    result = iterative_dfs_search(problem, depth_limit=50000)
+
+    assert len(result.path) == 50001
+    assert result.path[0] == 50000
+    assert result.path[-1] == 0
+
+    result = iterative_dfs_search(problem, depth_limit=49999)
+    assert len(result.path) == 0
+
+
+def test_packed_encode_decode():
+    packed = PackedFoxProblem(problem541)
+    assert packed.num_states == 6 * 5 * 2
+    assert packed.decode(packed.start_state) == (5, 4, 1)
+    assert packed.decode(packed.goal_state) == (0, 0, 0)
+
+    indices = set()
+    for c in range(6):
+        for f in range(5):
+            for b in range(2):
+                index = packed.encode((c, f, b))
+                assert packed.decode(index) == (c, f, b)
+                assert packed.is_legal(index) == problem541.is_legal((c, f, b))
+                indices.add(index)
+
+    assert indices == set(range(packed.num_states))
+
+def test_packed_successors():
+    packed = PackedFoxProblem(problem331)
+    successors = set(packed.decode(s) for s in packed.get_successors(packed.encode((3, 3, 1))))
+    assert successors == set(problem331.get_successors((3, 3, 1)))
+
+    # Illegal states aren't expanded, so every edge joins two legal states
+    packed = PackedFoxProblem(problem541)
+    for index in range(packed.num_states):
+        if not packed.is_legal(index):
+            assert len(packed.get_successors(index)) == 0
+        for predecessor in packed.get_predecessors(index):
+            assert packed.is_legal(predecessor) and packed.is_legal(index)
+
+def test_packed_bfs_fuzztest():
+    for f in range(0, 7):
+        for c in range(0, 7):
+            problem = FoxProblem((c, f, 1))
+
+            bfs_res = bfs_search(problem)
+            packed_res = packed_bfs_search(PackedFoxProblem(problem))
+
+            assert len(bfs_res.path) == len(packed_res.path)
+            if len(packed_res.path) > 0:
+                assert packed_res.path[0] == problem.goal_state
+                assert packed_res.path[-1] == problem.start_state
+
+
+def test_rivercrossing_matches_foxproblem():
+    for f in range(0, 5):
+        for c in range(0, 5):
+            fox_problem = FoxProblem((c, f, 1))
+            river_problem = RiverCrossingProblem((c, f, 1), boat_capacity=2)
+
+            for state_c in range(c + 1):
+                for state_f in range(f + 1):
+                    for state_b in range(2):
+                        state = (state_c, state_f, state_b)
+                        assert set(fox_problem.get_successors(state)) == set(river_problem.get_successors(state))
+
+def test_rivercrossing_boat_loads():
+    problem = RiverCrossingProblem((5, 5, 1), boat_capacity=3)
+    assert len(problem.boat_loads) == 9
+    assert (0, 0) not in problem.boat_loads
+    assert (2, 1) in problem.boat_loads
+    assert (2, 2) not in problem.boat_loads
+
+def test_rivercrossing_capacity():
+    # 5/5 can't be solved with a two seat boat, but can with a bigger boat
+    assert len(bfs_search(RiverCrossingProblem((5, 5, 1), boat_capacity=2)).path) == 0
+    assert len(bfs_search(RiverCrossingProblem((5, 5, 1), boat_capacity=3)).path) > 0
+
+def test_rivercrossing_multiple_boats():
+    problem = RiverCrossingProblem((4, 4, 2), boat_capacity=2)
+    successors = set(problem.get_successors((2, 2, 1)))
+
+    # With one boat on each side, boats can travel in either direction
+    assert (1, 1, 0) in successors
+    assert (3, 3, 2) in successors
+
+    result = bidirectional_bfs_search(problem)
+    assert len(result.path) > 0
+    assert len(result.path) == len(bfs_search(problem).path)
+
+def test_rivercrossing_mirror():
+    problem = RiverCrossingProblem((6, 5, 2), boat_capacity=3)
+    assert problem.mirror_state(problem.start_state) == problem.goal_state
+
+    for c in range(7):
+        for f in range(6):
+            for b in range(3):
+                state = (c, f, b)
+                mirror = problem.mirror_state(state)
+                assert problem.mirror_state(mirror) == state
+                assert problem.is_legal(state) == problem.is_legal(mirror)
+                assert problem.canonical_state(state) == problem.canonical_state(mirror)
+                assert set(map(problem.mirror_state, problem.get_successors(state))) == set(problem.get_successors(mirror))
+
+def test_rivercrossing_large():
+    problem = RiverCrossingProblem((200, 200, 1), boat_capacity=4)
+    result = packed_bfs_search(PackedFoxProblem(problem))
+    assert len(result.path) > 0
+    assert len(result.path) == len(bidirectional_bfs_search(problem).path)
+
+
+def test_distancetable_query():
+    table = RiverCrossingDistanceTable(5, 4)
+    result = table.query((5, 4, 1))
+    assert len(result.path) == len(bfs_search(problem541).path) == 16
+    assert result.path[0] == (0, 0, 0)
+    assert result.path[-1] == (5, 4, 1)
+
+    assert len(RiverCrossingDistanceTable(5, 5).query((5, 5, 1)).path) == 0
+
+def test_distancetable_consistent():
+    table = RiverCrossingDistanceTable(6, 5, total_boats=2, boat_capacity=3)
+    problem = table.problem
+
+    for c in range(7):
+        for f in range(6):
+            for b in range(3):
+                state = (c, f, b)
+                distance = table.distance(state)
+                path = table.query(state).path
+
+                assert len(path) == distance + 1
+
+                # States where the chickens have been eaten can't lead to the goal
+                if not problem.is_legal(state):
+                    assert distance == -1
+                    assert len(path) == 0
+
+                # Each step along the path is a legal move that gets one closer to the goal
+                for i in range(len(path) - 1):
+                    assert path[i] in problem.get_successors(path[i + 1])
+                    assert table.distance(path[i]) == table.distance(path[i + 1]) - 1
+
+def test_distancetable_rejects_other_populations():
+    table = RiverCrossingDistanceTable(5, 4)
+    for state in [(0, 5, 1), (6, 0, 1), (1, 1, 2), (-1, 0, 0), (0, 0, -1)]:
+        with pytest.raises(ValueError):
+            table.distance(state)
+        with pytest.raises(ValueError):
+            table.query(state)
+
+def test_distancetable_save_load(tmp_path):
+    table = RiverCrossingDistanceTable(8, 7, boat_capacity=3)
+    filename = tmp_path / "table.bin"
+    table.save(filename)
+
+    loaded = RiverCrossingDistanceTable.load(filename)
+    assert loaded.distances == table.distances
+    assert loaded.next_states == table.next_states
+    assert loaded.query((8, 7, 1)).path == table.query((8, 7, 1)).path
+
+
+def test_parallel_bfs():
+    for problem in (problem331, problem541, problem551, FoxProblem((0, 0, 1))):
+        bfs_res = bfs_search(problem)
+        parallel_res = parallel_bfs_search(problem, max_workers=2)
+
+        assert len(bfs_res.path) == len(parallel_res.path)
+        assert len(parallel_res.layer_times) > 0 or len(parallel_res.path) == 1
+
+    result = parallel_bfs_search(problem541, max_workers=2, num_shards=3)
+    assert result.path[0] == problem541.goal_state
+    assert result.path[-1] == problem541.start_state
+
+class BrokenFoxProblem(FoxProblem):
+    """A FoxProblem whose states can't be expanded"""
+    def get_successors(self, state):
+        raise ValueError("can't expand " + str(state))
+
+def test_parallel_bfs_worker_error():
+    with pytest.raises(ValueError):
+        parallel_bfs_search(BrokenFoxProblem((3, 3, 1)), max_workers=2)
+
+
+def test_frontier_bfs_fuzztest():
+    for f in range(0, 7):
+        for c in range(0, 7):
+            problem = FoxProblem((c, f, 1))
+
+            bfs_res = bfs_search(problem)
+            frontier_res = frontier_bfs_search(problem)
+
+            assert len(bfs_res.path) == len(frontier_res.path)
+
+            path = frontier_res.path
+            if len(path) > 0:
+                assert path[0] == problem.goal_state
+                assert path[-1] == problem.start_state
+            for i in range(len(path) - 1):
+                assert path[i] in set(problem.get_successors(path[i + 1]))
+
+def test_frontier_bfs_memory():
+    problem = RiverCrossingProblem((200, 200, 1), boat_capacity=4)
+    bfs_res = packed_bfs_search(PackedFoxProblem(problem))
+    frontier_res = frontier_bfs_search(problem)
+
+    assert len(bfs_res.path) == len(frontier_res.path) > 0
+    assert frontier_res.max_stored_states < bfs_res.nodes_visited / 10
+
+def test_frontier_bfs_unsolvable_stats():
+    # A search that finds no path still reports the work it did
+    problem = FoxProblem((5, 5, 1))
+    frontier_res = frontier_bfs_search(problem)
+
+    assert len(frontier_res.path) == 0
+    assert frontier_res.nodes_visited == bfs_search(problem).nodes_visited > 0
+    assert frontier_res.max_stored_states > 0
+
+
+def test_successor_cache():
+    cached = SuccessorCache(problem331)
+    assert set(cached.get_successors((3, 3, 1))) == set(problem331.get_successors((3, 3, 1)))
+    assert set(cached.get_successors((3, 3, 1))) == set(problem331.get_successors((3, 3, 1)))
+    assert cached.hits == 1
+    assert cached.misses == 1
+
+    # Everything else is passed through to the wrapped problem
+    assert cached.start_state == problem331.start_state
+    assert cached.is_goal((0, 0, 0))
+
+def test_successor_cache_pickle():
+    cached = SuccessorCache(problem331)
+    cached.get_successors((3, 3, 1))
+
+    # Copies (like the ones sent to worker processes) keep the cache and the problem
+    for loaded in (pickle.loads(pickle.dumps(cached)), copy.copy(cached)):
+        assert loaded.start_state == problem331.start_state
+        assert set(loaded.get_successors((3, 3, 1))) == set(problem331.get_successors((3, 3, 1)))
+        assert loaded.hits == 1
+
+def test_successor_cache_eviction():
+    cached = SuccessorCache(problem331, max_size=2)
+    cached.get_successors((3, 3, 1))
+    cached.get_successors((3, 1, 0))
+    cached.get_successors((3, 3, 1))
+    cached.get_successors((2, 2, 0))
+
+    # (3, 1, 0) was the least recently used, so it was evicted
+    assert len(cached.cache) == 2
+    assert (3, 1, 0) not in cached.cache
+    assert (3, 3, 1) in cached.cache
+
+def test_ids_cached():
+    for problem in (problem331, problem541, problem551):
+        ids_res = ids_search(problem)
+        cached_res = ids_search(problem, use_cache=True)
+
+        assert ids_res.path == cached_res.path
+        assert ids_res.nodes_visited == cached_res.nodes_visited
+        assert ids_res.cache_hits is None
+        assert cached_res.cache_hits > cached_res.cache_misses > 0
+
+    bounded_res = ids_search(problem541, use_cache=True, cache_size=5)
+    assert len(bounded_res.path) == len(ids_search(problem541).path)
+
+
+def test_vectorized_bfs():
+    pytest.importorskip("numpy")
+    from vectorized_search import vectorized_bfs_search
+
+    for f in range(0, 7):
+        for c in range(0, 7):
+            problem = FoxProblem((c, f, 1))
+            packed_res = packed_bfs_search(PackedFoxProblem(problem))
+            vectorized_res = vectorized_bfs_search(problem)
+
+            assert len(packed_res.path) == len(vectorized_res.path)
+
+    problem = RiverCrossingProblem((30, 30, 3), boat_capacity=4)
+    vectorized_res = vectorized_bfs_search(problem)
+    assert len(vectorized_res.path) == len(bidirectional_bfs_search(problem).path) > 0
+
+    path = vectorized_res.path
+    assert path[0] == problem.goal_state
+    assert path[-1] == problem.start_state
+    for i in range(len(path) - 1):
+        assert path[i] in problem.get_successors(path[i + 1])
+
+
+def test_search_stats():
+    for search_fn in (bfs_search, dfs_search, iterative_dfs_search, ids_search):
+        stats = SearchStats()
+        result = search_fn(problem541, stats=stats)
+
+        assert len(result.path) == len(search_fn(problem541).path)
+        assert result.stats is stats
+        assert search_fn(problem541).stats is None
+
+        assert stats.expanded > 0
+        assert stats.generated >= stats.expanded
+        assert stats.duplicates > 0
+        assert stats.peak_frontier > 0
+        assert stats.phase_times["successors"] > 0
+        assert stats.phase_times["goal_test"] > 0
+        assert stats.total_time >= stats.phase_times["successors"]
+
+        exported = json.loads(stats.to_json())
+        assert exported["generated"] == stats.generated
+
+    stats = SearchStats()
+    bfs_search(problem541, stats=stats)
+    assert stats.peak_closed == bfs_search(problem541).nodes_visited
+    assert stats.peak_closed_bytes > 0
+
+    # Both depth first searches hold the same states, so they estimate the same memory
+    (recursive, iterative) = (SearchStats(), SearchStats())
+    dfs_search(problem551, stats=recursive)
+    iterative_dfs_search(problem551, stats=iterative)
+    assert recursive.peak_frontier == iterative.peak_frontier > 0
+    assert recursive.peak_frontier_bytes == iterative.peak_frontier_bytes > 0
+
+    # Without stats, ids_search doesn't pass them to the depth limited search
+    def plain_dfs(search_problem, depth_limit):
+        return dfs_search(search_problem, depth_limit)
+    assert len(ids_search(problem541, dfs_fn=plain_dfs).path) == len(ids_search(problem541).path)
+
+    # Instrumented problems can be copied
+    instrumented = copy.copy(SearchStats().instrument(problem331))
+    assert instrumented.start_state == problem331.start_state
@@ -1,7 +1,12 @@
 
 from FoxProblem import FoxProblem
 from collections import deque
+from array import array
 from SearchSolution import SearchSolution
+from SuccessorCache import SuccessorCache
+
+# Sentinel marking that a successor iterator has run out
+_EXHAUSTED = object()
 
 class SearchNode:
     """A search node for a DFS search (unused for BFS).
@@ -12,6 +17,7 @@ class SearchNode:
     def __init__(self, state, parent=None):
         self.state = state
         self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
     
     def is_state_in_path(self, state):
         if self.state == state:
@@ -38,11 +44,12 @@ def bfs_backtrace(backpointers, state):
         state = backpointers[state]
     return path
 
-def bfs_search(search_problem):
+def bfs_search(search_problem, stats=None):
     """Perform a breadth first search. 
 
     Args:
         search_problem (FoxProblem): The search problem to find a solution to
+        stats (SearchStats, optional): Instrumentation to record the search in. Defaults to None.
         
     Returns:
         SearchSolution: The solution to the search
@@ -50,6 +57,10 @@ def bfs_search(search_problem):
 
     solution = SearchSolution(problem=search_problem,
                               search_method="bfs_search")
+    if stats is not None:
+        search_problem = stats.instrument(search_problem)
+        stats.start()
+
     backpointers = {
         search_problem.start_state: None
     }
@@ -59,11 +70,18 @@ def bfs_search(search_problem):
     # Expand the frontier in a FIFO way
     while len(frontier) > 0 and not search_problem.goal_state in backpointers:
         state = frontier.pop()
+        if stats is not None:
+            stats.expanded += 1
 
         # print_backtrace(state)
         successors = list(search_problem.get_successors(state))  
         for successor in successors:
+            if stats is not None:
+                stats.generated += 1
+
             if successor in backpointers:
+                if stats is not None:
+                    stats.duplicates += 1
                 continue
             
             backpointers[successor] = state
@@ -73,8 +91,16 @@ def bfs_search(search_problem):
                 break
 
             frontier.append(successor)
+
+        if stats is not None:
+            stats.record_frontier(frontier)
+            stats.record_closed(backpointers)
     
     solution.nodes_visited = len(backpointers)
+
+    if stats is not None:
+        stats.stop()
+        solution.stats = stats
     
     # Reconstruct path back to starting node.
     solution.path = bfs_backtrace(backpointers, search_problem.goal_state)
@@ -82,7 +108,241 @@ def bfs_search(search_problem):
     return solution
 
 
-def dfs_search(search_problem, depth_limit=100, node =None, solution=None):
+def bidirectional_bfs_search(search_problem):
+    """Perform a breadth first search from both the start and the goal
+    state, stopping once the two searches meet in the middle.
+
+    The backward search uses the problem's `get_predecessors` method if
+    it has one, and otherwise falls back to `get_successors` (which is
+    only correct for problems where every move can be reversed).
+
+    Args:
+        search_problem (FoxProblem): The search problem to find a solution to.
+            Must have a `goal_state` property.
+
+    Returns:
+        SearchSolution: The solution to the search
+    """
+    solution = SearchSolution(problem=search_problem,
+                              search_method="bidirectional_bfs_search")
+
+    start_state = search_problem.start_state
+    goal_state = search_problem.goal_state
+    get_predecessors = getattr(search_problem, "get_predecessors",
+                               search_problem.get_successors)
+
+    # Each direction keeps its own backpointers (towards the start for the
+    # forward search, towards the goal for the backward search) along with
+    # the depth of every state it has discovered
+    forward_backpointers = { start_state: None }
+    backward_backpointers = { goal_state: None }
+    forward_depth = { start_state: 0 }
+    backward_depth = { goal_state: 0 }
+
+    forward_frontier = [start_state]
+    backward_frontier = [goal_state]
+
+    meeting_state = start_state if start_state == goal_state else None
+
+    while meeting_state is None and len(forward_frontier) > 0 and len(backward_frontier) > 0:
+
+        # Always grow the smaller frontier by one full layer
+        if len(forward_frontier) <= len(backward_frontier):
+            expand_fn = search_problem.get_successors
+            frontier, backpointers, depth = forward_frontier, forward_backpointers, forward_depth
+            other_depth = backward_depth
+        else:
+            expand_fn = get_predecessors
+            frontier, backpointers, depth = backward_frontier, backward_backpointers, backward_depth
+            other_depth = forward_depth
+
+        next_frontier = []
+        best_length = None
+        for state in frontier:
+            for successor in expand_fn(state):
+                if successor in backpointers:
+                    continue
+
+                backpointers[successor] = state
+                depth[successor] = depth[state] + 1
+                next_frontier.append(successor)
+
+                # The first meeting point isn't necessarily on a shortest path,
+                # so finish the layer and keep the best one we come across
+                if successor in other_depth:
+                    length = depth[successor] + other_depth[successor]
+                    if best_length is None or length < best_length:
+                        best_length = length
+                        meeting_state = successor
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    solution.nodes_visited = len(forward_backpointers) + len(backward_backpointers)
+
+    if meeting_state is None:
+        return solution
+
+    # Stitch the two halves together. Like bfs_search, the path runs
+    # from the goal back to the start state.
+    goal_half = bfs_backtrace(backward_backpointers, meeting_state)
+    goal_half.reverse()
+    solution.path = goal_half[:-1] + bfs_backtrace(forward_backpointers, meeting_state)
+    return solution
+
+
+def packed_bfs_search(search_problem):
+    """Perform a breadth first search on a problem whose states are packed
+    into integers in `range(search_problem.num_states)`, like `PackedFoxProblem`.
+
+    Rather than a backpointer dictionary, visited states are recorded in 
+    a bitset and parents in a flat array of 32 bit ints, so that the search 
+    only needs a few bytes of memory per state.
+
+    Args:
+        search_problem (PackedFoxProblem): The search problem to find a solution to
+
+    Returns:
+        SearchSolution: The solution to the search. The path is made up
+            of decoded (unpacked) states.
+    """
+    solution = SearchSolution(problem=search_problem,
+                              search_method="packed_bfs_search")
+
+    visited = bytearray((search_problem.num_states + 7) >> 3)
+    parents = array('i', [-1]) * search_problem.num_states
+
+    start_state = search_problem.start_state
+    visited[start_state >> 3] |= 1 << (start_state & 7)
+    solution.nodes_visited = 1
+
+    goal = start_state if search_problem.is_goal(start_state) else None
+    frontier = deque([start_state])
+
+    # Expand the frontier in a FIFO way
+    while len(frontier) > 0 and goal is None:
+        state = frontier.popleft()
+
+        for successor in search_problem.get_successors(state):
+            if visited[successor >> 3] & (1 << (successor & 7)):
+                continue
+
+            visited[successor >> 3] |= 1 << (successor & 7)
+            parents[successor] = state
+            solution.nodes_visited += 1
+
+            if search_problem.is_goal(successor):
+                goal = successor
+                break
+
+            frontier.append(successor)
+
+    # Reconstruct the path back to the start state (goal first, like bfs_search)
+    state = -1 if goal is None else goal
+    while state != -1:
+        solution.path.append(search_problem.decode(state))
+        state = parents[state]
+
+    return solution
+
+
+def _frontier_layers(search_problem, start_state, is_target, relay_depth=None):
+    """Breadth first search which, instead of a closed list, only keeps the
+    previous, current and next layers. For problems where every move can be
+    reversed, the successors of a layer can only be in the previous, current 
+    or next layer, so that's enough to avoid revisiting states.
+
+    Args:
+        search_problem (FoxProblem): The search problem
+        start_state (Hashable): State to search from
+        is_target (function): Returns True for the state to search for
+        relay_depth (int, optional): If given, every state at or beyond this depth 
+            remembers its ancestor at this depth.
+
+    Returns:
+        Tuple: (depth, target state, relay ancestor of the target, number of states 
+            generated, most states stored at once). If there's no target, the depth,
+            target and relay are None.
+    """
+    previous_layer = {}
+    current_layer = { start_state: start_state if relay_depth == 0 else None }
+    depth = 0
+    nodes_generated = 1
+    max_stored = 1
+
+    while len(current_layer) > 0:
+        for (state, relay) in current_layer.items():
+            if is_target(state):
+                return (depth, state, relay, nodes_generated, max_stored)
+
+        next_layer = {}
+        for (state, relay) in current_layer.items():
+            for successor in search_problem.get_successors(state):
+                if successor in previous_layer or successor in current_layer or successor in next_layer:
+                    continue
+                next_layer[successor] = successor if depth + 1 == relay_depth else relay
+
+        nodes_generated += len(next_layer)
+        max_stored = max(max_stored, len(previous_layer) + len(current_layer) + len(next_layer))
+
+        previous_layer, current_layer = current_layer, next_layer
+        depth += 1
+
+    return (None, None, None, nodes_generated, max_stored)
+
+def frontier_bfs_search(search_problem):
+    """Perform a breadth first frontier search, which doesn't keep a closed
+    list (see `_frontier_layers`), so only a few layers of the search are held
+    in memory at once. Since there are no backpointers, the path is rebuilt
+    by divide and conquer: once the goal's depth is known, the search is run
+    again to find the state halfway along the path, and then each half 
+    is solved the same way.
+
+    This trades extra searching time for memory, and requires that every move
+    in the problem can be reversed (as in FoxProblem).
+
+    Args:
+        search_problem (FoxProblem): The search problem to find a solution to
+        
+    Returns:
+        SearchSolution: The solution to the search. Also has a `max_stored_states`
+            property with the largest number of states held in memory at once.
+    """
+    solution = SearchSolution(problem=search_problem,
+                              search_method="frontier_bfs_search")
+    solution.max_stored_states = 0
+
+    def search(start_state, is_target, relay_depth=None):
+        result = _frontier_layers(search_problem, start_state, is_target, relay_depth)
+        solution.nodes_visited += result[3]
+        solution.max_stored_states = max(solution.max_stored_states, result[4])
+        return result
+
+    def solve_segment(start_state, end_state, depth):
+        # Returns the path from start_state to end_state, which are `depth` moves apart
+        if depth <= 1:
+            return [start_state, end_state][-depth - 1:]
+
+        relay_depth = depth // 2
+        (_, _, midpoint, _, _) = search(start_state, lambda s: s == end_state, relay_depth)
+
+        return solve_segment(start_state, midpoint, relay_depth) + \
+               solve_segment(midpoint, end_state, depth - relay_depth)[1:]
+
+    (depth, goal_state, _, _, _) = search(search_problem.start_state, search_problem.is_goal)
+    if goal_state is None:
+        return solution
+
+    # Like bfs_search, the path runs from the goal back to the start state
+    solution.path = solve_segment(search_problem.start_state, goal_state, depth)
+    solution.path.reverse()
+
+    return solution
+
+
+def dfs_search(search_problem, depth_limit=100, node =None, solution=None, stats=None):
     """Perform a depth-first search of the search problem
 
     Args:
@@ -90,6 +350,7 @@ def dfs_search(search_problem, depth_limit=100, node =None, solution=None):
         depth_limit (int, optional): The maximum recusion depth to use. Defaults to 100.
         node (SearchNode, optional): Node from which to perform the depth-first search, used in recursive calls. Defaults to None.
         solution (SearchSolution, optional): The search solution, used by recursive calls to record visited nodes and the path. Defaults to None.
+        stats (SearchStats, optional): Instrumentation to record the search in. Defaults to None.
 
     Returns:
         SearchSolution: The results from the search
@@ -101,6 +362,14 @@ def dfs_search(search_problem, depth_limit=100, node =None, solution=None):
         node = SearchNode(search_problem.start_state)
         solution = SearchSolution(search_problem, "DFS")
 
+        # Run the whole search on the instrumented problem, so it can be timed from the top
+        if stats is not None:
+            stats.start()
+            dfs_search(stats.instrument(search_problem), depth_limit, node, solution, stats)
+            stats.stop()
+            solution.stats = stats
+            return solution
+
     solution.nodes_visited += 1
 
     # Base case A: this node is the goal node! Return true and record path
@@ -112,22 +381,33 @@ def dfs_search(search_problem, depth_limit=100, node =None, solution=None):
     if depth_limit == 0:
         return solution
 
+    if stats is not None:
+        stats.expanded += 1
+
     # Recursion: try searching each of the successors
     for successor_state in search_problem.get_successors(node.state):
+        if stats is not None:
+            stats.generated += 1
         
         # Check to make sure the successor state is not  
         # already along the path
         if node.is_state_in_path(successor_state):
+            if stats is not None:
+                stats.duplicates += 1
             continue
 
         successor_node = SearchNode(successor_state, parent=node)
+        if stats is not None:
+            # The only states held are those along the current path
+            stats.record_frontier_size(successor_node.depth + 1, successor_state)
 
         # Note: this will update the exisitng search solution,
         # so no need to store the results
         dfs_search(search_problem=search_problem,
                    depth_limit=depth_limit - 1,
                    node=successor_node,
-                   solution=solution)
+                   solution=solution,
+                   stats=stats)
 
         # If DFS on the successor found the goal, then 
         # hurray! This node is next on the path.
@@ -139,18 +419,134 @@ def dfs_search(search_problem, depth_limit=100, node =None, solution=None):
     # to our child nodes found the goal - so return false
     return solution
 
-def ids_search(search_problem, depth_limit=100):
+def iterative_dfs_search(search_problem, depth_limit=100, stats=None):
+    """Perform a depth-first search of the search problem using an explicit
+    stack instead of recursion, so that large depth limits don't run into
+    python's recursion limit. Nodes are visited in the same order as in
+    `dfs_search`, and the states along the current path are kept in a set
+    so that checking for loops doesn't require walking the path.
+
+    Args:
+        search_problem (SearchProblem): The search problem to perform DFS on 
+        depth_limit (int, optional): The maximum depth to search to. Defaults to 100.
+        stats (SearchStats, optional): Instrumentation to record the search in. Defaults to None.
+
+    Returns:
+        SearchSolution: The results from the search
+    """
+    assert depth_limit >= 0
+
+    solution = SearchSolution(search_problem, "DFS (iterative)")
+    if stats is not None:
+        stats.start()
+        _iterative_dfs(stats.instrument(search_problem), depth_limit, solution, stats)
+        stats.stop()
+        solution.stats = stats
+    else:
+        _iterative_dfs(search_problem, depth_limit, solution, None)
+
+    return solution
+
+def _iterative_dfs(search_problem, depth_limit, solution, stats):
+    # Body of iterative_dfs_search, which records its results in `solution`
+    start_state = search_problem.start_state
+    solution.nodes_visited += 1
+
+    if search_problem.is_goal(start_state):
+        solution.path = [start_state]
+        return
+
+    path = [start_state]
+    path_states = { start_state }
+
+    # The stack holds, for each state along the path which is still
+    # below the depth limit, the successors that haven't been tried yet
+    stack = []
+    if depth_limit > 0:
+        stack.append(iter(search_problem.get_successors(start_state)))
+        if stats is not None:
+            stats.expanded += 1
+
+    while len(stack) > 0:
+        successor_state = next(stack[-1], _EXHAUSTED)
+
+        # All successors of the deepest state have been tried, so backtrack
+        if successor_state is _EXHAUSTED:
+            stack.pop()
+            path_states.remove(path.pop())
+            continue
+
+        if stats is not None:
+            stats.generated += 1
+
+        if successor_state in path_states:
+            if stats is not None:
+                stats.duplicates += 1
+            continue
+
+        solution.nodes_visited += 1
+
+        if search_problem.is_goal(successor_state):
+            # Like dfs_search, the path runs from the goal back to the start
+            path.append(successor_state)
+            path.reverse()
+            solution.path = path
+            return
+
+        # Only descend into the successor if we haven't hit the depth limit
+        if len(path) < depth_limit:
+            path.append(successor_state)
+            path_states.add(successor_state)
+            stack.append(iter(search_problem.get_successors(successor_state)))
+
+            if stats is not None:
+                stats.expanded += 1
+                stats.record_frontier_size(len(path), successor_state)
+
+def ids_search(search_problem, depth_limit=100, dfs_fn=dfs_search, use_cache=False, cache_size=None, stats=None):
+    """Perform an iterative deepening search of the search problem
+
+    Args:
+        search_problem (SearchProblem): The search problem to perform IDS on
+        depth_limit (int, optional): The maximum depth to search to. Defaults to 100.
+        dfs_fn (function, optional): Depth limited search to run at each depth, 
+            either `dfs_search` or `iterative_dfs_search`. Defaults to dfs_search.
+        use_cache (bool, optional): Whether to remember the successors of expanded 
+            states between iterations (see `SuccessorCache`). Defaults to False.
+        cache_size (int, optional): Maximum number of states to keep in the cache. 
+            Defaults to None (unbounded).
+        stats (SearchStats, optional): Instrumentation to record the search in, 
+            accumulated over every iteration. Defaults to None.
+
+    Returns:
+        SearchSolution: The results from the search
+    """
 
     solution = SearchSolution(search_problem, "IDS")
 
+    if use_cache and not isinstance(search_problem, SuccessorCache):
+        search_problem = SuccessorCache(search_problem, max_size=cache_size)
+
+    # The cache might be shared with other searches, so only count this search's lookups
+    if isinstance(search_problem, SuccessorCache):
+        initial_hits, initial_misses = search_problem.hits, search_problem.misses
+
     for depth in range(depth_limit):
-        dfs_result = dfs_search(search_problem, depth)
+        # dfs_fn only needs to take stats when they're being recorded
+        if stats is None:
+            dfs_result = dfs_fn(search_problem, depth)
+        else:
+            dfs_result = dfs_fn(search_problem, depth, stats=stats)
         solution.nodes_visited += dfs_result.nodes_visited
 
         if len(dfs_result.path) > 0:
             solution.path = dfs_result.path
-            return solution
+            break
+
+    if isinstance(search_problem, SuccessorCache):
+        solution.cache_hits = search_problem.hits - initial_hits
+        solution.cache_misses = search_problem.misses - initial_misses
 
-    # This will only occur when no solution is found.
+    solution.stats = stats
     return solution
     
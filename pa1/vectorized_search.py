@@ -0,0 +1,103 @@
+import numpy as np
+
+from SearchSolution import SearchSolution
+
+# The boat loads (chickens, foxes) allowed by FoxProblem, which
+# (unlike RiverCrossingProblem) doesn't list them explicitly
+FOX_PROBLEM_BOAT_LOADS = ((0, 2), (0, 1), (1, 0), (2, 0), (1, 1))
+
+def vectorized_bfs_search(search_problem):
+    """Perform a breadth first search of a river crossing problem (FoxProblem
+    or RiverCrossingProblem), expanding a whole layer of the frontier at a time
+    with numpy array operations instead of one state at a time.
+
+    Each layer is held as arrays of c, f and b values. Every boat load is applied
+    to every state at once by broadcasting, states that break the same rules as
+    `is_legal` are masked out, and the rest are checked against a boolean visited
+    array indexed by the packed state (the same packing as `PackedFoxProblem`).
+
+    Args:
+        search_problem (RiverCrossingProblem): The search problem to find a solution to
+
+    Returns:
+        SearchSolution: The solution to the search
+    """
+    solution = SearchSolution(problem=search_problem,
+                              search_method="vectorized_bfs_search")
+
+    total_c = search_problem.total_chickens
+    total_f = search_problem.total_foxes
+    total_b = search_problem.total_boats
+
+    loads = np.array(getattr(search_problem, "boat_loads", FOX_PROBLEM_BOAT_LOADS), dtype=np.int64)
+    load_c = loads[:, 0]
+    load_f = loads[:, 1]
+
+    def encode(c, f, b):
+        return (c * (total_f + 1) + f) * (total_b + 1) + b
+
+    num_states = (total_c + 1) * (total_f + 1) * (total_b + 1)
+    visited = np.zeros(num_states, dtype=bool)
+    parents = np.full(num_states, -1, dtype=np.int32)
+
+    start = encode(*search_problem.start_state)
+    goal = encode(*search_problem.goal_state)
+
+    visited[start] = True
+    frontier = np.array([start], dtype=np.int64)
+
+    while frontier.size > 0 and not visited[goal]:
+        (cf, b) = np.divmod(frontier, total_b + 1)
+        (c, f) = np.divmod(cf, total_f + 1)
+
+        # Boats can leave from the starting side if there are any there, and
+        # come back from the far side if there are any there. Every load gives
+        # a candidate, so each of these is a (states x loads) array.
+        sending = b > 0
+        returning = b < total_b
+
+        next_c = np.concatenate([
+            (c[sending, None] - load_c).ravel(),
+            (c[returning, None] + load_c).ravel()])
+        next_f = np.concatenate([
+            (f[sending, None] - load_f).ravel(),
+            (f[returning, None] + load_f).ravel()])
+        next_b = np.concatenate([
+            np.repeat(b[sending] - 1, len(loads)),
+            np.repeat(b[returning] + 1, len(loads))])
+        candidate_parents = np.concatenate([
+            np.repeat(frontier[sending], len(loads)),
+            np.repeat(frontier[returning], len(loads))])
+
+        # Same rules as is_legal: the counts have to be in range and chickens
+        # can't be outnumbered by foxes on either side of the river
+        farside_c = total_c - next_c
+        farside_f = total_f - next_f
+        legal = (next_c >= 0) & (next_c <= total_c) & \
+                (next_f >= 0) & (next_f <= total_f) & \
+                ((next_c == 0) | (next_c >= next_f)) & \
+                ((farside_c == 0) | (farside_c >= farside_f))
+
+        candidates = encode(next_c[legal], next_f[legal], next_b[legal])
+        candidate_parents = candidate_parents[legal]
+
+        unvisited = ~visited[candidates]
+        (frontier, first) = np.unique(candidates[unvisited], return_index=True)
+
+        visited[frontier] = True
+        parents[frontier] = candidate_parents[unvisited][first]
+
+    solution.nodes_visited = int(np.count_nonzero(visited))
+
+    if not visited[goal]:
+        return solution
+
+    # Reconstruct the path back to the start state (goal first, like bfs_search)
+    state = goal
+    while state != -1:
+        cf, b = divmod(int(state), total_b + 1)
+        c, f = divmod(cf, total_f + 1)
+        solution.path.append((c, f, b))
+        state = parents[state]
+
+    return solution
@@ -0,0 +1,267 @@
+from collections import deque
+import heapq
+import sys
+
+# Frontiers (priority queues) for astar_search. Each frontier holds a state at most
+# once: pushing a state that's already in the frontier updates its priority. States
+# with equal priority come out in the order they were (last) pushed, so the oldest
+# nodes have a preference for getting explored first.
+#
+# All frontiers support:
+#   push(state, priority)   add a state, or change the priority of a state already in the frontier
+#   pop()                   remove and return the state with the lowest priority
+#   min_priority()          the lowest priority in the frontier, without removing anything
+#   remove(state)           take a state out of the frontier (it must be in it)
+#   state in frontier       whether a state is in the frontier
+#   len(frontier)           number of states in the frontier
+#   iter(frontier)          the states in the frontier, in no particular order
+
+
+class HeapFrontier:
+    """Binary heap (using heapq). Updating a state's priority pushes a new heap
+    entry, and the old entry is skipped over when it comes to the top."""
+
+    def __init__(self):
+        self.heap = []
+        # Age of the current (non-stale) heap entry for each state in the frontier
+        self.entry_ages = {}
+        self.age = 0
+
+    def push(self, state, priority):
+        self.age += 1
+        self.entry_ages[state] = self.age
+        heapq.heappush(self.heap, (priority, self.age, state))
+
+    def pop(self):
+        while True:
+            (_, age, state) = heapq.heappop(self.heap)
+
+            # Skip over entries which were replaced by a later push
+            if self.entry_ages.get(state) == age:
+                del self.entry_ages[state]
+                return state
+
+    def min_priority(self):
+        # Clear stale entries off the top first
+        while self.entry_ages.get(self.heap[0][2]) != self.heap[0][1]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0]
+
+    def remove(self, state):
+        # The heap entry goes stale, and is skipped over like a replaced one
+        del self.entry_ages[state]
+
+    def __contains__(self, state):
+        return state in self.entry_ages
+
+    def __len__(self):
+        return len(self.entry_ages)
+
+    def __iter__(self):
+        return iter(self.entry_ages)
+
+    def __sizeof__(self):
+        return sys.getsizeof(self.heap) + sys.getsizeof(self.entry_ages)
+
+
+class IndexedHeapFrontier:
+    """Binary heap which tracks the position of every state in the heap, so that
+    a state's priority can be changed in place (decrease-key) instead of leaving
+    stale entries behind."""
+
+    def __init__(self):
+        # Heap entries are [priority, age, state] lists, so they can be updated in place
+        self.heap = []
+        self.positions = {}
+        self.age = 0
+
+    def push(self, state, priority):
+        self.age += 1
+
+        if state in self.positions:
+            position = self.positions[state]
+            entry = self.heap[position]
+            entry[0] = priority
+            entry[1] = self.age
+            self._sift_up(position)
+            self._sift_down(self.positions[state])
+        else:
+            self.heap.append([priority, self.age, state])
+            self.positions[state] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        if len(self.heap) == 0:
+            raise IndexError("pop from an empty frontier")
+
+        (_, _, state) = self.heap[0]
+        last = self.heap.pop()
+        del self.positions[state]
+
+        if len(self.heap) > 0:
+            self.heap[0] = last
+            self.positions[last[2]] = 0
+            self._sift_down(0)
+
+        return state
+
+    def min_priority(self):
+        if len(self.heap) == 0:
+            raise IndexError("min_priority of an empty frontier")
+        return self.heap[0][0]
+
+    def remove(self, state):
+        # Move the last entry into the removed one's place, and sift it whichever way it needs to go
+        position = self.positions.pop(state)
+        last = self.heap.pop()
+
+        if position < len(self.heap):
+            self.heap[position] = last
+            self.positions[last[2]] = position
+            self._sift_up(position)
+            self._sift_down(self.positions[last[2]])
+
+    def __contains__(self, state):
+        return state in self.positions
+
+    def _sift_up(self, position):
+        heap = self.heap
+        entry = heap[position]
+        key = (entry[0], entry[1])
+
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if (parent[0], parent[1]) <= key:
+                break
+
+            heap[position] = parent
+            self.positions[parent[2]] = position
+            position = parent_position
+
+        heap[position] = entry
+        self.positions[entry[2]] = position
+
+    def _sift_down(self, position):
+        heap = self.heap
+        entry = heap[position]
+        key = (entry[0], entry[1])
+
+        while True:
+            child_position = 2 * position + 1
+            if child_position >= len(heap):
+                break
+
+            # Pick the smaller of the two children
+            right_position = child_position + 1
+            if right_position < len(heap) and \
+                    (heap[right_position][0], heap[right_position][1]) < (heap[child_position][0], heap[child_position][1]):
+                child_position = right_position
+
+            child = heap[child_position]
+            if key <= (child[0], child[1]):
+                break
+
+            heap[position] = child
+            self.positions[child[2]] = position
+            position = child_position
+
+        heap[position] = entry
+        self.positions[entry[2]] = position
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __sizeof__(self):
+        return sys.getsizeof(self.heap) + sys.getsizeof(self.positions)
+
+
+class BucketFrontier:
+    """Bucket queue for small, non-negative integer priorities (like the move
+    costs and Manhattan distances in Mazeworld and Sensorless problems). Each
+    priority has a FIFO bucket, and pops scan upwards from the lowest bucket
+    that might be non-empty. Like HeapFrontier, updating a state's priority
+    leaves a stale entry behind which is skipped when it's reached.
+
+    States with infinite priority (like those a heuristic says can't reach the
+    goal) go in an overflow bucket, which comes after all the others."""
+
+    def __init__(self):
+        self.buckets = []
+        self.overflow = deque()
+        self.lowest_bucket = 0
+        self.entry_ages = {}
+        self.age = 0
+
+    def push(self, state, priority):
+        if priority == float("inf"):
+            self.age += 1
+            self.entry_ages[state] = self.age
+            self.overflow.append((self.age, state))
+            return
+
+        if priority < 0 or priority != int(priority):
+            raise ValueError(f"BucketFrontier needs non-negative integer priorities, got {priority}")
+
+        priority = int(priority)
+        while len(self.buckets) <= priority:
+            self.buckets.append(deque())
+
+        self.age += 1
+        self.entry_ages[state] = self.age
+        self.buckets[priority].append((self.age, state))
+        self.lowest_bucket = min(self.lowest_bucket, priority)
+
+    def _bucket(self, priority):
+        """Bucket holding a priority (the overflow bucket past the last one)"""
+        return self.buckets[priority] if priority < len(self.buckets) else self.overflow
+
+    def min_priority(self):
+        if len(self.entry_ages) == 0:
+            raise IndexError("min_priority of an empty frontier")
+
+        # Clear stale entries out of the way, the same as pop
+        while True:
+            bucket = self._bucket(self.lowest_bucket)
+            while len(bucket) > 0:
+                (age, state) = bucket[0]
+                if self.entry_ages.get(state) == age:
+                    return self.lowest_bucket if bucket is not self.overflow else float("inf")
+                bucket.popleft()
+
+            self.lowest_bucket += 1
+
+    def pop(self):
+        if len(self.entry_ages) == 0:
+            raise IndexError("pop from an empty frontier")
+
+        while True:
+            bucket = self._bucket(self.lowest_bucket)
+            while len(bucket) > 0:
+                (age, state) = bucket.popleft()
+
+                # Skip over entries which were replaced by a later push
+                if self.entry_ages.get(state) == age:
+                    del self.entry_ages[state]
+                    return state
+
+            self.lowest_bucket += 1
+
+    def remove(self, state):
+        del self.entry_ages[state]
+
+    def __contains__(self, state):
+        return state in self.entry_ages
+
+    def __len__(self):
+        return len(self.entry_ages)
+
+    def __iter__(self):
+        return iter(self.entry_ages)
+
+    def __sizeof__(self):
+        return sys.getsizeof(self.buckets) + sys.getsizeof(self.entry_ages) + \
+            sys.getsizeof(self.overflow) + sum(sys.getsizeof(bucket) for bucket in self.buckets)
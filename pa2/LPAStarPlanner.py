@@ -0,0 +1,183 @@
+from Frontier import HeapFrontier
+from Maze import FLOOR
+from SearchSolution import SearchSolution
+
+INFINITY = float("inf")
+
+
+class LPAStarPlanner:
+    """Lifelong Planning A* (LPA*): finds shortest paths between two locations
+    in a maze for a single robot, like astar_search, but keeps what it worked out
+    between searches so that after the maze or the goal changes, `replan` only
+    has to repair the part of the search that the change affects.
+
+    Every location has two path cost estimates from the start: g, the cost found
+    when it was last expanded, and rhs, the best cost through its neighbors' g
+    values. A location is consistent if they're equal. Inconsistent locations wait
+    in a frontier, ordered by (min(g, rhs) + heuristic, min(g, rhs)), and are
+    expanded until the goal is consistent and nothing left in the frontier could
+    lead to a cheaper path. When a cell turns into a wall or a floor, only it and
+    its neighbors become inconsistent, and the repair spreads out from there as
+    far as the path costs actually change.
+
+    Locations are kept as grid indices (see Maze.grid_index), which unlike cell
+    ids don't change when the maze does. Moves cost 1.
+
+    Typical use:
+        planner = LPAStarPlanner(maze, start, goal)
+        solution = planner.replan()
+        maze.set_floor(x, y, False)
+        planner.update_cells([(x, y)])
+        solution = planner.replan()
+    """
+
+    def __init__(self, maze, start, goal):
+        self.maze = maze
+        self.start = start
+        self.goal = goal
+        self._reset()
+
+    def __str__(self):
+        return "LPA* planner: {} to {}".format(self.start, self.goal)
+
+    def _reset(self):
+        maze = self.maze
+        self.start_index = maze.grid_index(*self.start)
+        self.goal_index = maze.grid_index(*self.goal)
+
+        # g and rhs values of the locations the search has reached (infinity for the rest)
+        self.g = {}
+        self.rhs = {}
+        self.frontier = HeapFrontier()
+
+        if maze.grid[self.start_index] == FLOOR:
+            self.rhs[self.start_index] = 0
+            self.frontier.push(self.start_index, self._key(self.start_index))
+
+    def _heuristic(self, index):
+        # Manhattan distance to the goal
+        (row, column) = divmod(index, self.maze.padded_width)
+        (goal_row, goal_column) = divmod(self.goal_index, self.maze.padded_width)
+        return abs(row - goal_row) + abs(column - goal_column)
+
+    def _key(self, index):
+        cost = min(self.g.get(index, INFINITY), self.rhs.get(index, INFINITY))
+        return (cost + self._heuristic(index), cost)
+
+    def _update(self, index):
+        """Recalculate a location's rhs value, and put it in the frontier if (and
+        only if) it's inconsistent"""
+        grid = self.maze.grid
+        g = self.g
+
+        if index != self.start_index or grid[index] != FLOOR:
+            rhs = INFINITY
+            if grid[index] == FLOOR:
+                for offset in self.maze.direction_offsets:
+                    neighbor_cost = g.get(index + offset, INFINITY) + 1
+                    if neighbor_cost < rhs:
+                        rhs = neighbor_cost
+
+            if rhs == INFINITY:
+                self.rhs.pop(index, None)
+            else:
+                self.rhs[index] = rhs
+
+        if index in self.frontier:
+            self.frontier.remove(index)
+        if g.get(index, INFINITY) != self.rhs.get(index, INFINITY):
+            self.frontier.push(index, self._key(index))
+
+    def update_cells(self, changed):
+        """Tell the planner about locations that have turned into walls or floors
+        (with Maze.set_floor) since the last search. The next `replan` repairs the
+        search around them.
+
+        Args:
+            changed (Iterable[Tuple[int]]): (x, y) locations that changed
+        """
+        offsets = self.maze.direction_offsets
+        for (x, y) in changed:
+            index = self.maze.grid_index(x, y)
+            if index == self.start_index and self.maze.grid[index] == FLOOR:
+                self.rhs[index] = 0
+
+            self._update(index)
+            for offset in offsets:
+                self._update(index + offset)
+
+    def set_goal(self, goal):
+        """Change the goal location. Path costs from the start are still valid, so
+        the search only needs reordering for the new heuristic, and carries on
+        from where it got to.
+
+        Args:
+            goal (Tuple[int]): New (x, y) goal location
+        """
+        self.goal = goal
+        self.goal_index = self.maze.grid_index(*goal)
+
+        states = list(self.frontier)
+        self.frontier = HeapFrontier()
+        for index in states:
+            self.frontier.push(index, self._key(index))
+
+    def set_start(self, start):
+        """Change the start location. Every path cost is measured from the start,
+        so this throws away everything the planner has worked out.
+
+        Args:
+            start (Tuple[int]): New (x, y) start location
+        """
+        self.start = start
+        self._reset()
+
+    def replan(self):
+        """Find a shortest path from the start to the goal, repairing the search
+        after any changes since the last call.
+
+        Returns:
+            SearchSolution: The solution. The path is a list of (x, y) locations,
+                and nodes_visited counts the locations expanded by this call only.
+        """
+        solution = SearchSolution(self, "LPA*")
+
+        g = self.g
+        rhs = self.rhs
+        frontier = self.frontier
+        offsets = self.maze.direction_offsets
+        goal_index = self.goal_index
+
+        while len(frontier) > 0 and (frontier.min_priority() < self._key(goal_index) or
+                                     g.get(goal_index, INFINITY) != rhs.get(goal_index, INFINITY)):
+            index = frontier.pop()
+            solution.nodes_visited += 1
+
+            if g.get(index, INFINITY) > rhs.get(index, INFINITY):
+                # Overconsistent: the path cost went down, so pass it on to the neighbors
+                g[index] = rhs[index]
+                for offset in offsets:
+                    self._update(index + offset)
+            else:
+                # Underconsistent: the path cost went up, so the neighbors need to
+                # look for another way, and so does this location
+                del g[index]
+                self._update(index)
+                for offset in offsets:
+                    self._update(index + offset)
+
+        cost = g.get(goal_index, INFINITY)
+        if cost == INFINITY:
+            return solution
+
+        # Walk back from the goal, always to a neighbor one step closer to the start
+        path = [goal_index]
+        index = goal_index
+        while index != self.start_index:
+            index = min((index + offset for offset in offsets), key=lambda neighbor: g.get(neighbor, INFINITY))
+            path.append(index)
+        path.reverse()
+
+        solution.path = [self.maze.grid_location(index) for index in path]
+        solution.cost = cost
+        return solution
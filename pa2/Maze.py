@@ -1,4 +1,8 @@
-from time import sleep
+from array import array
+import mmap
+import os
+import re
+import struct
 
 # Maze.py
 #  original version by db, Fall 2017
@@ -23,47 +27,379 @@ from time import sleep
 # the command \robot x y adds a robot at a location. The first robot added
 # has index 0, and so forth.
 
+# Grid values
+WALL = ord("#")
+FLOOR = ord(".")
+
+# Distance stored in the all pairs distance table for cells that can't reach each other
+UNREACHABLE = 0xFFFF
+
+# Characters that can make up a maze row (which are also their grid values)
+_GRID_CHARACTERS = bytes([WALL, FLOOR])
+
+# Binary maze files (see Maze.write_binary): the header is the magic number, format
+# version, width, height, number of cells and number of robots
+BINARY_MAGIC = b"MAZB"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4s5I")
+BINARY_ROBOT = struct.Struct("<2i")
+
+# Added to a maze file name to get the name of its binary sidecar file
+SIDECAR_SUFFIX = ".bin"
+
+# Neighbor directions, in the order used by the cell adjacency lists
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))  # north, east, south, west
+
 class Maze:
 
     # internal structure:
-    #   self.walls: set of tuples with wall locations
+    #   self.map: list of characters, one per location (used for rendering; built lazily)
     #   self.width: number of columns
-    #   self.rows
-
-    def __init__(self, maze_input, interpret_as_file=True):
+    #   self.height: number of rows
+    #   self.grid: bytearray (or memory mapped memoryview) of WALL / FLOOR values,
+    #       with a border of walls all the way around so that neighbors never need
+    #       bounds checks. Rows are stored top row first; use grid_index() to find
+    #       a location.
+    #   self.padded_width: width of a grid row, including the border
+    #   self.direction_offsets: grid index offset for each of DIRECTIONS
+    #
+    # Floor locations are also numbered with integer cell ids (0 .. num_cells - 1):
+    #   self.cell_ids: cell id of each grid index (-1 for walls)
+    #   self.cell_indices: grid index of each cell id
+    #   self.neighbor_offsets, self.neighbor_ids: adjacency of the cells in
+    #       compressed sparse row form. The neighbors of cell i are
+    #       neighbor_ids[neighbor_offsets[i]:neighbor_offsets[i + 1]]
+    #   These are built the first time one of them is used.
+
+    def __init__(self, maze_input, interpret_as_file=True, sidecar=False):
+        """Load a maze, either from a file or from a string.
+
+        Files are read a line at a time, straight into the grid, so the whole file
+        is never in memory at once. A file can also be in the binary format written
+        by `write_binary`, which is memory mapped instead of parsed. With `sidecar`,
+        a binary copy of a text maze file is kept next to it (at the file name plus
+        SIDECAR_SUFFIX), and used instead of the text file as long as it's newer.
+
+        Args:
+            maze_input (str): File name, or the maze itself if not interpret_as_file
+            interpret_as_file (bool, optional): Whether maze_input is a file name. Defaults to True.
+            sidecar (bool, optional): Whether to use (and write) a binary sidecar file. Defaults to False.
+        """
 
         self.robotloc = []
 
-        inputlines = []
+        # distance maps computed by distance_map(), by goal location
+        self._distance_maps = {}
+        self._all_pairs_distances = None
+        self._map = None
 
-        if interpret_as_file:
-            # read the maze file into a list of strings
-            with open(maze_input) as f:
-                inputlines = f.readlines()
-        else:
-            inputlines = maze_input.splitlines()
+        # number of changes made by set_floor, for spotting caches of an old layout
+        self.version = 0
+
+        if not interpret_as_file:
+            self._parse(line.encode() for line in maze_input.splitlines())
+            return
+
+        sidecar_file = maze_input + SIDECAR_SUFFIX
+        if sidecar and os.path.exists(sidecar_file) and \
+                os.path.getmtime(sidecar_file) >= os.path.getmtime(maze_input):
+            self._load_binary(sidecar_file)
+            return
+
+        with open(maze_input, "rb") as f:
+            if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+                binary = True
+            else:
+                binary = False
+                f.seek(0)
+                self._parse(f)
+
+        if binary:
+            self._load_binary(maze_input)
+        elif sidecar:
+            self.write_binary(sidecar_file)
+
+    def _parse(self, inputlines):
+        # Rows go straight into the grid as they're read. The grid has a border
+        # row at the top, and the one at the bottom is added once the height is known.
+        grid = None
 
-        
-        lines = []
         for line in inputlines:
             line = line.strip()
             # ignore blank limes
             if len(line) == 0:
                 pass
-            elif line[0] == "\\":
-                #print("command")
+            elif line[0] == ord("\\"):
                 # there's only one command, \robot, so assume it is that
                 parms = line.split()
                 x = int(parms[1])
                 y = int(parms[2])
                 self.robotloc.append((x, y))
             else:
-                lines.append(line)
-
-        self.width = len(lines[0])
-        self.height = len(lines)
+                if grid is None:
+                    self.width = len(line)
+                    self.height = 0
+                    self._set_padded_width()
+                    grid = bytearray([WALL]) * self.padded_width
+                elif len(line) != self.width:
+                    raise ValueError("maze row {} has {} columns instead of {}".format(
+                        self.height, len(line), self.width))
+
+                unknown = line.translate(None, _GRID_CHARACTERS)
+                if len(unknown) > 0:
+                    raise ValueError("maze row {} has unknown character {!r}".format(
+                        self.height, chr(unknown[0])))
+
+                grid.append(WALL)
+                grid += line
+                grid.append(WALL)
+                self.height += 1
+
+        if grid is None:
+            raise ValueError("maze has no rows")
+
+        grid += bytes([WALL]) * self.padded_width
+        self.grid = grid
+        self._num_cells = grid.count(FLOOR)
+
+    def _set_padded_width(self):
+        self.padded_width = self.width + 2
+        self.direction_offsets = tuple(dx - dy * self.padded_width for (dx, dy) in DIRECTIONS)
+
+    def write_binary(self, filename):
+        """Write the maze out in a binary format that loads without any parsing: a
+        header (see BINARY_HEADER) followed by the robot locations, as pairs of 32
+        bit ints, and then the grid, border and all. Loading one (just pass its
+        file name to Maze) memory maps the grid, so only the parts of it that get
+        used are read in.
+
+        Args:
+            filename (str): File to write the maze to
+        """
+        with open(filename, "wb") as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, self.width, self.height,
+                                       self.num_cells, len(self.robotloc)))
+            for (x, y) in self.robotloc:
+                f.write(BINARY_ROBOT.pack(x, y))
+            f.write(self.grid)
+
+    def _load_binary(self, filename):
+        with open(filename, "rb") as f:
+            # Copy on write, so the maze can still be changed without changing the file
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        (magic, version, self.width, self.height, self._num_cells, num_robots) = \
+            BINARY_HEADER.unpack_from(data)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError("{} is not a version {} binary maze file".format(filename, BINARY_VERSION))
+
+        offset = BINARY_HEADER.size
+        for _ in range(num_robots):
+            self.robotloc.append(BINARY_ROBOT.unpack_from(data, offset))
+            offset += BINARY_ROBOT.size
+
+        self._set_padded_width()
+        self.grid = memoryview(data)[offset:offset + self.padded_width * (self.height + 2)]
+
+    # The cell tables take several times as much memory as the grid, so they're
+    # only built the first time one of them is used (after which they're ordinary
+    # attributes, and this isn't called for them again)
+    def __getattr__(self, name):
+        if name in ("cell_ids", "cell_indices", "neighbor_offsets", "neighbor_ids"):
+            self._build_cells()
+            return self.__dict__[name]
+        raise AttributeError("'Maze' object has no attribute '{}'".format(name))
+
+    def _build_cells(self):
+        grid = self.grid
+
+        cell_ids = array('i', [-1]) * len(grid)
+        cell_indices = array('i', (match.start() for match in re.finditer(b"[.]", grid)))
+        for (cell, index) in enumerate(cell_indices):
+            cell_ids[index] = cell
+
+        neighbor_offsets = array('i', [0])
+        neighbor_ids = array('i')
+        for index in cell_indices:
+            for offset in self.direction_offsets:
+                neighbor = cell_ids[index + offset]
+                if neighbor != -1:
+                    neighbor_ids.append(neighbor)
+            neighbor_offsets.append(len(neighbor_ids))
+
+        self.cell_ids = cell_ids
+        self.cell_indices = cell_indices
+        self.neighbor_offsets = neighbor_offsets
+        self.neighbor_ids = neighbor_ids
+
+    def set_floor(self, x, y, floor=True):
+        """Change a location into a floor or a wall. Everything worked out from the
+        old layout (the cell tables, distance maps and the all pairs distance
+        table) is thrown away, to be rebuilt when it's next used, and `version` goes
+        up by one so that caches kept elsewhere (like JPS+ tables and the distance
+        maps of MazeworldProblem) can tell they're out of date.
+
+        Args:
+            x (int): x coordinate of the location
+            y (int): y coordinate of the location
+            floor (bool, optional): Whether the location should be a floor. Defaults to True.
+
+        Returns:
+            bool: Whether the location changed
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError("({}, {}) is outside the maze".format(x, y))
+
+        index = self.grid_index(x, y)
+        value = FLOOR if floor else WALL
+        if self.grid[index] == value:
+            return False
 
-        self.map = list("".join(lines))
+        self.grid[index] = value
+        self._num_cells += 1 if floor else -1
+        if self._map is not None:
+            self._map[self.index(x, y)] = chr(value)
+
+        # cell ids are numbered in grid order, so adding or removing one renumbers the rest
+        for name in ("cell_ids", "cell_indices", "neighbor_offsets", "neighbor_ids"):
+            self.__dict__.pop(name, None)
+        self._distance_maps = {}
+        self._all_pairs_distances = None
+
+        self.version += 1
+        return True
+
+    @property
+    def num_cells(self):
+        return self._num_cells
+
+    # list of characters, one per location (used for rendering). Built from the
+    # grid the first time it's needed.
+    @property
+    def map(self):
+        if self._map is None:
+            self._map = []
+            for row in range(1, self.height + 1):
+                start = row * self.padded_width + 1
+                self._map.extend(bytes(self.grid[start:start + self.width]).decode("ascii"))
+        return self._map
+
+    # index of a location in self.grid. Locations just outside the
+    # maze map onto the wall border.
+    def grid_index(self, x, y):
+        return (self.height - y) * self.padded_width + x + 1
+
+    def grid_location(self, index):
+        (row, column) = divmod(index, self.padded_width)
+        return (column - 1, self.height - row)
+
+    # cell id of a location, or -1 if it is not a floor
+    def cell_at(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cell_ids[(self.height - y) * self.padded_width + x + 1]
+        return -1
+
+    def cell_location(self, cell):
+        return self.grid_location(self.cell_indices[cell])
+
+    def cell_neighbors(self, cell):
+        return self.neighbor_ids[self.neighbor_offsets[cell]:self.neighbor_offsets[cell + 1]]
+
+    def distance_map(self, goal):
+        """Shortest distance from every cell to the goal location, found by a
+        breadth first search out from the goal. The result is cached, so later
+        calls with the same goal cost only a dictionary lookup.
+
+        Args:
+            goal (Tuple[int]): (x, y) location to find distances to
+
+        Returns:
+            array: Distance to the goal for each cell id (-1 if the cell can't reach the goal)
+        """
+        if goal in self._distance_maps:
+            return self._distance_maps[goal]
+
+        distances = array('i', [-1]) * self.num_cells
+        goal_cell = self.cell_at(*goal)
+
+        if goal_cell != -1:
+            distances[goal_cell] = 0
+            layer = [goal_cell]
+            distance = 0
+            while len(layer) > 0:
+                distance += 1
+                next_layer = []
+                for cell in layer:
+                    for neighbor in self.cell_neighbors(cell):
+                        if distances[neighbor] == -1:
+                            distances[neighbor] = distance
+                            next_layer.append(neighbor)
+                layer = next_layer
+
+        self._distance_maps[goal] = distances
+        return distances
+
+    def all_pairs_distances(self, filename=None):
+        """Shortest distance between every pair of cells, found by a breadth first
+        search out from each cell. The table is a flat array of 16 bit unsigned ints,
+        where the distance between cells a and b is at `a * num_cells + b`, and is 
+        UNREACHABLE if there's no path. The result is cached.
+
+        For big mazes, the table can be stored in a file instead of memory: if
+        `filename` is given, the table is written there and memory mapped.
+
+        Args:
+            filename (str, optional): File to store the table in. Defaults to None.
+
+        Returns:
+            array or memoryview: The distance table
+        """
+        if self._all_pairs_distances is not None:
+            return self._all_pairs_distances
+
+        num_cells = self.num_cells
+        if num_cells >= UNREACHABLE:
+            raise ValueError("maze has {} cells, too many for 16 bit distances".format(num_cells))
+
+        row = array('H', [UNREACHABLE]) * num_cells
+
+        if filename is None:
+            table = array('H')
+            table_file = None
+        else:
+            table_file = open(filename, "w+b")
+
+        try:
+            for source in range(num_cells):
+                distances = array('H', row)
+                distances[source] = 0
+                layer = [source]
+                distance = 0
+                while len(layer) > 0:
+                    distance += 1
+                    next_layer = []
+                    for cell in layer:
+                        for neighbor in self.cell_neighbors(cell):
+                            if distances[neighbor] == UNREACHABLE:
+                                distances[neighbor] = distance
+                                next_layer.append(neighbor)
+                    layer = next_layer
+
+                if table_file is None:
+                    table.extend(distances)
+                else:
+                    distances.tofile(table_file)
+
+            if table_file is not None:
+                table_file.flush()
+                table = memoryview(mmap.mmap(table_file.fileno(), 0)).cast('H')
+        finally:
+            # The memory map stays valid after the file is closed
+            if table_file is not None:
+                table_file.close()
+
+        self._all_pairs_distances = table
+        return table
 
 
     def index(self, x, y):
@@ -72,12 +408,9 @@ class Maze:
 
     # returns True if the location is a floor
     def is_floor(self, x, y):
-        if x < 0 or x >= self.width:
-            return False
-        if y < 0 or y >= self.height:
-            return False
-
-        return self.map[self.index(x, y)] == "."
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.grid[(self.height - y) * self.padded_width + x + 1] == FLOOR
+        return False
 
 
     def has_robot(self, x, y):
@@ -122,14 +455,11 @@ class Maze:
         
     
     def _construct_from_renderlist(self, renderlist):
-        s = ""
-        for y in range(self.height - 1, -1, -1):
-            for x in range(self.width):
-                s += renderlist[self.index(x, y)]
-
-            s += "\n"
-
-        return s
+        # the renderlist is already in printing order (top row first), so
+        #  it only needs splitting into lines
+        text = "".join(renderlist)
+        width = self.width
+        return "".join(text[start:start + width] + "\n" for start in range(0, len(text), width))
     
     def string_with_goals(self, goal_list):
 
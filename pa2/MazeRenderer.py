@@ -0,0 +1,115 @@
+import sys
+from itertools import repeat
+from time import sleep
+
+# Terminal escape codes used for animation
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE = "\x1b[K"
+
+def move_cursor(row, column):
+    """Escape code to move the terminal cursor to a (1-based) row and column"""
+    return "\x1b[{};{}H".format(row, column)
+
+
+class MazeRenderer:
+    """Draws a maze with characters (robots, goals, belief state locations, ...)
+    overlaid on it, for printing and animating paths. The rows of the drawing are
+    kept between frames, and only the cells whose overlay changed are redrawn, so
+    each frame costs time in proportion to how much it changed rather than to the
+    size of the maze.
+
+    An overlay is a dict from (x, y) locations to the character to draw there.
+    """
+
+    def __init__(self, maze):
+        self.maze = maze
+
+        # The map, one bytearray per row, top row first
+        width = maze.width
+        text = "".join(maze.map).encode("ascii")
+        self.rows = [bytearray(text[start:start + width]) for start in range(0, len(text), width)]
+
+        # The overlay currently drawn over the map
+        self.overlay = {}
+
+    def update(self, overlay):
+        """Change the drawing to show a different overlay.
+
+        Args:
+            overlay (Dict[Tuple[int], str]): Character to draw at each location
+
+        Returns:
+            List[Tuple[int]]: The locations that changed
+        """
+        changed = [location for (location, char) in overlay.items() if self.overlay.get(location) != char]
+        changed.extend(location for location in self.overlay if location not in overlay)
+
+        height = self.maze.height
+        for location in changed:
+            (x, y) = location
+            char = overlay.get(location)
+            if char is None:
+                char = self.maze.map[self.maze.index(x, y)]
+            self.rows[height - y - 1][x] = ord(char)
+
+        self.overlay = dict(overlay)
+        return changed
+
+    def render(self, overlay=None):
+        """The whole drawing as a string, in the same format as str(maze).
+
+        Args:
+            overlay (Dict[Tuple[int], str], optional): Overlay to show. Defaults to the current one.
+
+        Returns:
+            str: One line per row of the maze, top row first
+        """
+        if overlay is not None:
+            self.update(overlay)
+        return (b"\n".join(self.rows) + b"\n").decode("ascii")
+
+    def diff(self, overlay):
+        """Terminal escape codes that redraw a drawing of the current overlay
+        (starting from the top left of the terminal) to show a new one.
+
+        Args:
+            overlay (Dict[Tuple[int], str]): Overlay to show
+
+        Returns:
+            str: Escape codes and characters to print, leaving the cursor below the maze
+        """
+        height = self.maze.height
+        parts = []
+        for (x, y) in self.update(overlay):
+            parts.append(move_cursor(height - y, x + 1))
+            parts.append(chr(self.rows[height - y - 1][x]))
+        parts.append(move_cursor(height + 1, 1))
+        return "".join(parts)
+
+    def animate(self, overlays, captions=None, delay=0, out=None):
+        """Animate a sequence of overlays in the terminal. The first frame is drawn
+        in full, and each one after it by printing its `diff`, in a single write.
+
+        Args:
+            overlays (Iterable[Dict[Tuple[int], str]]): Overlay of each frame
+            captions (Iterable[str], optional): Line to print under each frame. Defaults to None.
+            delay (float, optional): Seconds to wait after each frame. Defaults to 0.
+            out (file, optional): Where to write the frames. Defaults to sys.stdout.
+        """
+        if out is None:
+            out = sys.stdout
+        if captions is None:
+            captions = repeat("")
+
+        first = True
+        for (overlay, caption) in zip(overlays, captions):
+            if first:
+                frame = CLEAR_SCREEN + self.render(overlay)
+                first = False
+            else:
+                frame = self.diff(overlay)
+
+            out.write(frame + CLEAR_LINE + caption + "\n")
+            out.flush()
+            if delay > 0:
+                sleep(delay)
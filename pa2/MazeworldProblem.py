@@ -1,27 +1,93 @@
-from Maze import Maze
-from time import sleep
+from Maze import Maze, robotchar, goalchar
+from MazeRenderer import MazeRenderer
 import functools
 
+# Moves available to the robot whose turn it is: (dx, dy, transition cost)
+MOVES = (
+    (0, 0,  0), # stay still
+    (0, 1,  1), # north
+    (1, 0,  1), # east
+    (0, -1, 1), # south
+    (-1, 0, 1)  # west
+)
+
+# Layout of the packed state key. Each robot gets a field holding its biased x and y
+# coordinates (so that negative coordinates pack too), above the bits holding the turn.
+TURN_BITS = 8
+COORDINATE_BITS = 16
+ROBOT_BITS = 2 * COORDINATE_BITS
+COORDINATE_BIAS = 1 << (COORDINATE_BITS - 1)
+
+
+def pack_positions(robot_positions):
+    """Pack robot locations into an int, one ROBOT_BITS field per robot (the
+    first robot in the lowest bits) holding its biased x and y coordinates"""
+    packed = 0
+    for (i, (x, y)) in enumerate(robot_positions):
+        packed |= ((x + COORDINATE_BIAS) << COORDINATE_BITS | (y + COORDINATE_BIAS)) << (ROBOT_BITS * i)
+    return packed
+
+
 class MazeworldProblemState:
+    """Robot locations and whose turn it is, packed into a single int `key`: the
+    robots' fields (see `pack_positions`) above TURN_BITS bits holding the turn.
+    The key is what hashing and equality use (the hash is computed once, up front),
+    and `make_state_with_move` updates it for the one robot that moved instead of
+    copying every robot. `robot_positions` is decoded from the key when it's asked for.
+
+    The `_cached_*` slots hold heuristic values, filled in by the MazeworldProblem
+    whose cache token is recorded in `_cached_problem` (see
+    `MazeworldProblem.get_successors`).
+    """
+
+    __slots__ = ("key", "num_robots", "_hash",
+                 "_cached_problem", "_cached_manhattan", "_cached_true_distance")
 
     def __init__(self, robot_positions, turn):
-        self.robot_positions = tuple(robot_positions)
-        self.turn = turn
-        assert 0 <= self.turn < len(robot_positions)
-    
+        assert 0 <= turn < len(robot_positions) < (1 << TURN_BITS)
+
+        self.num_robots = len(robot_positions)
+        self._set_key(pack_positions(robot_positions) << TURN_BITS | turn)
+
+    def _set_key(self, key):
+        self.key = key
+        self._hash = hash(key)
+        self._cached_problem = None
+        self._cached_manhattan = None
+        self._cached_true_distance = None
+
+    @property
+    def turn(self):
+        return self.key & ((1 << TURN_BITS) - 1)
+
+    def robot_position(self, robot):
+        """Location of a single robot, without decoding the others"""
+        field = self.key >> (ROBOT_BITS * robot + TURN_BITS)
+        mask = (1 << COORDINATE_BITS) - 1
+        return ((field >> COORDINATE_BITS & mask) - COORDINATE_BIAS, (field & mask) - COORDINATE_BIAS)
+
+    @property
+    def robot_positions(self):
+        return tuple(self.robot_position(robot) for robot in range(self.num_robots))
+
     def make_state_with_move(self, move):
         
         (dx, dy, _) = move
-        (rx, ry) = self.robot_positions[self.turn]
+        turn = self.key & ((1 << TURN_BITS) - 1)
+        next_turn = (turn + 1) % self.num_robots
 
-        next_robot_locs = list(self.robot_positions)
-        next_robot_locs[self.turn] = (rx + dx, ry + dy)
-        next_turn = (self.turn + 1) % len(next_robot_locs)
-        
-        return MazeworldProblemState(next_robot_locs, next_turn)
+        # The moved robot's field is (x + bias) * 2^16 + (y + bias), so moving it 
+        # just adds to the key (as long as the coordinates stay in range)
+        shift = ROBOT_BITS * turn + TURN_BITS
+        key = self.key + (((dx << COORDINATE_BITS) + dy) << shift) - turn + next_turn
+
+        next_state = MazeworldProblemState.__new__(MazeworldProblemState)
+        next_state.num_robots = self.num_robots
+        next_state._set_key(key)
+        return next_state
     
     def __hash__(self):
-        return (self.robot_positions, self.turn).__hash__()
+        return self._hash
 
     def __str__(self):
         return str({
@@ -33,98 +99,184 @@ class MazeworldProblemState:
         return str(self)
 
     def __eq__(self, o):
-        return self.robot_positions == o.robot_positions and self.turn == o.turn
+        if not isinstance(o, MazeworldProblemState):
+            return NotImplemented
+        return self.key == o.key and self.num_robots == o.num_robots
 
 
 class MazeworldProblem:
 
-    def __init__(self, maze, goal_locations):
-        self.goal_locations = tuple(goal_locations)
+    def __init__(self, maze, goal_locations, start_locations=None):
+        self.goal_locations = tuple(tuple(goal) for goal in goal_locations)
+        self._packed_goal = pack_positions(self.goal_locations)
 
-        # State is represented as a list of robot location tuples
-        self.start_state = MazeworldProblemState(maze.robotloc, 0)
+        # State is represented as a list of robot location tuples. Robots start
+        # where the maze puts them, unless other start locations are given
+        if start_locations is None:
+            start_locations = maze.robotloc
+        self.start_state = MazeworldProblemState(start_locations, 0)
         self.maze = maze
+
+        # Distance maps to each robot's goal, built the first time they're needed
+        self._goal_distance_maps = None
+
+        # Heuristic values cached in states are tagged with this token. It's replaced
+        # (and the distance maps dropped) when the maze changes, so that nothing
+        # worked out from the old layout gets used.
+        self._cache_token = object()
+        self._maze_version = maze.version
         
     def __str__(self):
         string =  "Mazeworld problem:\n" + self.maze.string_with_goals(self.goal_locations)
         return string
 
-        # given a sequence of states (including robot turn), modify the maze and print it out.
-        #  (Be careful, this does modify the maze!)
-    def animate_path(self, path):
-        # reset the robot locations in the maze
-        self.maze.robotloc = tuple(self.start_state.robot_positions)
+    def animate_path(self, path, delay=0.25):
+        """Animate a sequence of states in the terminal, with the goals marked.
+        Only the robots that moved are redrawn between frames.
 
-        for i in range(len(path)):
-            state = path[i]
-            print("Move", i, str(self))
-            self.maze.robotloc = state.robot_positions
-            sleep(0.25)
+        Args:
+            path (List[MazeworldProblemState]): States to show, in order
+            delay (float, optional): Seconds to show each state for. Defaults to 0.25.
+        """
+        goal_overlay = {location: goalchar(i) for (i, location) in enumerate(self.goal_locations)}
+
+        def overlays():
+            for state in path:
+                overlay = {location: robotchar(i) for (i, location) in enumerate(state.robot_positions)}
+                # goals are drawn over the robots, like in string_with_goals
+                overlay.update(goal_overlay)
+                yield overlay
 
-            # print(str(self.maze))
+        captions = ("Move " + str(i) for i in range(len(path)))
+        MazeRenderer(self.maze).animate(overlays(), captions, delay)
 
     def get_successors(self, state):
 
-        potential_moves = (
-            (0, 0,  0), # stay still (0.1 transition cost)
-            (0, 1,  1), # north (1 transition cost)
-            (1, 0,  1), # east (1 transition cost)
-            (0, -1, 1), # south (1 transition cost)
-            (-1, 0, 1)  # west (1 transition cost)
-        )
+        # Only the robot whose turn it is moves, so (as long as the state itself 
+        # is legal) it's the only one that needs checking against the walls and
+        # the other robots
+        turn = state.turn
+        (rx, ry) = state.robot_position(turn)
+        occupied = set(state.robot_positions)
+
+        # Heuristic values of the successors can be updated from this state's 
+        # values, by the change in the moved robot's distance to its goal
+        self._check_maze_version()
+        cached = state._cached_problem is self._cache_token
+        if cached:
+            (gx, gy) = self.goal_locations[turn]
+            manhattan = state._cached_manhattan
+            true_distance = state._cached_true_distance
+            if true_distance == float("inf"):
+                # Moving a robot that can't reach its goal (or is in a wall) might
+                # change that, so successors work their distances out from scratch
+                true_distance = None
+            elif true_distance is not None:
+                distance_map = self._goal_distance_maps[turn]
+                true_distance -= distance_map[self.maze.cell_at(rx, ry)]
+
+        successors = []
+        for move in MOVES:
+            (dx, dy, tcost) = move
+            (x, y) = (rx + dx, ry + dy)
+
+            if (dx != 0 or dy != 0) and ((x, y) in occupied or not self.maze.is_floor(x, y)):
+                continue
 
-        # blindly generate next states
-        successors = [
-            (move[2], state.make_state_with_move(move)) for move in potential_moves
-        ]
+            next_state = state.make_state_with_move(move)
 
-        # filter to those that are valid
-        successors = [
-            (tcost, state) for (tcost, state) in successors if self.is_legal(state)
-        ]
+            if cached:
+                next_state._cached_problem = self._cache_token
+                if manhattan is not None:
+                    next_state._cached_manhattan = manhattan + \
+                        abs(x - gx) + abs(y - gy) - abs(rx - gx) - abs(ry - gy)
+                if true_distance is not None:
+                    next_state._cached_true_distance = true_distance + distance_map[self.maze.cell_at(x, y)]
 
+            # successors is a list of tuples in the form of (transition cost, succession state)
+            successors.append((tcost, next_state))
         
         return successors
 
     def is_legal(self, state):
 
-        # for every robot
-        for i in range(len(state.robot_positions)):
-            (rx, ry) = state.robot_positions[i]
+        occupied = set()
+        for (rx, ry) in state.robot_positions:
 
             # make sure it's not hitting a wall
             if not self.maze.is_floor(rx, ry):
                 return False
 
             # make sure it doesn't collide with any other robot
-            for j in range(i + 1, len(state.robot_positions) - i):
-
-                if rx == state.robot_positions[j][0] and ry == state.robot_positions[j][1]:
-                    return False
+            if (rx, ry) in occupied:
+                return False
+            occupied.add((rx, ry))
                 
         return True
 
+    def get_predecessors(self, state):
+        """States that have `state` as a successor (for searching backwards from
+        the goal), with the cost of the move between them. The robot that moved
+        last is the one before the robot whose turn it is.
+
+        Args:
+            state (MazeworldProblemState): A legal state
+
+        Returns:
+            List[Tuple]: (transition cost, predecessor state) pairs
+        """
+        robot = (state.turn - 1) % state.num_robots
+        (rx, ry) = state.robot_position(robot)
+        robot_positions = list(state.robot_positions)
+        occupied = set(robot_positions)
+
+        predecessors = []
+        for (dx, dy, tcost) in MOVES:
+            # The robot came from the opposite direction of the move
+            (x, y) = (rx - dx, ry - dy)
+            if (dx != 0 or dy != 0) and ((x, y) in occupied or not self.maze.is_floor(x, y)):
+                continue
+
+            robot_positions[robot] = (x, y)
+            predecessors.append((tcost, MazeworldProblemState(robot_positions, robot)))
+
+        return predecessors
+
     def is_goal(self, state):
-        
-        assert len(self.goal_locations) == len(state.robot_positions)
-        
-        for i in range(len(state.robot_positions)):
-            (rx, ry) = state.robot_positions[i]
-            (gx, gy) = self.goal_locations[i]
-            if rx != gx or ry != gy:
-                return False
-        
-        return True
+        return state.key >> TURN_BITS == self._packed_goal and state.num_robots == len(self.goal_locations)
+
+    def goal_states(self):
+        """Every goal state: the robots at their goals, with any robot's turn"""
+        return [MazeworldProblemState(self.goal_locations, turn) for turn in range(len(self.goal_locations))]
     
+    def _check_maze_version(self):
+        """Forget cached distances and heuristic values if the maze has changed since they were worked out"""
+        if self._maze_version != self.maze.version:
+            self._maze_version = self.maze.version
+            self._cache_token = object()
+            self._goal_distance_maps = None
+
+    def _cache_heuristics(self, state):
+        """Start caching heuristic values in a state (clearing any cached by another problem)"""
+        if state._cached_problem is not self._cache_token:
+            state._cached_problem = self._cache_token
+            state._cached_manhattan = None
+            state._cached_true_distance = None
+
     def manhattan_heuristic(self, state: MazeworldProblemState):
         """Estimates cost to get to goal_state using the sum of 
-        manhattan distances between current robot locations and their goals
+        manhattan distances between current robot locations and their goals.
+        The value is cached in the state, and successors get theirs by updating
+        it for the robot that moved (see `get_successors`).
 
         Args:
             state (MazeworldProblemState): Problem state to return heuristic for
         Returns:
             int: Estimated remaining path cost
         """
+        if state._cached_problem is self._cache_token and state._cached_manhattan is not None:
+            return state._cached_manhattan
+
         estimate = 0
 
         for i in range(len(state.robot_positions)):
@@ -132,6 +284,61 @@ class MazeworldProblem:
             (gx, gy) = self.goal_locations[i]
             estimate += abs(rx - gx) + abs(ry - gy)
         
+        self._cache_heuristics(state)
+        state._cached_manhattan = estimate
+        return estimate
+
+    def true_distance_heuristic(self, state: MazeworldProblemState):
+        """Estimates cost to get to goal_state using the sum of the true
+        (shortest path) distances between current robot locations and their goals, 
+        taking walls into account. Other robots are ignored, so it never
+        overestimates. The distances come from the maze's cached distance maps.
+        Cached and updated the same way as `manhattan_heuristic`.
+
+        Args:
+            state (MazeworldProblemState): Problem state to return heuristic for
+        Returns:
+            float: Estimated remaining path cost (infinite if a robot can't reach its goal)
+        """
+        self._check_maze_version()
+        if self._goal_distance_maps is None:
+            self._goal_distance_maps = [self.maze.distance_map(goal) for goal in self.goal_locations]
+
+        if state._cached_problem is self._cache_token and state._cached_true_distance is not None:
+            return state._cached_true_distance
+
+        estimate = 0
+
+        for i in range(len(state.robot_positions)):
+            (rx, ry) = state.robot_positions[i]
+            # Robots in a wall (with no cell) can't reach their goals either
+            cell = self.maze.cell_at(rx, ry)
+            distance = -1 if cell == -1 else self._goal_distance_maps[i][cell]
+            if distance == -1:
+                estimate = float("inf")
+                break
+            estimate += distance
+
+        self._cache_heuristics(state)
+        state._cached_true_distance = estimate
+        return estimate
+
+    def reverse_manhattan_heuristic(self, state: MazeworldProblemState):
+        """Estimates the cost to get back to the start state (for searching backwards
+        from the goal) using the sum of manhattan distances between current robot 
+        locations and their start locations
+
+        Args:
+            state (MazeworldProblemState): Problem state to return heuristic for
+        Returns:
+            int: Estimated path cost from the start
+        """
+        estimate = 0
+
+        for (i, (sx, sy)) in enumerate(self.start_state.robot_positions):
+            (rx, ry) = state.robot_position(i)
+            estimate += abs(rx - sx) + abs(ry - sy)
+
         return estimate
 
 
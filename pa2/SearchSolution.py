@@ -6,6 +6,9 @@ class SearchSolution:
         self.nodes_visited = 0
         self.cost = 0
 
+        # Only set when the search was given a SearchStats to record in
+        self.stats = None
+
     def __str__(self):
         string = "----\n"
         string += "{:s}\n"
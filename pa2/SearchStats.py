@@ -0,0 +1,137 @@
+from time import perf_counter
+import json
+import sys
+
+class SearchStats:
+    """Opt-in instrumentation for a search. Pass an instance to a search
+    function's `stats` parameter to record where the search spent its time
+    and how much it stored; searches skip all of this when `stats` is None.
+
+    Time is split into phases: generating successors, testing for the goal,
+    and evaluating the heuristic (for informed searches). Counts are kept of
+    states expanded, successors generated, and successors dropped as
+    duplicates, along with the peak size of the frontier and closed list
+    (and a rough estimate of their size in bytes at that point).
+    """
+    def __init__(self):
+        self.phase_times = {
+            "successors": 0.0,
+            "goal_test": 0.0,
+            "heuristic": 0.0,
+        }
+        self.total_time = 0.0
+
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+
+        self.peak_frontier = 0
+        self.peak_frontier_bytes = 0
+        self.peak_closed = 0
+        self.peak_closed_bytes = 0
+
+        self._start_time = None
+
+    def start(self):
+        self._start_time = perf_counter()
+
+    def stop(self):
+        self.total_time += perf_counter() - self._start_time
+
+    def timed(self, phase, fn):
+        """Wrap a function so that time spent in it is added to the given phase
+
+        Args:
+            phase (str): Name of the phase to add time to
+            fn (function): Function to time
+
+        Returns:
+            function: The wrapped function
+        """
+        phase_times = self.phase_times
+        phase_times.setdefault(phase, 0.0)
+
+        def timed_fn(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                phase_times[phase] += perf_counter() - start
+
+        timed_fn.__name__ = getattr(fn, "__name__", phase)
+        return timed_fn
+
+    def instrument(self, search_problem):
+        """Wrap a search problem so that its successor generation and goal tests are timed"""
+        return _InstrumentedProblem(search_problem, self)
+
+    def record_frontier(self, frontier):
+        """Record the frontier's size, if it's the largest seen so far"""
+        if len(frontier) > self.peak_frontier:
+            self.peak_frontier = len(frontier)
+            self.peak_frontier_bytes = _approx_bytes(frontier)
+
+    def record_frontier_size(self, size, item):
+        """Record the frontier's size, for searches without a frontier container
+        (like DFS, which only holds the states along its path). The byte estimate
+        is `size` copies of `item`, not counting whatever holds them."""
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+            self.peak_frontier_bytes = size * sys.getsizeof(item)
+
+    def record_closed(self, closed):
+        """Record the closed list's size, if it's the largest seen so far"""
+        if len(closed) > self.peak_closed:
+            self.peak_closed = len(closed)
+            self.peak_closed_bytes = _approx_bytes(closed)
+
+    def as_dict(self):
+        return {
+            "total_time": self.total_time,
+            "phase_times": dict(self.phase_times),
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "peak_frontier": self.peak_frontier,
+            "peak_frontier_bytes": self.peak_frontier_bytes,
+            "peak_closed": self.peak_closed,
+            "peak_closed_bytes": self.peak_closed_bytes,
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def __str__(self):
+        return "\n".join(f"{key}: {value}" for (key, value) in self.as_dict().items())
+
+
+class _InstrumentedProblem:
+    """Search problem wrapper used by `SearchStats.instrument`. Everything
+    other than `get_successors` and `is_goal` is passed through."""
+    def __init__(self, search_problem, stats):
+        self.search_problem = search_problem
+
+        get_successors = search_problem.get_successors
+        # Build the list inside the timer, since get_successors may return a lazy iterator
+        self.get_successors = stats.timed("successors", lambda state: list(get_successors(state)))
+        self.is_goal = stats.timed("goal_test", search_problem.is_goal)
+
+    def __getattr__(self, name):
+        # Only called for missing attributes. While copying or unpickling, that
+        # includes search_problem itself (and special methods), which can't be passed on
+        if name == "search_problem" or (name.startswith("__") and name.endswith("__")):
+            raise AttributeError(name)
+        return getattr(self.search_problem, name)
+
+    def __str__(self):
+        return str(self.search_problem)
+
+
+def _approx_bytes(container):
+    """Rough memory use of a container: its own size plus that of its items,
+    estimated from the first one (nested objects are not counted)"""
+    size = sys.getsizeof(container)
+    if len(container) > 0:
+        item = next(iter(container))
+        size += len(container) * sys.getsizeof(item)
+    return size
@@ -1,66 +1,135 @@
-from Maze import Maze
-from time import sleep
+from Maze import Maze, UNREACHABLE, robotchar
+from MazeRenderer import MazeRenderer
 
 HEURISTIC_NONADMISSIBLE_WEIGHT = 1.5
 HEURISTIC_NONADMISSIBLE_CONVERGANCE_FACTOR = 1.5
 
+def belief_indices(state):
+    """Iterate through the grid indices of the locations in a belief state, 
+    lowest index first.
+
+    Args:
+        state (int): Belief state bitmask
+
+    Yields:
+        int: Grid index of each location the robot might be at
+    """
+    while state:
+        lowest_bit = state & -state
+        yield lowest_bit.bit_length() - 1
+        state ^= lowest_bit
+
+
 class SensorlessProblem:
+    """Finding a plan that gets a robot with no sensors to the goal, no matter where
+    it starts. The state is the belief state - the set of locations the robot might
+    be at - stored as an int bitmask, where bit i is set if the robot might be at
+    grid index i of the maze (see Maze.grid_index). Use `state_locations` to get
+    the (x, y) locations back out of a state.
+    """
+
+    # Moves in the order their successors are generated: north, south, east, west
+    moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]
 
     def __init__(self, maze, goal_x, goal_y):
+        if not maze.is_floor(goal_x, goal_y):
+            raise ValueError("goal ({}, {}) is not a floor location".format(goal_x, goal_y))
+
         self.goal = (goal_x, goal_y)
         self.maze = maze
 
-        # Add all possible robot locations to the starting state
-        start_state = set()
-        for x in range(maze.width):
-            for y in range(maze.height):
-                if maze.is_floor(x, y):
-                    start_state.add((x, y))
+        self.goal_state = 1 << maze.grid_index(goal_x, goal_y)
+
+        # Add all possible robot locations (every floor cell) to the starting state
+        self.start_state = self.state_from_locations(
+            maze.cell_location(cell) for cell in range(maze.num_cells))
+
+        # For each move, the grid index offset of the move, and a mask of the floor 
+        # cells the robot can move out of (the ones with a floor in that direction)
+        self.move_offsets = []
+        self.move_masks = []
+        for (dx, dy) in self.moves:
+            offset = dx - dy * maze.padded_width
+            mask = 0
+            for index in maze.cell_indices:
+                if maze.cell_ids[index + offset] != -1:
+                    mask |= 1 << index
+            self.move_offsets.append(offset)
+            self.move_masks.append(mask)
+
+        # (x, y) location of each grid index, for decoding belief states
+        self.grid_locations = [maze.grid_location(index) for index in range(len(maze.grid))]
+
+        # Memoized values of heuristic_true_composite, by belief state
+        self._true_heuristic_cache = {}
+
+        # Mask of the floor cells in each column, for finding the extent of belief states
+        self.column_masks = [0] * maze.width
+        for index in maze.cell_indices:
+            (x, _) = self.grid_locations[index]
+            self.column_masks[x] |= 1 << index
+
+    def state_from_locations(self, locations):
+        """Build a belief state out of a collection of (x, y) locations"""
+        state = 0
+        for (x, y) in locations:
+            state |= 1 << self.maze.grid_index(x, y)
+        return state
+
+    def state_locations(self, state):
+        """List the (x, y) locations in a belief state
 
-        self.start_state = self._normalize_state(start_state)
+        Args:
+            state (int): Belief state bitmask
+
+        Returns:
+            List[Tuple[int]]: Locations where the robot might be
+        """
+        return [self.grid_locations[index] for index in belief_indices(state)]
 
     def __str__(self):
         string =  "Blind robot problem: "
         return string
 
-        # given a sequence of states (including robot turn), modify the maze and print it out.
-        #  (Be careful, this does modify the maze!)
-
     @staticmethod
-    def animate_path(maze, path, goal):
-        print("Sensorless Problem")
-        for state in path:    
-            print(maze.string_sensorless(state, goal))
-            sleep(1)
+    def animate_path(maze, path, goal, delay=1):
+        """Animate a sequence of belief states in the terminal, drawn like
+        Maze.string_sensorless. Only the locations that changed are redrawn
+        between frames.
 
-    def get_successors(self, state):
+        Args:
+            maze (Maze): The maze the robot is in
+            path (List[int]): Belief states to show, in order
+            goal (Tuple[int]): (x, y) goal location
+            delay (float, optional): Seconds to show each state for. Defaults to 1.
+        """
+        base_overlay = {location: robotchar(i) for (i, location) in enumerate(maze.robotloc)}
+        base_overlay[goal] = "O"
+
+        def overlays():
+            for state in path:
+                overlay = dict(base_overlay)
+                for index in belief_indices(state):
+                    overlay[maze.grid_location(index)] = "*"
+                if overlay[goal] == "*":
+                    overlay[goal] = "0"
+                yield overlay
 
-        moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        MazeRenderer(maze).animate(overlays(), ("Sensorless Problem" for _ in path), delay)
+
+    def get_successors(self, state):
 
         successors = []
 
-        for dx, dy in moves:
-
-            # Set of locations where the robot might be next turn, if it does this move
-            next_state = set()
-            for x, y in state:
-                nx, ny = x + dx, y + dy
-
-                # The robot ran into a wall, so it doesn't move
-                if not self.maze.is_floor(nx, ny):
-                    nx = x
-                    ny = y
-
-                if (nx, ny) in next_state:
-                    # This location is already present in the next state. 
-                    # Hopefully this gets hit a lot so the robot can
-                    # figure out where it is.
-                    continue
-                
-                next_state.add((nx, ny))
-            
-            
-            next_state = self._normalize_state(next_state)
+        for (offset, mask) in zip(self.move_offsets, self.move_masks):
+
+            # Locations with a floor in the direction of the move shift over by the 
+            # move's offset. Others ran into a wall, so the robot doesn't move. If
+            # a moved location lands on one that's already there, they merge (hopefully
+            # this happens a lot so the robot can figure out where it is).
+            moving = state & mask
+            moved = moving << offset if offset > 0 else moving >> -offset
+            next_state = moved | (state ^ moving)
 
             # successors is a list of tuples in the form of (transition cost, succession state)
             successors.append((1, next_state))
@@ -70,27 +139,27 @@ class SensorlessProblem:
         return successors
 
     def is_goal(self, state):
-        if len(state) != 1:
-            return False
-        
-        return list(state)[0] == self.goal
+        return state == self.goal_state
 
-    def _normalize_state(self, state):
-        """Normalize the representation of the state so it can be
-        hashed and so the potential locations can be iterated through
+    def _column_range(self, state):
+        """Smallest and largest x of the locations in a belief state"""
+        min_x = 0
+        while not state & self.column_masks[min_x]:
+            min_x += 1
 
-        Args:
-            state (set): State to normalize
+        max_x = self.maze.width - 1
+        while not state & self.column_masks[max_x]:
+            max_x -= 1
+
+        return (min_x, max_x)
+
+    def _row_range(self, state):
+        """Smallest and largest y of the locations in a belief state"""
+        # Grid rows are stored top row first, so the highest set bit is in the bottom row
+        min_y = self.grid_locations[state.bit_length() - 1][1]
+        max_y = self.grid_locations[(state & -state).bit_length() - 1][1]
+        return (min_y, max_y)
 
-        Returns:
-            Tuple[Tuple[int]]: Tuple containing all the potential locations
-        """
-        # We sort the set of options and convert it into a tuple 
-            # so that it can be hashed and compared by the search algorithms
-        state = list(state)
-        state.sort()
-        return tuple(state)
-    
     def heuristic_convergance_distance(self, state):
         """Heuristic that calculates the maximum separation between any two 
         potential locations in the state. Logic is that we must perform at least
@@ -98,21 +167,21 @@ class SensorlessProblem:
         we can arrive at a solution.
 
         Args:
-            state (Tuple[Tuple[int]]): Problem state to calculate heuristic for
+            state (int): Problem state to calculate heuristic for
 
         Returns:
             int: Estimate of remaining path cost
         """
-        assert len(state) >= 1
+        assert state != 0
 
-        ref_x, ref_y = state[0]
-        max_x_diff = 0
-        max_y_diff = 0
+        # The reference location is the one with the smallest (x, y): the 
+        # bottom location in the leftmost column
+        (min_x, max_x) = self._column_range(state)
+        (min_y, max_y) = self._row_range(state)
+        ref_y = self._row_range(state & self.column_masks[min_x])[0]
 
-        for i in range(1, len(state)):
-            x, y = state[i]
-            max_x_diff = max(max_x_diff, abs(x - ref_x))
-            max_y_diff = max(max_y_diff, abs(y - ref_y))
+        max_x_diff = max_x - min_x
+        max_y_diff = max(ref_y - min_y, max_y - ref_y)
         
         return max_x_diff + max_y_diff
 
@@ -123,18 +192,18 @@ class SensorlessProblem:
         we can find a solution. 
 
         Args:
-            state (Tuple[Tuple[int]]): Problem state to calculate heuristic for
+            state (int): Problem state to calculate heuristic for
 
         Returns:
             int: Estimate of remaining path cost
         """
         goal_x, goal_y = self.goal
-        distance_x = 0
-        distance_y = 0
+        (min_x, max_x) = self._column_range(state)
+        (min_y, max_y) = self._row_range(state)
 
-        for x, y in state:
-            distance_x = max(distance_x, abs(goal_x - x))
-            distance_y = max(distance_y, abs(goal_y - y))
+        # The farthest locations from the goal are on the edges of the belief state
+        distance_x = max(abs(goal_x - min_x), abs(goal_x - max_x))
+        distance_y = max(abs(goal_y - min_y), abs(goal_y - max_y))
 
 
         return distance_x + distance_y
@@ -147,7 +216,7 @@ class SensorlessProblem:
         Therefore, the maximum heuristic value is returned.
 
         Args:
-            state (Tuple[Tuple[int]]): Problem state to calculate heuristic for
+            state (int): Problem state to calculate heuristic for
 
         Returns:
             int: Estimate of remaining path cost
@@ -157,6 +226,74 @@ class SensorlessProblem:
             self.heuristic_convergance_distance(state)
         ])
     
+    def heuristic_true_goal_distance(self, state):
+        """Like `heuristic_goal_distance`, but using the true (shortest path)
+        distance from each potential location to the goal, from the maze's
+        all pairs distance table, which takes walls into account.
+
+        Args:
+            state (int): Problem state to calculate heuristic for
+
+        Returns:
+            float: Estimate of remaining path cost (infinite if some location can't reach the goal)
+        """
+        table = self.maze.all_pairs_distances()
+        num_cells = self.maze.num_cells
+        cell_ids = self.maze.cell_ids
+
+        goal_row = cell_ids[self.maze.grid_index(*self.goal)] * num_cells
+        distance = max(table[goal_row + cell_ids[index]] for index in belief_indices(state))
+
+        return float("inf") if distance == UNREACHABLE else distance
+
+    def heuristic_true_convergance_distance(self, state):
+        """Like `heuristic_convergance_distance`, but using the largest true (shortest 
+        path) distance between any two potential locations. Every move takes both
+        locations at most one step along a path, so a pair that's `d` apart needs 
+        at least `ceil(d / 2)` moves to converge (unlike Manhattan distance, the true
+        distance between two locations can drop by 2 in a single move).
+
+        Args:
+            state (int): Problem state to calculate heuristic for
+
+        Returns:
+            float: Estimate of remaining path cost (infinite if some locations can't converge)
+        """
+        table = self.maze.all_pairs_distances()
+        num_cells = self.maze.num_cells
+        cells = [self.maze.cell_ids[index] for index in belief_indices(state)]
+
+        max_distance = 0
+        for i in range(len(cells) - 1):
+            row = cells[i] * num_cells
+            max_distance = max(max_distance, max(table[row + cell] for cell in cells[i + 1:]))
+
+        if max_distance == UNREACHABLE:
+            return float("inf")
+        return (max_distance + 1) // 2
+
+    def heuristic_true_composite(self, state):
+        """Composite of the true distance heuristics and `heuristic_composite`,
+        taking the maximum of them (each one is admissible, so the maximum is too).
+        Results are memoized by belief state.
+
+        Args:
+            state (int): Problem state to calculate heuristic for
+
+        Returns:
+            float: Estimate of remaining path cost
+        """
+        estimate = self._true_heuristic_cache.get(state)
+        if estimate is None:
+            estimate = max(
+                self.heuristic_true_goal_distance(state),
+                self.heuristic_true_convergance_distance(state),
+                self.heuristic_composite(state)
+            )
+            self._true_heuristic_cache[state] = estimate
+
+        return estimate
+
     def heuristic_nonadmissible_weighted(self, state, weight=HEURISTIC_NONADMISSIBLE_WEIGHT, convergence_factor=HEURISTIC_NONADMISSIBLE_CONVERGANCE_FACTOR):
         """Heuristic designed for fast, but nonoptimal solving of large problem sizes.
         By combining the two heuristics, the algorithm is incentivized to find moves that
@@ -164,10 +301,10 @@ class SensorlessProblem:
         as it can easily (and frequently does) overestimate the cost to the goal.
 
         Args:
-            state ([type]): [description]
+            state (int): Problem state to calculate heuristic for
 
         Returns:
-            [type]: [description]
+            float: Estimate of remaining path cost
         """
 
         return weight * (self.heuristic_convergance_distance(state) * convergence_factor + self.heuristic_goal_distance(state))
@@ -0,0 +1,135 @@
+from copy import copy
+from time import time
+
+from SearchSolution import SearchSolution
+from Frontier import HeapFrontier
+from astar_search import backchain
+
+def arastar_search(search_problem, heuristic_fn, weights=(3, 2, 1.5, 1.25, 1), deadline=None, callback=None):
+    """Perform an anytime repairing A* (ARA*) search. Like A* with the heuristic
+    multiplied by a weight, which finds a solution quickly (costing at most
+    `weight` times the optimal cost), then repeats with each of the smaller
+    `weights` in turn to improve on it. Each repeat picks up where the last
+    one left off: the frontier is reused (with its priorities updated for the
+    new weight), along with the costs of every state found so far, and only
+    states whose cost has improved since they were expanded are expanded again.
+
+    After each repeat, the solution's suboptimality bound is worked out: its cost
+    divided by the smallest `path cost + heuristic` of the states left to expand,
+    which no solution can cost less than (if the heuristic is admissible).
+
+    Args:
+        search_problem: The search problem to find a solution to
+        heuristic_fn (function): Estimates the remaining cost from a state
+        weights (Iterable[float], optional): Decreasing heuristic weights to search with.
+            Defaults to (3, 2, 1.5, 1.25, 1).
+        deadline (float, optional): Time (as from time.time()) to stop searching and
+            return the best solution found so far. Defaults to None (no deadline).
+        callback (function, optional): Called with a copy of each improved solution
+            (so it can be kept) and its suboptimality bound. Defaults to None.
+
+    Returns:
+        SearchSolution: The best solution found. Also has a `suboptimality_bound`
+            property (infinity if no solution was found).
+    """
+    solution = SearchSolution(search_problem, "ARA* with heuristic " + heuristic_fn.__name__)
+    solution.suboptimality_bound = float("inf")
+
+    start_state = search_problem.start_state
+
+    # Heuristic values are needed again every time the weight changes, so keep them
+    estimates = {}
+    def estimate(state):
+        if state not in estimates:
+            estimates[state] = heuristic_fn(state)
+        return estimates[state]
+
+    path_cost = {
+        start_state: 0
+    }
+    backpointers = {
+        start_state: None
+    }
+
+    # Best goal state found so far
+    goal = start_state if search_problem.is_goal(start_state) else None
+
+    # States to expand, and states whose cost improved after they were expanded
+    frontier_states = [start_state]
+    inconsistent = set()
+
+    def report(weight):
+        # The cheapest any solution could be is the lowest (unweighted) estimate of
+        # the states that are left to expand
+        lower_bound = min((path_cost[state] + estimate(state) for state in frontier_states), default=float("inf"))
+        lower_bound = min(lower_bound, min((path_cost[state] + estimate(state) for state in inconsistent), default=float("inf")))
+
+        if path_cost[goal] <= lower_bound:
+            bound = 1
+        elif lower_bound > 0:
+            bound = min(weight, path_cost[goal] / lower_bound)
+        else:
+            bound = weight
+
+        if solution.cost == path_cost[goal] and len(solution.path) > 0 and bound >= solution.suboptimality_bound:
+            return
+
+        solution.path = backchain(goal, backpointers)
+        solution.cost = path_cost[goal]
+        solution.suboptimality_bound = min(bound, solution.suboptimality_bound)
+        if callback is not None:
+            callback(copy(solution), solution.suboptimality_bound)
+
+    for weight in weights:
+        frontier = HeapFrontier()
+        for state in frontier_states:
+            frontier.push(state, path_cost[state] + weight * estimate(state))
+        for state in inconsistent:
+            frontier.push(state, path_cost[state] + weight * estimate(state))
+        inconsistent = set()
+        expanded = set()
+
+        timed_out = False
+
+        # Expand states until the best goal found is at least as good as anything
+        # left in the frontier (by weighted estimate)
+        while len(frontier) > 0 and (goal is None or frontier.min_priority() < path_cost[goal]):
+            if deadline is not None and time() >= deadline:
+                timed_out = True
+                break
+
+            state = frontier.pop()
+            expanded.add(state)
+            cost = path_cost[state]
+            solution.nodes_visited += 1
+
+            for (transition_cost, successor_state) in search_problem.get_successors(state):
+                successor_cost = cost + transition_cost
+
+                # We already found a path to the successor that's at least as fast
+                if successor_state in path_cost and successor_cost >= path_cost[successor_state]:
+                    continue
+
+                path_cost[successor_state] = successor_cost
+                backpointers[successor_state] = state
+
+                if search_problem.is_goal(successor_state) and \
+                        (goal is None or goal == successor_state or successor_cost < path_cost[goal]):
+                    goal = successor_state
+
+                # States that were already expanded with this weight wait for the next one
+                if successor_state in expanded:
+                    inconsistent.add(successor_state)
+                else:
+                    frontier.push(successor_state, successor_cost + weight * estimate(successor_state))
+
+        frontier_states = list(frontier)
+
+        # Searches cut off by the deadline don't guarantee anything about the weight
+        if goal is not None:
+            report(float("inf") if timed_out else weight)
+
+        if timed_out or goal is None and len(frontier_states) == 0:
+            break
+
+    return solution
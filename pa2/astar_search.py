@@ -1,6 +1,6 @@
 from MazeworldProblem import MazeworldProblem
 from SearchSolution import SearchSolution
-from queue import PriorityQueue
+from Frontier import HeapFrontier
 
 # take the current node, and follow its parents back
 #  as far as possible. Grab the states from the nodes,
@@ -14,13 +14,34 @@ def backchain(state, backpointers):
     result.reverse()
     return result
 
-def astar_search(search_problem: MazeworldProblem, heuristic_fn):
+def astar_search(search_problem: MazeworldProblem, heuristic_fn, stats=None, frontier=None, max_cost=None):
+    """Perform an A* search
+
+    Args:
+        search_problem (MazeworldProblem): The search problem to find a solution to
+        heuristic_fn (function): Estimates the remaining cost from a state
+        stats (SearchStats, optional): Instrumentation to record the search in. Defaults to None.
+        frontier (optional): Empty frontier to use, from Frontier.py. Defaults to a HeapFrontier.
+        max_cost (float, optional): Only look for solutions costing at most this much, 
+            pruning states whose priority is above it. Defaults to None (no limit).
+
+    Returns:
+        SearchSolution: The solution to the search
+    """
     
     solution = SearchSolution(search_problem, "Astar with heuristic " + heuristic_fn.__name__)
 
-    frontier = PriorityQueue()
-    node_age = 0
-    frontier.put((heuristic_fn(search_problem.start_state), node_age, search_problem.start_state))
+    # Optionally record where the search spends its time (see SearchStats)
+    if stats is not None:
+        search_problem = stats.instrument(search_problem)
+        heuristic_fn = stats.timed("heuristic", heuristic_fn)
+        stats.start()
+
+    # The frontier holds each state at most once, and breaks ties between nodes
+    # with even priority by age, so the oldest nodes get explored first
+    if frontier is None:
+        frontier = HeapFrontier()
+    frontier.push(search_problem.start_state, heuristic_fn(search_problem.start_state))
 
     path_cost = {
         search_problem.start_state: 0
@@ -29,9 +50,9 @@ def astar_search(search_problem: MazeworldProblem, heuristic_fn):
         search_problem.start_state: None
     }
 
-    while not frontier.empty():
+    while len(frontier) > 0:
         # Expand the next best node
-        (_, _, state) = frontier.get()
+        state = frontier.pop()
         cost = path_cost[state]
 
         # print('Expanding state: ', state)
@@ -42,22 +63,37 @@ def astar_search(search_problem: MazeworldProblem, heuristic_fn):
             solution.cost = path_cost[state]
             break
 
+        if stats is not None:
+            stats.expanded += 1
+
         # Discover new states and add them to the fringe
         for (transition_cost, successor_state) in search_problem.get_successors(state):
             successor_cost = cost + transition_cost
+            if stats is not None:
+                stats.generated += 1
 
             # We already found a faster path to the successor, so disregard it
             if successor_state in path_cost and successor_cost >= path_cost[successor_state]:
+                if stats is not None:
+                    stats.duplicates += 1
                 continue
             
+            priority = successor_cost + heuristic_fn(successor_state)
+            if max_cost is not None and priority > max_cost:
+                continue
+
             path_cost[successor_state] = successor_cost
             backpointers[successor_state] = state
 
-            # We include node_count in the priority queue tuple as a tiebreaker for selecting 
-            # nodes with even priority. This means that the oldest nodes have a preference  
-            # for getting explored first 
-            priority = successor_cost + heuristic_fn(successor_state)
-            node_age += 1
-            frontier.put( (priority, node_age, successor_state) )
-            
+            # If the successor is already in the frontier, this updates its priority
+            frontier.push(successor_state, priority)
+
+        if stats is not None:
+            stats.record_frontier(frontier)
+            stats.record_closed(path_cost)
+
+    if stats is not None:
+        stats.stop()
+        solution.stats = stats
+
     return solution
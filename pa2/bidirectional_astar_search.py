@@ -0,0 +1,109 @@
+from MazeworldProblem import MazeworldProblem
+from SearchSolution import SearchSolution
+from Frontier import HeapFrontier
+from astar_search import backchain
+
+def bidirectional_astar_search(search_problem, heuristic_fn, reverse_heuristic_fn):
+    """Perform a bidirectional A* search: one A* search forwards from the start
+    state, and another backwards from the goal states (using the problem's
+    `get_predecessors` and `goal_states`), expanding whichever side has the smaller
+    frontier. Whenever a state is reached from both sides, the path through it is
+    the best solution so far if it's the cheapest.
+
+    The search stops once the lowest priority (path cost + heuristic) on either side
+    is at least the cost of the best solution found. Each side's lowest priority
+    is a lower bound on the cost of any solution it hasn't seen yet (as long as both
+    heuristics are admissible), so the best solution is then optimal. Ties in
+    priority go to the state with the highest path cost, which is the furthest
+    along towards the other side (in open areas, many states tie).
+
+    Args:
+        search_problem: The search problem to find a solution to
+        heuristic_fn (function): Estimates the remaining cost from a state to the goal
+        reverse_heuristic_fn (function): Estimates the cost from the start state to a state
+
+    Returns:
+        SearchSolution: The solution to the search
+    """
+    solution = SearchSolution(search_problem, "Bidirectional Astar with heuristics " +
+                              heuristic_fn.__name__ + " and " + reverse_heuristic_fn.__name__)
+
+    start_state = search_problem.start_state
+
+    # Each side keeps the path cost to every state it has found (from the start, or to
+    # the goal), the state it was found from, and a frontier
+    forward = ({start_state: 0}, {start_state: None}, HeapFrontier(),
+               search_problem.get_successors, heuristic_fn)
+    backward = ({}, {}, HeapFrontier(),
+                search_problem.get_predecessors, reverse_heuristic_fn)
+
+    # Frontier priorities are (path cost + heuristic, -path cost)
+    forward[2].push(start_state, (heuristic_fn(start_state), 0))
+    for goal_state in search_problem.goal_states():
+        backward[0][goal_state] = 0
+        backward[1][goal_state] = None
+        backward[2].push(goal_state, (reverse_heuristic_fn(goal_state), 0))
+
+    # Cost of the best solution found so far, and the state where its two halves meet
+    best_cost = float("inf")
+    meeting_state = None
+    if start_state in backward[0]:
+        (best_cost, meeting_state) = (0, start_state)
+
+    while len(forward[2]) > 0 and len(backward[2]) > 0:
+        if max(forward[2].min_priority()[0], backward[2].min_priority()[0]) >= best_cost:
+            break
+
+        (side, other_side) = (forward, backward) if len(forward[2]) <= len(backward[2]) else (backward, forward)
+        (path_cost, backpointers, frontier, expand, side_heuristic_fn) = side
+        other_path_cost = other_side[0]
+
+        state = frontier.pop()
+        cost = path_cost[state]
+        solution.nodes_visited += 1
+
+        for (transition_cost, next_state) in expand(state):
+            next_cost = cost + transition_cost
+
+            # We already found a faster path to this state, so disregard it
+            if next_state in path_cost and next_cost >= path_cost[next_state]:
+                continue
+
+            path_cost[next_state] = next_cost
+            backpointers[next_state] = state
+            frontier.push(next_state, (next_cost + side_heuristic_fn(next_state), -next_cost))
+
+            # The other side has been here too, so there's a path through this state
+            if next_state in other_path_cost and next_cost + other_path_cost[next_state] < best_cost:
+                best_cost = next_cost + other_path_cost[next_state]
+                meeting_state = next_state
+
+    if meeting_state is not None:
+        # The forward half leads from the start to the meeting state, and the backward
+        # half's backpointers lead on from there to the goal
+        path = backchain(meeting_state, forward[1])
+        state = backward[1][meeting_state]
+        while state is not None:
+            path.append(state)
+            state = backward[1][state]
+
+        solution.path = path
+        solution.cost = best_cost
+
+    return solution
+
+def maze_path_search(maze, start, goal):
+    """Find a shortest path between two locations in a maze with bidirectional A*
+    (for a single robot, ignoring the robots the maze itself has)
+
+    Args:
+        maze (Maze): The maze to search
+        start (Tuple[int]): (x, y) location to start from
+        goal (Tuple[int]): (x, y) location to get to
+
+    Returns:
+        SearchSolution: The solution to the search. The path holds a single
+            robot MazeworldProblemState for each location along the way.
+    """
+    problem = MazeworldProblem(maze, [goal], start_locations=[start])
+    return bidirectional_astar_search(problem, problem.manhattan_heuristic, problem.reverse_manhattan_heuristic)
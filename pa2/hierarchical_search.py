@@ -0,0 +1,350 @@
+import weakref
+from array import array
+
+from MazeworldProblem import MazeworldProblem, MazeworldProblemState
+from SearchSolution import SearchSolution
+from astar_search import astar_search
+
+# Hierarchical pathfinding (HPA*) for single robot Mazeworld problems, for answering
+# many queries on the same big maze. The maze is split into square clusters, and
+# wherever two neighboring clusters share an opening, one or two entrance locations
+# on each side are picked as nodes of an abstract graph. Nodes on either side of
+# an entrance are joined by an edge of cost 1, and nodes in the same cluster by an
+# edge with their shortest distance inside the cluster. This abstraction is built
+# once per maze (and cluster size), and each query only has to connect its start
+# and goal to the entrances of their clusters and search the (much smaller)
+# abstract graph. Paths through the abstract graph are refined back into steps one
+# edge at a time, with a search inside a single cluster.
+#
+# Paths can only cross between clusters at the entrances, so they can be slightly
+# longer than the shortest path. Smoothing takes out some of the detours.
+
+# Openings between clusters this long or longer get an entrance at each end,
+# shorter ones a single entrance in the middle
+ENTRANCE_SPLIT_LENGTH = 6
+
+# Abstractions, by maze and then by cluster size, along with the maze version they're for
+_abstractions = weakref.WeakKeyDictionary()
+
+
+class MazeAbstraction:
+    """The abstract graph of a maze for HPA*. Nodes are grid indices (see
+    Maze.grid_index) of entrance locations, and `edges` holds the successors of
+    each node as a dict from neighbor to cost.
+    """
+
+    def __init__(self, maze, cluster_size):
+        self.maze = maze
+        self.cluster_size = cluster_size
+        self.clusters_wide = (maze.width + cluster_size - 1) // cluster_size
+
+        # Cluster number of each grid index (-1 for walls)
+        self.cluster_of = array('i', [-1]) * len(maze.grid)
+        for index in maze.cell_indices:
+            (x, y) = maze.grid_location(index)
+            self.cluster_of[index] = self.cluster_at(x, y)
+
+        # Entrance nodes in each cluster, and the abstract graph's edges
+        self.entrances = {}
+        self.edges = {}
+        self._find_entrances()
+        for (cluster, nodes) in self.entrances.items():
+            for node in nodes:
+                distances = self.cluster_distances(node)
+                for other in nodes:
+                    if other != node and other in distances:
+                        self.edges[node][other] = distances[other]
+
+        # Refined paths of abstract edges, found as they're needed
+        self._segments = {}
+
+    def cluster_at(self, x, y):
+        return (y // self.cluster_size) * self.clusters_wide + x // self.cluster_size
+
+    def _add_transition(self, a, b):
+        for (node, other) in ((a, b), (b, a)):
+            if node not in self.edges:
+                self.edges[node] = {}
+                self.entrances.setdefault(self.cluster_of[node], []).append(node)
+            self.edges[node][other] = 1
+
+    def _find_entrances(self):
+        maze = self.maze
+        size = self.cluster_size
+
+        # Openings across each vertical border (between x and x + 1), then each
+        # horizontal border (between y and y + 1). A run of side by side floors is
+        # cut short at the end of the cluster, since each cluster gets its own.
+        borders = [((x, y), (x + 1, y)) for x in range(size - 1, maze.width - 1, size) for y in range(maze.height)]
+        borders += [((x, y), (x, y + 1)) for y in range(size - 1, maze.height - 1, size) for x in range(maze.width)]
+
+        run = []
+        for (inside, outside) in borders + [(None, None)]:
+            open_border = inside is not None and maze.is_floor(*inside) and maze.is_floor(*outside)
+            if open_border and len(run) > 0 and \
+                    self.cluster_at(*inside) == self.cluster_at(*run[-1][0]) and \
+                    self.cluster_at(*outside) == self.cluster_at(*run[-1][1]) and \
+                    abs(inside[0] - run[-1][0][0]) + abs(inside[1] - run[-1][0][1]) == 1:
+                run.append((inside, outside))
+                continue
+
+            if len(run) >= ENTRANCE_SPLIT_LENGTH:
+                picks = [run[0], run[-1]]
+            elif len(run) > 0:
+                picks = [run[len(run) // 2]]
+            else:
+                picks = []
+            for (a, b) in picks:
+                self._add_transition(maze.grid_index(*a), maze.grid_index(*b))
+
+            run = [(inside, outside)] if open_border else []
+
+    def cluster_distances(self, source):
+        """Shortest distances from a location to the others in its cluster, without
+        leaving the cluster, by breadth first search
+
+        Args:
+            source (int): Grid index to start from
+
+        Returns:
+            Dict[int, int]: Distance to each reachable grid index in the cluster
+        """
+        cluster_of = self.cluster_of
+        cluster = cluster_of[source]
+        offsets = self.maze.direction_offsets
+        if cluster == -1:
+            return {}
+
+        distances = {source: 0}
+        layer = [source]
+        distance = 0
+        while len(layer) > 0:
+            distance += 1
+            next_layer = []
+            for index in layer:
+                for offset in offsets:
+                    neighbor = index + offset
+                    if cluster_of[neighbor] == cluster and neighbor not in distances:
+                        distances[neighbor] = distance
+                        next_layer.append(neighbor)
+            layer = next_layer
+
+        return distances
+
+    def _cluster_path(self, source, target):
+        """Shortest path between two locations in the same cluster, without leaving it"""
+        distances = self.cluster_distances(target)
+        cluster = self.cluster_of[target]
+        offsets = self.maze.direction_offsets
+
+        # Walk downhill from the source to the target
+        path = [source]
+        index = source
+        while index != target:
+            index = min((index + offset for offset in offsets if self.cluster_of[index + offset] == cluster),
+                        key=lambda neighbor: distances.get(neighbor, float("inf")))
+            path.append(index)
+        return path
+
+    def segment(self, a, b):
+        """The steps along an abstract edge (including both ends), as grid indices.
+        Segments between entrances are cached, so each one is only searched for
+        once (ones to or from a query's start or goal aren't, since they're
+        unlikely to come up again).
+
+        Args:
+            a (int): Grid index of the node the edge starts at
+            b (int): Grid index of the node the edge ends at
+
+        Returns:
+            List[int]: Grid indices along the edge
+        """
+        if (a, b) in self._segments:
+            return self._segments[(a, b)]
+
+        if self.cluster_of[a] == self.cluster_of[b]:
+            path = self._cluster_path(a, b)
+        else:
+            # Edges between clusters are always across an entrance
+            path = [a, b]
+
+        if a in self.edges and b in self.edges:
+            self._segments[(a, b)] = path
+        return path
+
+    def refine(self, abstract_path):
+        """Refine a path through the abstract graph into single steps, lazily: each
+        edge is only refined when the steps before it have been used up.
+
+        Args:
+            abstract_path (List[Tuple[int]]): (x, y) locations of the path's nodes
+
+        Yields:
+            Tuple[int]: (x, y) location of each step, starting with the first node
+        """
+        maze = self.maze
+        if len(abstract_path) > 0:
+            yield abstract_path[0]
+
+        indices = [maze.grid_index(x, y) for (x, y) in abstract_path]
+        for (a, b) in zip(indices, indices[1:]):
+            for index in self.segment(a, b)[1:]:
+                yield maze.grid_location(index)
+
+
+def maze_abstraction(maze, cluster_size=10):
+    """The HPA* abstraction of a maze (see MazeAbstraction), cached per maze and
+    cluster size until the maze changes.
+
+    Args:
+        maze (Maze): The maze to build an abstraction of
+        cluster_size (int, optional): Width and height of the clusters. Defaults to 10.
+
+    Returns:
+        MazeAbstraction: The abstraction
+    """
+    by_size = _abstractions.setdefault(maze, {})
+    if cluster_size in by_size:
+        (version, abstraction) = by_size[cluster_size]
+        if version == maze.version:
+            return abstraction
+
+    abstraction = MazeAbstraction(maze, cluster_size)
+    by_size[cluster_size] = (maze.version, abstraction)
+    return abstraction
+
+
+class AbstractProblem:
+    """Search problem over a maze's abstract graph, with the start and goal
+    locations added as extra nodes: the start is joined to the entrances of its
+    cluster (and to the goal, if they're in the same cluster), and the entrances
+    of the goal's cluster to the goal. The abstraction itself isn't changed.
+    States are grid indices.
+    """
+    def __init__(self, abstraction, start, goal):
+        self.abstraction = abstraction
+        maze = abstraction.maze
+        self.goal = goal
+        self.start_state = maze.grid_index(*start)
+        self.goal_index = maze.grid_index(*goal)
+
+        # Edges to and from the start and goal
+        self.extra_edges = {}
+        start_distances = abstraction.cluster_distances(self.start_state)
+        goal_distances = abstraction.cluster_distances(self.goal_index)
+
+        self.extra_edges[self.start_state] = {
+            node: start_distances[node]
+            for node in abstraction.entrances.get(abstraction.cluster_of[self.start_state], [])
+            if node in start_distances and node != self.start_state}
+        if self.goal_index in start_distances:
+            self.extra_edges[self.start_state][self.goal_index] = start_distances[self.goal_index]
+
+        for node in abstraction.entrances.get(abstraction.cluster_of[self.goal_index], []):
+            if node in goal_distances and node != self.goal_index:
+                self.extra_edges.setdefault(node, {})[self.goal_index] = goal_distances[node]
+
+    def __str__(self):
+        return "Abstract maze problem: {} to {}".format(
+            self.abstraction.maze.grid_location(self.start_state), self.goal)
+
+    def get_successors(self, state):
+        successors = [(cost, node) for (node, cost) in self.abstraction.edges.get(state, {}).items()]
+        if state in self.extra_edges:
+            successors.extend((cost, node) for (node, cost) in self.extra_edges[state].items())
+        return successors
+
+    def is_goal(self, state):
+        return state == self.goal_index
+
+    def manhattan_heuristic(self, state):
+        (x, y) = self.abstraction.maze.grid_location(state)
+        return abs(x - self.goal[0]) + abs(y - self.goal[1])
+
+
+def smooth_path(maze, path):
+    """Shorten a path of single steps by replacing detours with straight runs: from
+    each location, look along each direction for a later location on the path that
+    can be reached in a straight line in fewer steps.
+
+    Args:
+        maze (Maze): The maze the path is in
+        path (List[Tuple[int]]): (x, y) locations of each step
+
+    Returns:
+        List[Tuple[int]]: The smoothed path
+    """
+    path = list(path)
+    positions = {location: j for (j, location) in enumerate(path)}
+    i = 0
+    while i < len(path) - 1:
+        (x, y) = path[i]
+
+        # The furthest shortcut along any direction
+        best = None
+        for (dx, dy) in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            (run_x, run_y) = (x + dx, y + dy)
+            steps = 1
+            while maze.is_floor(run_x, run_y):
+                j = positions.get((run_x, run_y), -1)
+                if j - i > steps and (best is None or j - steps > best[0] - best[1]):
+                    best = (j, steps, dx, dy)
+                (run_x, run_y) = (run_x + dx, run_y + dy)
+                steps += 1
+
+        if best is not None:
+            (j, steps, dx, dy) = best
+            path[i + 1:j] = [(x + dx * k, y + dy * k) for k in range(1, steps)]
+            positions = {location: j for (j, location) in enumerate(path)}
+
+        i += 1
+
+    return path
+
+
+def hpa_search(search_problem: MazeworldProblem, cluster_size=10, refine=True, smooth=False):
+    """Solve a single robot MazeworldProblem with HPA*: A* over the maze's
+    abstract graph (see MazeAbstraction), which is built the first time it's
+    needed and then reused by every query on the same maze.
+
+    Args:
+        search_problem (MazeworldProblem): The search problem to find a solution to (with one robot)
+        cluster_size (int, optional): Width and height of the clusters. Defaults to 10.
+        refine (bool, optional): Whether to refine the path into single steps. If not,
+            the path only has a state for each node of the abstract path, which can be
+            refined later, as it's used, with MazeAbstraction.refine. Defaults to True.
+        smooth (bool, optional): Whether to smooth the refined path (with smooth_path).
+            Defaults to False.
+
+    Returns:
+        SearchSolution: The solution to the search. Also has an `abstract_path` property
+            with the (x, y) locations of the nodes of the abstract path.
+    """
+    assert len(search_problem.goal_locations) == 1, "hierarchical search only plans a single robot"
+
+    maze = search_problem.maze
+    start = search_problem.start_state.robot_position(0)
+    abstraction = maze_abstraction(maze, cluster_size)
+    abstract_problem = AbstractProblem(abstraction, start, search_problem.goal_locations[0])
+
+    solution = SearchSolution(search_problem, "HPA* with " + str(cluster_size) + " wide clusters")
+    solution.abstract_path = []
+    result = astar_search(abstract_problem, abstract_problem.manhattan_heuristic)
+    solution.nodes_visited = result.nodes_visited
+
+    if len(result.path) == 0:
+        return solution
+
+    solution.abstract_path = [maze.grid_location(index) for index in result.path]
+    if not refine and not smooth:
+        solution.path = [MazeworldProblemState([location], 0) for location in solution.abstract_path]
+        solution.cost = result.cost
+        return solution
+
+    locations = list(abstraction.refine(solution.abstract_path))
+    if smooth:
+        locations = smooth_path(maze, locations)
+
+    solution.path = [MazeworldProblemState([location], 0) for location in locations]
+    solution.cost = len(locations) - 1
+    return solution
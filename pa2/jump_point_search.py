@@ -0,0 +1,217 @@
+import weakref
+from array import array
+
+from Maze import DIRECTIONS, FLOOR
+from MazeworldProblem import MazeworldProblem, MazeworldProblemState
+from SearchSolution import SearchSolution
+from astar_search import astar_search
+
+# Jump Point Search for single robot Mazeworld problems. On a 4-connected grid with
+# unit costs, there are many equally short paths that only differ in the order
+# the moves are made, and A* expands all of them. JPS only stops (creating a node)
+# at jump points: the goal, cells next to a wall corner that opens up a new way to
+# go (a "forced neighbor"), and cells in a vertical run from which a horizontal scan
+# finds a jump point. Everything in between is skipped over.
+#
+# Directions are indexed as in DIRECTIONS (north, east, south, west), so the reverse
+# of direction d is (d + 2) % 4, and d is horizontal if it's odd.
+
+# JPS+ tables, by maze (see jps_plus_table), along with the maze version they're for
+_jps_plus_tables = weakref.WeakKeyDictionary()
+
+
+def _is_forced(grid, index, offset, side_offsets):
+    """Whether moving into `index` (by `offset`) passes a wall corner on either side"""
+    for side in side_offsets:
+        if grid[index + side] == FLOOR and grid[index - offset + side] != FLOOR:
+            return True
+    return False
+
+def jps_plus_table(maze):
+    """Precomputed jump distances for JPS+. For each cell and direction, the table
+    holds the number of steps to the next jump point in that direction, or, if
+    the robot runs into a wall first, minus the number of steps it can take
+    before the wall. Goals aren't jump points here; the search checks for them
+    when it uses the table. Tables are cached per maze, until the maze changes.
+
+    The distance for cell c in direction d is at `c * 4 + d`.
+
+    Args:
+        maze (Maze): The maze to build a table for
+
+    Returns:
+        array: The jump distance table
+    """
+    if maze in _jps_plus_tables:
+        (version, table) = _jps_plus_tables[maze]
+        if version == maze.version:
+            return table
+
+    grid = maze.grid
+    cell_ids = maze.cell_ids
+    offsets = maze.direction_offsets
+    table = array('i', [0]) * (maze.num_cells * 4)
+
+    # Horizontal directions first, since vertical jump points depend on them. Each 
+    # direction is swept so that a cell's next cell in that direction is done first.
+    for direction in (1, 3, 0, 2):
+        offset = offsets[direction]
+        side_offsets = (offsets[(direction + 1) % 4], offsets[(direction + 3) % 4])
+        indices = maze.cell_indices if offset < 0 else reversed(maze.cell_indices)
+
+        for index in indices:
+            next_index = index + offset
+            if grid[next_index] != FLOOR:
+                continue
+
+            next_cell = cell_ids[next_index]
+            is_jump_point = _is_forced(grid, next_index, offset, side_offsets)
+            if direction % 2 == 0:
+                # A vertical run stops where a horizontal scan finds a jump point
+                is_jump_point = is_jump_point or table[next_cell * 4 + 1] > 0 or table[next_cell * 4 + 3] > 0
+
+            if is_jump_point:
+                distance = 1
+            else:
+                next_distance = table[next_cell * 4 + direction]
+                distance = next_distance + 1 if next_distance > 0 else next_distance - 1
+
+            table[cell_ids[index] * 4 + direction] = distance
+
+    _jps_plus_tables[maze] = (maze.version, table)
+    return table
+
+
+class JumpPointProblem:
+    """Search problem over the jump points of a single robot maze problem. States
+    are (grid index, direction) pairs: the location, and the direction the robot
+    was going when it got there (None for the start). Successors are found by 
+    jumping in every direction except back the way the robot came, and cost the
+    number of steps jumped.
+
+    If `jps_plus` is True, jumps are looked up in the maze's JPS+ table instead
+    of scanning the grid.
+    """
+    def __init__(self, maze, start, goal, jps_plus=False):
+        self.maze = maze
+        self.goal = goal
+        self.goal_index = maze.grid_index(*goal)
+        self.start_state = (maze.grid_index(*start), None)
+        self.table = jps_plus_table(maze) if jps_plus else None
+
+    def __str__(self):
+        return "Jump point problem: {} to {}".format(self.maze.grid_location(self.start_state[0]), self.goal)
+
+    def _jump(self, index, direction):
+        """Scan from a location in a direction until reaching a jump point
+
+        Returns:
+            Tuple[int]: The jump point's grid index and its distance, or None
+                if the robot runs into a wall first
+        """
+        grid = self.maze.grid
+        offsets = self.maze.direction_offsets
+        offset = offsets[direction]
+        side_offsets = (offsets[(direction + 1) % 4], offsets[(direction + 3) % 4])
+        horizontal = direction % 2 == 1
+
+        distance = 0
+        while True:
+            index += offset
+            distance += 1
+
+            if grid[index] != FLOOR:
+                return None
+            if index == self.goal_index or _is_forced(grid, index, offset, side_offsets):
+                return (index, distance)
+
+            # Vertical runs scan sideways at each step, and stop if that finds anything
+            if not horizontal and (self._jump(index, 1) is not None or self._jump(index, 3) is not None):
+                return (index, distance)
+
+    def _jump_plus(self, index, direction):
+        """Like _jump, but looking the jump up in the JPS+ table"""
+        distance = self.table[self.maze.cell_ids[index] * 4 + direction]
+        reach = abs(distance)
+
+        # Stop at the goal if it's on the way. Vertical runs also stop on the goal's
+        # row, since a horizontal scan from there could find the goal.
+        (x, y) = self.maze.grid_location(index)
+        (goal_x, goal_y) = self.goal
+        (dx, dy) = DIRECTIONS[direction]
+        if dy == 0 and y == goal_y:
+            steps = (goal_x - x) * dx
+        elif dx == 0:
+            steps = (goal_y - y) * dy
+        else:
+            steps = 0
+
+        if 0 < steps <= reach:
+            return (index + steps * self.maze.direction_offsets[direction], steps)
+        if distance > 0:
+            return (index + distance * self.maze.direction_offsets[direction], distance)
+        return None
+
+    def get_successors(self, state):
+        (index, arrived_direction) = state
+        jump = self._jump if self.table is None else self._jump_plus
+
+        successors = []
+        for direction in range(4):
+            if arrived_direction is not None and direction == (arrived_direction + 2) % 4:
+                continue
+
+            jump_point = jump(index, direction)
+            if jump_point is not None:
+                (next_index, distance) = jump_point
+                successors.append((distance, (next_index, direction)))
+
+        return successors
+
+    def is_goal(self, state):
+        return state[0] == self.goal_index
+
+    def manhattan_heuristic(self, state):
+        (x, y) = self.maze.grid_location(state[0])
+        (goal_x, goal_y) = self.goal
+        return abs(x - goal_x) + abs(y - goal_y)
+
+
+def jump_point_search(search_problem: MazeworldProblem, jps_plus=False):
+    """Solve a single robot MazeworldProblem with Jump Point Search (A* over
+    jump points, see JumpPointProblem), optionally using a precomputed JPS+
+    table, which is worth building when there are many queries on the same maze.
+
+    Args:
+        search_problem (MazeworldProblem): The search problem to find a solution to (with one robot)
+        jps_plus (bool, optional): Whether to use the maze's JPS+ table. Defaults to False.
+
+    Returns:
+        SearchSolution: The solution to the search. The path is expanded from the
+            jump points back into a state for every step, like a path from astar_search.
+    """
+    assert len(search_problem.goal_locations) == 1, "jump point search only plans a single robot"
+
+    maze = search_problem.maze
+    start = search_problem.start_state.robot_position(0)
+    jump_problem = JumpPointProblem(maze, start, search_problem.goal_locations[0], jps_plus)
+
+    solution = SearchSolution(search_problem, "JPS+" if jps_plus else "Jump point search")
+    result = astar_search(jump_problem, jump_problem.manhattan_heuristic)
+    solution.nodes_visited = result.nodes_visited
+
+    if len(result.path) == 0:
+        return solution
+
+    # Fill in the steps between each pair of jump points (which are always in a line)
+    locations = [maze.grid_location(index) for (index, _) in result.path]
+    path = [MazeworldProblemState([start], 0)]
+    for ((x, y), (next_x, next_y)) in zip(locations, locations[1:]):
+        (dx, dy) = ((next_x > x) - (next_x < x), (next_y > y) - (next_y < y))
+        while (x, y) != (next_x, next_y):
+            (x, y) = (x + dx, y + dy)
+            path.append(MazeworldProblemState([(x, y)], 0))
+
+    solution.path = path
+    solution.cost = result.cost
+    return solution
@@ -0,0 +1,335 @@
+import heapq
+
+from SearchSolution import SearchSolution
+
+# Memory bounded alternatives to astar_search, for problems (like large Sensorless
+# belief spaces) where keeping every state A* has seen doesn't fit in memory. Both
+# take the same (search_problem, heuristic_fn) arguments as astar_search, and find
+# optimal solutions if the heuristic is admissible.
+
+
+def idastar_search(search_problem, heuristic_fn, max_table_size=100000):
+    """Perform an iterative deepening A* (IDA*) search: repeated depth first searches,
+    each cut off at nodes with `path cost + heuristic` above a bound, which starts at
+    the heuristic of the start state and goes up to the smallest value that was cut
+    off in the last search. The current path is stored on an explicit stack (so deep
+    paths don't hit the recursion limit), and states already on the path are skipped
+    to avoid cycles.
+
+    In graphs with many paths to the same states (like the multi-robot mazeworld,
+    where robots can move in any order), each depth first search would otherwise
+    explore every one of them. So each search also keeps a transposition table of
+    the cheapest path cost it has reached states with, and skips states it reaches
+    again at no lower cost, since everything below them has already been searched
+    with at least as much of the bound left. The table holds at most
+    `max_table_size` states, and once it's full, states that aren't in it are
+    searched as if it wasn't there.
+
+    Args:
+        search_problem: The search problem to find a solution to
+        heuristic_fn (function): Estimates the remaining cost from a state
+        max_table_size (int, optional): Most states in the transposition table. Defaults to 100000.
+
+    Returns:
+        SearchSolution: The solution to the search. Also has a `max_stored_states`
+            property with the most states held in memory at once, on the path and
+            in the transposition table.
+    """
+    solution = SearchSolution(search_problem, "IDA* with heuristic " + heuristic_fn.__name__)
+    solution.max_stored_states = 1
+
+    start_state = search_problem.start_state
+    bound = heuristic_fn(start_state)
+
+    solution.nodes_visited += 1
+    if search_problem.is_goal(start_state):
+        solution.path = [start_state]
+        return solution
+
+    while bound != float("inf"):
+        next_bound = float("inf")
+
+        # The current path, with the path cost to each state and the successors
+        # of each state that haven't been tried yet
+        path = [start_state]
+        on_path = {start_state}
+        path_costs = [0]
+        untried = [iter(search_problem.get_successors(start_state))]
+
+        # Cheapest path cost to each state reached in this search
+        table = {start_state: 0} if max_table_size > 0 else {}
+
+        while len(untried) > 0:
+            successor = next(untried[-1], None)
+            if successor is None:
+                on_path.remove(path.pop())
+                path_costs.pop()
+                untried.pop()
+                continue
+
+            (transition_cost, state) = successor
+            if state in on_path:
+                continue
+
+            cost = path_costs[-1] + transition_cost
+            estimate = cost + heuristic_fn(state)
+            if estimate > bound:
+                next_bound = min(next_bound, estimate)
+                continue
+
+            best_cost = table.get(state)
+            if best_cost is not None and best_cost <= cost:
+                continue
+            if best_cost is not None or len(table) < max_table_size:
+                table[state] = cost
+
+            solution.nodes_visited += 1
+            path.append(state)
+
+            if search_problem.is_goal(state):
+                solution.path = path
+                solution.cost = cost
+                return solution
+
+            on_path.add(state)
+            path_costs.append(cost)
+            untried.append(iter(search_problem.get_successors(state)))
+            solution.max_stored_states = max(solution.max_stored_states, len(path) + len(table))
+
+        bound = next_bound
+
+    return solution
+
+
+class _SMANode:
+    """A node in the SMA* search tree"""
+
+    __slots__ = ("state", "parent", "cost", "f", "depth", "children",
+                 "pending", "forgotten", "in_open", "version")
+
+    def __init__(self, state, parent, cost, f):
+        self.state = state
+        self.parent = parent
+        self.cost = cost
+        self.f = f
+        self.depth = 0 if parent is None else parent.depth + 1
+        # Successor nodes in memory
+        self.children = []
+        # Successors that aren't in memory as (transition cost, state) pairs, either
+        # not generated yet or forgotten. None until the node is first expanded.
+        self.pending = None
+        # Best f value of each forgotten successor, by state
+        self.forgotten = {}
+        # Whether the node is in OPEN, and a counter for spotting stale heap entries
+        self.in_open = False
+        self.version = 0
+
+    def on_path(self, state):
+        node = self
+        while node is not None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+
+def smastar_search(search_problem, heuristic_fn, max_nodes=100000):
+    """Perform a simplified memory-bounded A* (SMA*) search, which works like A*
+    until `max_nodes` search tree nodes are in memory. Then, to make room for each
+    new node, it forgets the leaf with the highest f value (the shallowest one if
+    there's a tie), remembering its f value in its parent. The parent goes back on
+    OPEN, so the forgotten branch is regenerated if it becomes the best one again.
+
+    Nodes are generated one successor at a time, and a node's f value is backed up
+    to the smallest f of its successors once they have all been generated. The search
+    is optimal as long as `max_nodes` is more than the number of steps in an optimal
+    solution (deeper nodes get an f value of infinity, since there's no room to
+    store the path to them).
+
+    OPEN is kept as two heaps, one for finding the best node and one for the worst
+    leaf, which only has entries for nodes on OPEN without successors in memory (a
+    node gets one when its last child is forgotten), so forgetting a leaf takes
+    O(log n) time. Entries in them go stale when a node is removed, its f value
+    changes or it stops being a leaf, and are skipped over (and cleared out when
+    there are too many of them).
+
+    A successor is dropped if its state is already in memory with a path cost at
+    least as low. That path is still in the tree (or remembered in a forgotten 
+    branch, if it's forgotten later), so nothing is lost, and it keeps SMA* from 
+    filling its memory with copies of the same states reached in different orders.
+
+    Args:
+        search_problem: The search problem to find a solution to
+        heuristic_fn (function): Estimates the remaining cost from a state
+        max_nodes (int, optional): Most search tree nodes to keep in memory. Defaults to 100000.
+
+    Returns:
+        SearchSolution: The solution to the search. Also has a `max_stored_states`
+            property with the most nodes held in memory at once.
+    """
+    solution = SearchSolution(search_problem,
+                              "SMA* with heuristic " + heuristic_fn.__name__ + " and " + str(max_nodes) + " nodes")
+
+    best_heap = []
+    worst_heap = []
+    age = 0
+
+    def add_to_open(node):
+        nonlocal age, best_heap, worst_heap
+        age += 1
+
+        # Clear out stale entries once they make up most of the heaps, so that the
+        # heaps stay in proportion to the number of nodes in memory
+        if len(best_heap) + len(worst_heap) > 8 * max_nodes:
+            best_heap = [entry for entry in best_heap if is_current(entry)]
+            worst_heap = [entry for entry in worst_heap if is_current(entry) and len(entry[-1].children) == 0]
+            heapq.heapify(best_heap)
+            heapq.heapify(worst_heap)
+
+        node.in_open = True
+        node.version += 1
+        heapq.heappush(best_heap, (node.f, -node.depth, age, node.version, node))
+        if len(node.children) == 0:
+            heapq.heappush(worst_heap, (-node.f, node.depth, age, node.version, node))
+
+    def remove_from_open(node):
+        node.in_open = False
+        node.version += 1
+
+    def is_current(entry):
+        node = entry[-1]
+        return node.in_open and node.version == entry[-2]
+
+    def back_up(node):
+        # Once all of a node's successors have been generated, its f value is the
+        # best of theirs, which may change its parent's, and so on up the tree
+        while node is not None:
+            if node.pending is None or any(state not in node.forgotten for (_, state) in node.pending):
+                return
+
+            f_values = [child.f for child in node.children] + list(node.forgotten.values())
+            f = min(f_values) if len(f_values) > 0 else float("inf")
+            if f == node.f:
+                return
+
+            node.f = f
+            if node.in_open:
+                add_to_open(node)
+            node = node.parent
+
+    def forget_worst_leaf():
+        nonlocal age
+
+        # Nodes that have had a child since their entry was pushed aren't leaves
+        # any more, and get a new entry if they become one again
+        leaf = None
+        while len(worst_heap) > 0:
+            entry = heapq.heappop(worst_heap)
+            node = entry[-1]
+            if is_current(entry) and len(node.children) == 0 and node.parent is not None:
+                leaf = node
+                break
+
+        if leaf is None:
+            return False
+
+        remove_from_open(leaf)
+        if in_memory.get(leaf.state) is leaf:
+            del in_memory[leaf.state]
+
+        parent = leaf.parent
+        parent.children.remove(leaf)
+        parent.forgotten[leaf.state] = min(leaf.f, parent.forgotten.get(leaf.state, float("inf")))
+        parent.pending.append((leaf.cost - parent.cost, leaf.state))
+        if not parent.in_open:
+            add_to_open(parent)
+        elif len(parent.children) == 0:
+            age += 1
+            heapq.heappush(worst_heap, (-parent.f, parent.depth, age, parent.version, parent))
+        back_up(parent)
+        return True
+
+    start_state = search_problem.start_state
+    root = _SMANode(start_state, None, 0, heuristic_fn(start_state))
+    add_to_open(root)
+    num_nodes = 1
+
+    # The cheapest node in memory for each state
+    in_memory = {start_state: root}
+    solution.max_stored_states = 1
+
+    while len(best_heap) > 0:
+        entry = best_heap[0]
+        if not is_current(entry):
+            heapq.heappop(best_heap)
+            continue
+
+        node = entry[-1]
+        if node.f == float("inf"):
+            break
+
+        solution.nodes_visited += 1
+
+        if search_problem.is_goal(node.state):
+            path = []
+            solution.cost = node.cost
+            while node is not None:
+                path.append(node.state)
+                node = node.parent
+            path.reverse()
+            solution.path = path
+            break
+
+        if node.pending is None:
+            node.pending = [(transition_cost, state)
+                            for (transition_cost, state) in search_problem.get_successors(node.state)
+                            if not node.on_path(state)]
+
+        if len(node.pending) == 0:
+            # A dead end
+            node.f = float("inf")
+            add_to_open(node)
+            back_up(node.parent)
+            continue
+
+        # Generate the next successor: ones which haven't been generated yet come
+        # first, then forgotten ones, best first
+        pending = node.pending
+        next_index = 0
+        while next_index < len(pending) and pending[next_index][1] in node.forgotten:
+            next_index += 1
+        if next_index == len(pending):
+            next_index = min(range(len(pending)), key=lambda i: node.forgotten[pending[i][1]])
+        (transition_cost, state) = pending.pop(next_index)
+        cost = node.cost + transition_cost
+
+        duplicate = in_memory.get(state)
+        if duplicate is not None and duplicate.cost <= cost:
+            node.forgotten.pop(state, None)
+            if len(node.pending) == 0 and len(node.children) > 0:
+                remove_from_open(node)
+            back_up(node)
+            continue
+
+        if node.depth + 1 < max_nodes - 1 or search_problem.is_goal(state):
+            f = max(node.f, cost + heuristic_fn(state), node.forgotten.pop(state, 0))
+        else:
+            node.forgotten.pop(state, None)
+            f = float("inf")
+
+        child = _SMANode(state, node, cost, f)
+        node.children.append(child)
+        in_memory[state] = child
+        num_nodes += 1
+
+        if len(node.pending) == 0:
+            remove_from_open(node)
+        back_up(node)
+
+        while num_nodes > max_nodes and forget_worst_leaf():
+            num_nodes -= 1
+
+        add_to_open(child)
+        solution.max_stored_states = max(solution.max_stored_states, num_nodes)
+
+    return solution
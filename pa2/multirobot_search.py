@@ -0,0 +1,361 @@
+from MazeworldProblem import MazeworldProblem, MazeworldProblemState
+from SearchSolution import SearchSolution
+from astar_search import astar_search
+
+# Multi-robot planning with independence detection: instead of searching the joint
+# state space of every robot at once, each robot is planned on its own, and only
+# robots whose plans run into each other are merged into a group and planned together.
+# Each group is planned with a MazeworldProblem over just its robots, which moves
+# one robot per state (operator decomposition), so the joint search within a group
+# only branches over a single robot's moves at a time.
+#
+# Before two conflicting groups are merged, each is given a chance to replan around
+# the other's plan for the same cost (see AvoidingProblem), which resolves most
+# conflicts without having to search the two groups together.
+#
+# Searching a group together is exponential in its size, so in crowded mazes, where
+# conflicts chain groups together, it can't finish. Groups can be limited in size,
+# in which case a conflict that would merge groups past the limit is resolved by
+# replanning one of them around every other robot's plan, at whatever cost
+# (prioritized planning), which gives up on optimal solutions.
+#
+# Plans are kept as timelines: a robot's location at the start and after each of
+# its turns. Every robot gets one turn per round, in robot order, the same as the
+# turns in MazeworldProblem. Robots wait at their goal once their plan runs out.
+
+MOVES = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+def _location_at(timeline, round_number):
+    return timeline[min(round_number, len(timeline) - 1)]
+
+def _timeline_cost(timeline):
+    return sum(1 for (location, next_location) in zip(timeline, timeline[1:]) if location != next_location)
+
+
+class AvoidingProblem:
+    """Planning a group of robots around the fixed timelines of some other robots,
+    which the group's robots can't run into (and which can't run into them).
+
+    Since the other robots move over time, the state includes the round and which 
+    of the group's robots has the turn: it's a (round, group index, locations) tuple.
+    After the last of the other robots' moves, the round stops counting up, so the
+    state space stays finite. Robots outside both groups are ignored.
+    """
+    def __init__(self, maze, group, start_locations, goal_locations, avoided_timelines):
+        self.maze = maze
+        self.group = group
+        self.goal_locations = tuple(goal_locations[robot] for robot in group)
+        self.avoided_timelines = avoided_timelines
+        self.horizon = max(len(timeline) for timeline in avoided_timelines.values())
+
+        # The other robots that move after each of the group's robots, before the
+        # next one in the group, as (robot, rounds later) pairs
+        self.moves_between = []
+        for (i, robot) in enumerate(group):
+            if i + 1 < len(group):
+                between = [(other, 0) for other in avoided_timelines if robot < other < group[i + 1]]
+            else:
+                between = [(other, 0) for other in avoided_timelines if other > robot] + \
+                          [(other, 1) for other in avoided_timelines if other < group[0]]
+            self.moves_between.append(sorted(between, key=lambda move: (move[1], move[0])))
+
+        self.start_state = (1, 0, tuple(start_locations[robot] for robot in group))
+        self._distance_maps = [maze.distance_map(goal) for goal in self.goal_locations]
+
+    def __str__(self):
+        return "Avoiding problem for robots " + str(self.group)
+
+    def is_start_legal(self):
+        """Whether the other robots that move before the group's first turn stay out of its way"""
+        (_, _, locations) = self.start_state
+        return all(_location_at(self.avoided_timelines[other], 1) not in locations
+                   for other in self.avoided_timelines if other < self.group[0])
+
+    def _avoided_location(self, other, round_number, robot):
+        # Robots before this one have already had their turn this round
+        if other < robot:
+            return _location_at(self.avoided_timelines[other], round_number)
+        return _location_at(self.avoided_timelines[other], round_number - 1)
+
+    def get_successors(self, state):
+        (round_number, i, locations) = state
+        robot = self.group[i]
+        (rx, ry) = locations[i]
+
+        blocked = set(locations)
+        blocked.update(self._avoided_location(other, round_number, robot) for other in self.avoided_timelines)
+
+        if i + 1 < len(self.group):
+            (next_round, next_i) = (round_number, i + 1)
+        else:
+            (next_round, next_i) = (min(round_number + 1, self.horizon), 0)
+
+        successors = []
+        for (dx, dy, cost) in ((0, 0, 0),) + tuple((dx, dy, 1) for (dx, dy) in MOVES):
+            location = (rx + dx, ry + dy)
+            if cost > 0 and (location in blocked or not self.maze.is_floor(*location)):
+                continue
+
+            next_locations = locations[:i] + (location,) + locations[i + 1:]
+
+            # The other robots moving before the group's next turn can't run into it
+            if any(_location_at(self.avoided_timelines[other], round_number + rounds_later) in next_locations
+                   for (other, rounds_later) in self.moves_between[i]):
+                continue
+
+            successors.append((cost, (next_round, next_i, next_locations)))
+
+        return successors
+
+    def is_goal(self, state):
+        (round_number, _, locations) = state
+        return round_number == self.horizon and locations == self.goal_locations
+
+    def heuristic(self, state):
+        """Sum of the true distances of the group's robots to their goals"""
+        estimate = 0
+        for ((x, y), distance_map) in zip(state[2], self._distance_maps):
+            distance = distance_map[self.maze.cell_at(x, y)]
+            if distance == -1:
+                return float("inf")
+            estimate += distance
+        return estimate
+
+
+
+def _plan_group(maze, group, start_locations, goal_locations):
+    """Plan a group of robots together, ignoring every robot outside the group
+
+    Args:
+        maze (Maze): The maze to plan in
+        group (List[int]): Robots in the group, in increasing order
+        start_locations (Tuple[Tuple[int]]): Start location of every robot
+        goal_locations (Tuple[Tuple[int]]): Goal location of every robot
+
+    Returns:
+        Tuple[Dict, int]: Timeline of each robot in the group (None if the group
+            has no solution), and the number of nodes the search visited
+    """
+    problem = MazeworldProblem(maze,
+                               [goal_locations[robot] for robot in group],
+                               start_locations=[start_locations[robot] for robot in group])
+    result = astar_search(problem, problem.true_distance_heuristic)
+
+    if len(result.path) == 0:
+        return (None, result.nodes_visited)
+
+    timelines = {robot: [start_locations[robot]] for robot in group}
+
+    # Each step of the path is a turn of the robot whose turn it was before the step
+    for (state, next_state) in zip(result.path, result.path[1:]):
+        timelines[group[state.turn]].append(next_state.robot_position(state.turn))
+
+    return (timelines, result.nodes_visited)
+
+def _plan_group_avoiding(maze, group, avoided, start_locations, goal_locations, timelines, same_cost=True):
+    """Replan a group around the timelines of some other robots, for no more than
+    the group's current plan costs (or for any cost, if `same_cost` is False)
+
+    Returns:
+        Tuple[Dict, int]: Timeline of each robot in the group (None if there's 
+            no such plan), and the number of nodes the search visited
+    """
+    problem = AvoidingProblem(maze, group, start_locations, goal_locations,
+                              {robot: timelines[robot] for robot in avoided})
+    if not problem.is_start_legal():
+        return (None, 0)
+
+    max_cost = sum(_timeline_cost(timelines[robot]) for robot in group) if same_cost else None
+    result = astar_search(problem, problem.heuristic, max_cost=max_cost)
+
+    if len(result.path) == 0:
+        return (None, result.nodes_visited)
+
+    timelines = {robot: [start_locations[robot]] for robot in group}
+    for ((_, i, _), (_, _, next_locations)) in zip(result.path, result.path[1:]):
+        timelines[group[i]].append(next_locations[i])
+
+    return (timelines, result.nodes_visited)
+
+def _find_conflict(timelines):
+    """Play the robots' timelines together, one turn at a time, and find the first
+    turn where a robot moves onto a location another robot is at.
+
+    Args:
+        timelines (List[List[Tuple[int]]]): Timeline of each robot
+
+    Returns:
+        Tuple[int]: The robot that moved and the robot it ran into, or None if the
+            timelines don't conflict
+    """
+    num_rounds = max(len(timeline) for timeline in timelines)
+    occupied = {timeline[0]: robot for (robot, timeline) in enumerate(timelines)}
+
+    for round_number in range(1, num_rounds):
+        for (robot, timeline) in enumerate(timelines):
+            if round_number >= len(timeline):
+                continue
+
+            previous = timeline[round_number - 1]
+            location = timeline[round_number]
+            if location == previous:
+                continue
+
+            if location in occupied:
+                return (robot, occupied[location])
+
+            del occupied[previous]
+            occupied[location] = robot
+
+    return None
+
+def _joint_path(timelines, goal_locations):
+    """Combine the robots' timelines into a path of MazeworldProblemStates, with
+    one state per turn (like a path from astar_search), ending once every robot
+    is at its goal.
+
+    Returns:
+        Tuple[List[MazeworldProblemState], int]: The path and its cost
+    """
+    num_robots = len(timelines)
+    num_rounds = max(len(timeline) for timeline in timelines)
+
+    locations = [timeline[0] for timeline in timelines]
+    path = [MazeworldProblemState(locations, 0)]
+    cost = 0
+
+    for round_number in range(1, num_rounds):
+        for (robot, timeline) in enumerate(timelines):
+            if tuple(locations) == goal_locations:
+                return (path, cost)
+
+            location = timeline[min(round_number, len(timeline) - 1)]
+            if location != locations[robot]:
+                locations[robot] = location
+                cost += 1
+            path.append(MazeworldProblemState(locations, (robot + 1) % num_robots))
+
+    return (path, cost)
+
+def multirobot_search(search_problem: MazeworldProblem, max_group_size=None):
+    """Solve a multi-robot MazeworldProblem with independence detection. Every robot
+    starts in a group of its own. Groups are planned separately (with A* and
+    `true_distance_heuristic`). Whenever the plans of two groups conflict (for the
+    first time), each group tries replanning around the other for the same cost.
+    If neither can, they are merged into one group and replanned, until no plans 
+    conflict.
+
+    Since merged groups are planned optimally, and groups that don't conflict can't 
+    do better than their separate plans, the solution has the same (optimal) cost
+    as `astar_search` on the whole problem, but robots that stay out of each other's
+    way never have to be searched together.
+
+    That only helps while groups stay small, though. In crowded mazes (like 10 robots
+    in maze50.maz), conflicts tend to chain most of the robots into one group, which
+    can't be searched in any reasonable time. Passing `max_group_size` keeps groups
+    at most that large: when merging two groups would go over it, one of them is
+    replanned around the plans of every other robot instead, for whatever it costs.
+    Solutions are then no longer optimal, and the search can fail to find one that
+    exists (for example, when another robot's goal blocks a corridor the group needs).
+    With `max_group_size=2`, random problems with 10 robots in maze50.maz take a few
+    seconds at most, but only about three quarters of them are solved, and with 12
+    robots fewer than half are.
+
+    Args:
+        search_problem (MazeworldProblem): The search problem to find a solution to
+        max_group_size (int, optional): Largest group to search together. Defaults to
+            None, for no limit (and optimal solutions).
+
+    Returns:
+        SearchSolution: The solution to the search. Its path holds a state for every 
+            turn, like a path from astar_search. `nodes_visited` is summed over the 
+            searches of all the groups. Also has a `group_sizes` list, with the size
+            of each group the robots ended up planned in (largest first).
+    """
+    solution = SearchSolution(search_problem, "multirobot_search with independence detection")
+    solution.group_sizes = []
+
+    maze = search_problem.maze
+    start_locations = search_problem.start_state.robot_positions
+    goal_locations = search_problem.goal_locations
+    num_robots = len(start_locations)
+
+    group_of = list(range(num_robots))
+    groups = {robot: [robot] for robot in range(num_robots)}
+    timelines = [None] * num_robots
+
+    for robot in range(num_robots):
+        (group_timelines, nodes_visited) = _plan_group(maze, [robot], start_locations, goal_locations)
+        solution.nodes_visited += nodes_visited
+        if group_timelines is None:
+            return solution
+        timelines[robot] = group_timelines[robot]
+
+    # Pairs of groups which have already tried replanning around each other
+    tried = set()
+
+    while True:
+        conflict = _find_conflict(timelines)
+        if conflict is None:
+            break
+
+        (group_a, group_b) = (group_of[conflict[0]], group_of[conflict[1]])
+        assert group_a != group_b, "robots in the same group can't conflict"
+
+        pair = (tuple(groups[group_a]), tuple(groups[group_b]))
+        if pair not in tried:
+            tried.add(pair)
+            tried.add(pair[::-1])
+
+            # Try to replan either group around the other
+            replanned = False
+            for (group, avoided) in (pair, pair[::-1]):
+                (group_timelines, nodes_visited) = _plan_group_avoiding(
+                    maze, list(group), avoided, start_locations, goal_locations, timelines)
+                solution.nodes_visited += nodes_visited
+                if group_timelines is not None:
+                    for robot in group:
+                        timelines[robot] = group_timelines[robot]
+                    replanned = True
+                    break
+
+            if replanned:
+                continue
+
+        if max_group_size is not None and len(groups[group_a]) + len(groups[group_b]) > max_group_size:
+            # Replan the smaller group (or failing that, the other one) around every other robot
+            replanned = False
+            for group in sorted((groups[group_a], groups[group_b]), key=len):
+                avoided = [robot for robot in range(num_robots) if group_of[robot] != group_of[group[0]]]
+                (group_timelines, nodes_visited) = _plan_group_avoiding(
+                    maze, group, avoided, start_locations, goal_locations, timelines, same_cost=False)
+                solution.nodes_visited += nodes_visited
+                if group_timelines is not None:
+                    for robot in group:
+                        timelines[robot] = group_timelines[robot]
+                    replanned = True
+                    break
+
+            if not replanned:
+                return solution
+            continue
+
+        # Merge the two groups and plan them together
+        group = sorted(groups.pop(group_a) + groups.pop(group_b))
+        groups[group[0]] = group
+        for robot in group:
+            group_of[robot] = group[0]
+
+        (group_timelines, nodes_visited) = _plan_group(maze, group, start_locations, goal_locations)
+        solution.nodes_visited += nodes_visited
+        if group_timelines is None:
+            return solution
+
+        for robot in group:
+            timelines[robot] = group_timelines[robot]
+
+    (solution.path, solution.cost) = _joint_path(timelines, goal_locations)
+    solution.group_sizes = sorted((len(group) for group in groups.values()), reverse=True)
+
+    return solution
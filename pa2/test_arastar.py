@@ -0,0 +1,77 @@
+from MazeworldProblem import MazeworldProblem
+from SensorlessProblem import SensorlessProblem
+from Maze import Maze
+from astar_search import astar_search
+from arastar_search import arastar_search
+from test_sensorless import maze1_input
+from time import time, sleep
+
+
+def path_cost(problem, path):
+    cost = 0
+    for (state, next_state) in zip(path, path[1:]):
+        cost += next(transition_cost for (transition_cost, successor) in problem.get_successors(state)
+                     if successor == next_state)
+    return cost
+
+def test_arastar_improves_to_optimal():
+    for make_problem in [
+        lambda: SensorlessProblem(Maze(maze1_input, interpret_as_file=False), 0, 0),
+        lambda: MazeworldProblem(Maze("maze50.maz"), [(15, 0), (0, 10)]),
+    ]:
+        problem = make_problem()
+        heuristic = problem.heuristic_composite if isinstance(problem, SensorlessProblem) else problem.manhattan_heuristic
+        optimal_cost = astar_search(problem, heuristic).cost
+
+        solutions = []
+        result = arastar_search(make_problem(), heuristic,
+                                callback=lambda solution, bound: solutions.append((solution, bound)))
+        reports = [(solution.cost, bound) for (solution, bound) in solutions]
+
+        assert result.cost == optimal_cost
+        assert result.suboptimality_bound == 1
+        assert reports[-1] == (optimal_cost, 1)
+
+        # Each report is at least as good as the last, and within its bound
+        for ((cost, bound), (next_cost, next_bound)) in zip(reports, reports[1:]):
+            assert next_cost <= cost and next_bound <= bound
+        for (cost, bound) in reports:
+            assert cost <= bound * optimal_cost
+
+        # The solutions passed to the callback are kept as they were reported
+        for (solution, bound) in solutions:
+            assert solution.suboptimality_bound == bound
+            assert solution.cost == path_cost(problem, solution.path)
+
+def test_arastar_deadline():
+    problem = MazeworldProblem(Maze("maze50.maz"), [(15, 0), (0, 10)])
+
+    # With no time at all, there's no solution
+    result = arastar_search(problem, problem.manhattan_heuristic, deadline=time())
+    assert len(result.path) == 0
+    assert result.suboptimality_bound == float("inf")
+
+    # Run out of time as soon as the first solution is found
+    deadline = time() + 1
+    def wait_for_deadline(solution, bound):
+        sleep(max(0, deadline - time()))
+
+    result = arastar_search(problem, problem.manhattan_heuristic, weights=(3, 1),
+                            deadline=deadline, callback=wait_for_deadline)
+    first_result = arastar_search(problem, problem.manhattan_heuristic, weights=(3,))
+
+    assert result.cost == first_result.cost > 50
+    assert result.nodes_visited == first_result.nodes_visited
+    assert 1 < result.suboptimality_bound <= 3
+
+def test_arastar_no_solution():
+    maze = Maze("""
+    .....
+    \\robot 1 0
+    \\robot 3 0
+    """, interpret_as_file=False)
+    problem = MazeworldProblem(maze, [(4, 0), (0, 0)])
+    result = arastar_search(problem, problem.manhattan_heuristic)
+
+    assert len(result.path) == 0
+    assert result.suboptimality_bound == float("inf")
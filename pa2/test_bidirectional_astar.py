@@ -0,0 +1,71 @@
+from MazeworldProblem import MazeworldProblem, MazeworldProblemState
+from Maze import Maze
+from astar_search import astar_search
+from bidirectional_astar_search import bidirectional_astar_search, maze_path_search
+from test_mazeworld import maze3_raw, maze4_raw
+from test_mazeworldproblem import complexMazeInput
+
+
+def assert_valid_path(problem, path):
+    assert path[0] == problem.start_state
+    assert problem.is_goal(path[-1])
+    for (state, next_state) in zip(path, path[1:]):
+        assert next_state in [successor for (_, successor) in problem.get_successors(state)]
+
+def test_mazeworld_predecessors():
+    maze = Maze(complexMazeInput, interpret_as_file=False)
+    problem = MazeworldProblem(maze, [(3, 1), (3, 3), (1, 2)])
+
+    # A state's predecessors are exactly the states that have it as a successor
+    states = {problem.start_state}
+    for _ in range(5):
+        states |= {successor for state in states for (_, successor) in problem.get_successors(state)}
+
+    for state in states:
+        for (cost, successor) in problem.get_successors(state):
+            assert (cost, state) in problem.get_predecessors(successor)
+        for (cost, predecessor) in problem.get_predecessors(state):
+            assert (cost, state) in problem.get_successors(predecessor)
+
+    assert problem.goal_states() == [MazeworldProblemState([(3, 1), (3, 3), (1, 2)], turn) for turn in range(3)]
+
+def test_bidirectional_astar_matches_astar():
+    for (maze_input, goals, as_file) in [
+        ("maze40.maz", [(30, 0)], True),
+        ("maze41.maz", [(0, 20)], True),
+        ("maze50.maz", [(15, 0), (0, 10)], True),
+        (maze3_raw, [(3, 2), (1, 4)], False),
+        (maze4_raw, [(6, 0), (0, 0), (6, 3)], False),
+    ]:
+        problem = MazeworldProblem(Maze(maze_input, interpret_as_file=as_file), goals)
+        result_astar = astar_search(problem, problem.manhattan_heuristic)
+        result = bidirectional_astar_search(problem, problem.manhattan_heuristic, problem.reverse_manhattan_heuristic)
+
+        assert result.cost == result_astar.cost
+        assert_valid_path(problem, result.path)
+
+        if len(goals) > 1:
+            assert result.nodes_visited < result_astar.nodes_visited
+
+def test_maze_path_search():
+    maze = Maze("\n".join(["." * 60] * 40), interpret_as_file=False)
+    result = maze_path_search(maze, (0, 0), (59, 39))
+
+    problem = MazeworldProblem(maze, [(59, 39)], start_locations=[(0, 0)])
+    result_astar = astar_search(problem, problem.manhattan_heuristic)
+
+    assert result.cost == result_astar.cost == 98
+    assert result.path[0].robot_position(0) == (0, 0)
+    assert_valid_path(problem, result.path)
+    assert result.nodes_visited * 10 < result_astar.nodes_visited
+
+def test_bidirectional_astar_no_path():
+    maze = Maze("""
+    ..##..
+    ..##..
+    """, interpret_as_file=False)
+    assert len(maze_path_search(maze, (0, 0), (5, 1)).path) == 0
+
+    # Starting at the goal
+    result = maze_path_search(maze, (1, 1), (1, 1))
+    assert result.cost == 0 and len(result.path) == 1
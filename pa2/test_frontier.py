@@ -0,0 +1,140 @@
+from Frontier import HeapFrontier, IndexedHeapFrontier, BucketFrontier
+from MazeworldProblem import Maze, MazeworldProblem
+from SensorlessProblem import SensorlessProblem
+from astar_search import astar_search
+import pytest
+
+FRONTIER_TYPES = [HeapFrontier, IndexedHeapFrontier, BucketFrontier]
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_frontier_order(frontier_type):
+    frontier = frontier_type()
+    frontier.push("a", 3)
+    frontier.push("b", 1)
+    frontier.push("c", 3)
+    frontier.push("d", 2)
+
+    assert len(frontier) == 4
+    assert set(frontier) == {"a", "b", "c", "d"}
+
+    # Ties are broken by age, oldest first
+    assert [frontier.pop() for _ in range(4)] == ["b", "d", "a", "c"]
+    assert len(frontier) == 0
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_frontier_update(frontier_type):
+    frontier = frontier_type()
+    frontier.push("a", 5)
+    frontier.push("b", 4)
+    frontier.push("c", 6)
+
+    # Updating a priority doesn't leave a second copy behind
+    frontier.push("a", 2)
+    frontier.push("c", 3)
+    assert len(frontier) == 3
+
+    assert [frontier.pop() for _ in range(3)] == ["a", "c", "b"]
+    assert len(frontier) == 0
+
+    with pytest.raises(IndexError):
+        frontier.pop()
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_frontier_min_priority(frontier_type):
+    frontier = frontier_type()
+    frontier.push("a", 5)
+    frontier.push("b", 4)
+    assert frontier.min_priority() == 4
+
+    # Stale entries left by updates don't count
+    frontier.push("b", 7)
+    assert frontier.min_priority() == 5
+    assert len(frontier) == 2
+
+    frontier.pop()
+    assert frontier.min_priority() == 7
+    frontier.pop()
+
+    with pytest.raises(IndexError):
+        frontier.min_priority()
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_frontier_remove(frontier_type):
+    frontier = frontier_type()
+    for (state, priority) in [("a", 5), ("b", 4), ("c", 6), ("d", 1), ("e", 3)]:
+        frontier.push(state, priority)
+
+    frontier.remove("d")
+    frontier.remove("c")
+    assert "d" not in frontier and "a" in frontier
+    assert len(frontier) == 3
+    assert frontier.min_priority() == 3
+
+    # Removed states can be pushed again
+    frontier.push("c", 2)
+    assert [frontier.pop() for _ in range(4)] == ["c", "e", "b", "a"]
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_frontier_infinite_priority(frontier_type):
+    frontier = frontier_type()
+    frontier.push("a", float("inf"))
+    frontier.push("b", 3)
+    assert frontier.min_priority() == 3
+
+    frontier.push("c", float("inf"))
+    frontier.push("c", 1)
+    assert [frontier.pop() for _ in range(2)] == ["c", "b"]
+    assert frontier.min_priority() == float("inf")
+    assert frontier.pop() == "a"
+    assert len(frontier) == 0
+
+def test_bucketfrontier_rejects_fractions():
+    with pytest.raises(ValueError):
+        BucketFrontier().push("a", 1.5)
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_astar_frontiers_mazeworld(frontier_type):
+    for (filename, goals, cost) in [("maze40.maz", [(30, 0)], 54), ("maze41.maz", [(0, 20)], 60)]:
+        maze_problem = MazeworldProblem(Maze(filename), goals)
+        default_result = astar_search(maze_problem, maze_problem.manhattan_heuristic)
+        result = astar_search(maze_problem, maze_problem.manhattan_heuristic, frontier=frontier_type())
+
+        assert result.cost == default_result.cost == cost
+        assert result.nodes_visited == default_result.nodes_visited
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_astar_frontiers_sensorless(frontier_type):
+    maze = Maze("maze2.maz")
+    problem = SensorlessProblem(maze, 3, 0)
+    result = astar_search(problem, problem.heuristic_composite, frontier=frontier_type())
+    assert result.cost == 5
+
+@pytest.mark.parametrize("frontier_type", FRONTIER_TYPES)
+def test_astar_frontiers_unreachable_goal(frontier_type):
+    maze = Maze("""
+    ..#.
+    ..#.
+    \\robot 0 0
+    """, interpret_as_file=False)
+    maze_problem = MazeworldProblem(maze, [(3, 0)])
+
+    # Like a true distance heuristic, every state is infinitely far from the goal
+    def unreachable_heuristic(state):
+        return float("inf")
+
+    result = astar_search(maze_problem, unreachable_heuristic, frontier=frontier_type())
+    assert len(result.path) == 0
+    assert result.nodes_visited == 4
+
+def test_astar_no_stale_expansions():
+    maze_problem = MazeworldProblem(Maze("maze50.maz"), [(15, 0), (0, 10)])
+
+    expanded = []
+    original_is_goal = maze_problem.is_goal
+    def recording_is_goal(state):
+        expanded.append(state)
+        return original_is_goal(state)
+    maze_problem.is_goal = recording_is_goal
+
+    result = astar_search(maze_problem, maze_problem.manhattan_heuristic)
+    assert len(expanded) == len(set(expanded)) == result.nodes_visited
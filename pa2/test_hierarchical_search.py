@@ -0,0 +1,75 @@
+from MazeworldProblem import MazeworldProblem, MazeworldProblemState
+from Maze import Maze
+from astar_search import astar_search
+from hierarchical_search import hpa_search, maze_abstraction, smooth_path
+from test_jump_point_search import random_maze
+import random
+
+
+def assert_valid_path(problem, path):
+    assert path[0] == problem.start_state
+    assert problem.is_goal(path[-1])
+    for (state, next_state) in zip(path, path[1:]):
+        assert (1, next_state) in problem.get_successors(state)
+
+def test_hpa_matches_astar_reachability():
+    for seed in range(20):
+        rng = random.Random(seed)
+        maze = Maze(random_maze(30, 25, 0.25, rng), interpret_as_file=False)
+        cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+
+        for _ in range(5):
+            (start, goal) = rng.sample(cells, 2)
+            problem = MazeworldProblem(maze, [goal], start_locations=[start])
+            result_astar = astar_search(problem, problem.manhattan_heuristic)
+
+            for smooth in (False, True):
+                result = hpa_search(problem, cluster_size=5, smooth=smooth)
+                assert (len(result.path) > 0) == (len(result_astar.path) > 0)
+                if len(result.path) > 0:
+                    assert_valid_path(problem, result.path)
+                    assert result.cost == len(result.path) - 1
+                    assert result.cost >= result_astar.cost
+
+def test_hpa_same_cluster():
+    maze = Maze("maze40.maz")
+    problem = MazeworldProblem(maze, [(2, 2)], start_locations=[(1, 1)])
+    result = hpa_search(problem, cluster_size=10)
+    assert result.cost == astar_search(problem, problem.manhattan_heuristic).cost
+    assert_valid_path(problem, result.path)
+
+def test_hpa_lazy_refinement():
+    rng = random.Random(3)
+    maze = Maze(random_maze(40, 40, 0.2, rng), interpret_as_file=False)
+    cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+    (start, goal) = rng.sample(cells, 2)
+    problem = MazeworldProblem(maze, [goal], start_locations=[start])
+
+    abstract = hpa_search(problem, refine=False)
+    full = hpa_search(problem)
+    assert abstract.cost == full.cost
+    assert [state.robot_position(0) for state in abstract.path] == abstract.abstract_path
+
+    refined = maze_abstraction(maze).refine(abstract.abstract_path)
+    assert [MazeworldProblemState([location], 0) for location in refined] == full.path
+
+def test_maze_abstraction_cache():
+    maze = Maze("maze40.maz")
+    abstraction = maze_abstraction(maze)
+    assert maze_abstraction(maze) is abstraction
+    assert maze_abstraction(maze, cluster_size=5) is not abstraction
+
+    # Changing the maze rebuilds it
+    maze.set_floor(0, 0, not maze.is_floor(0, 0))
+    assert maze_abstraction(maze) is not abstraction
+
+def test_smooth_path():
+    maze = Maze("""
+    .....
+    .....
+    .....
+    """, interpret_as_file=False)
+
+    # A detour up and back down is replaced by the straight run along the bottom
+    path = [(0, 0), (0, 1), (1, 1), (2, 1), (3, 1), (3, 0), (4, 0)]
+    assert smooth_path(maze, path) == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
@@ -0,0 +1,76 @@
+from MazeworldProblem import MazeworldProblem
+from Maze import Maze
+from astar_search import astar_search
+from jump_point_search import jump_point_search, jps_plus_table
+import random
+
+
+def random_maze(width, height, wall_fraction, rng):
+    return "\n".join("".join("#" if rng.random() < wall_fraction else "." for _ in range(width))
+                     for _ in range(height))
+
+def test_jps_matches_astar():
+    for seed in range(50):
+        rng = random.Random(seed)
+        maze = Maze(random_maze(12, 9, 0.3, rng), interpret_as_file=False)
+        cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+        (start, goal) = rng.sample(cells, 2)
+        problem = MazeworldProblem(maze, [goal], start_locations=[start])
+
+        result_astar = astar_search(problem, problem.manhattan_heuristic)
+        for jps_plus in (False, True):
+            result = jump_point_search(problem, jps_plus=jps_plus)
+            assert result.cost == result_astar.cost
+            assert len(result.path) == len(result_astar.path)
+
+            # The path is made of unit steps, like astar_search's
+            for (state, next_state) in zip(result.path, result.path[1:]):
+                assert (1, next_state) in problem.get_successors(state)
+
+def test_jps_mazefiles():
+    for (filename, goal) in [("maze40.maz", (30, 0)), ("maze41.maz", (0, 20))]:
+        problem = MazeworldProblem(Maze(filename), [goal])
+        result_astar = astar_search(problem, problem.manhattan_heuristic)
+
+        for jps_plus in (False, True):
+            result = jump_point_search(problem, jps_plus=jps_plus)
+            assert result.cost == result_astar.cost
+            assert result.path[0] == problem.start_state and problem.is_goal(result.path[-1])
+            assert result.nodes_visited < result_astar.nodes_visited
+
+def test_jps_open_maze():
+    maze = Maze("\n".join(["." * 40] * 30), interpret_as_file=False)
+    problem = MazeworldProblem(maze, [(39, 29)], start_locations=[(0, 0)])
+
+    for jps_plus in (False, True):
+        result = jump_point_search(problem, jps_plus=jps_plus)
+        assert result.cost == 68
+        assert len(result.path) == 69
+        assert result.nodes_visited <= 3
+
+def test_jps_no_path():
+    maze = Maze("""
+    ..##..
+    ..##..
+    \\robot 0 0
+    """, interpret_as_file=False)
+    problem = MazeworldProblem(maze, [(5, 1)])
+
+    for jps_plus in (False, True):
+        assert len(jump_point_search(problem, jps_plus=jps_plus).path) == 0
+
+def test_jps_plus_table():
+    maze = Maze("""
+    ....
+    .#..
+    ....
+    """, interpret_as_file=False)
+    table = jps_plus_table(maze)
+    assert jps_plus_table(maze) is table
+
+    # Going east from (0, 2), getting past the wall at (1, 1) forces a stop at (2, 2)
+    assert table[maze.cell_at(0, 2) * 4 + 1] == 2
+    # Going east from (2, 2), there's only the wall border after (3, 2)
+    assert table[maze.cell_at(2, 2) * 4 + 1] == -1
+    # Going north from (3, 0), the sideways scan on (3, 2) finds the forced stop at (0, 2)
+    assert table[maze.cell_at(3, 0) * 4 + 0] == 2
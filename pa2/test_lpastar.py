@@ -0,0 +1,92 @@
+from Maze import Maze
+from LPAStarPlanner import LPAStarPlanner
+from test_jump_point_search import random_maze
+import random
+
+
+def true_cost(maze, start, goal):
+    distance = maze.distance_map(goal)[maze.cell_at(*start)] if maze.is_floor(*start) else -1
+    return float("inf") if distance == -1 else distance
+
+def assert_valid_path(maze, solution, start, goal):
+    assert solution.path[0] == start and solution.path[-1] == goal
+    assert len(solution.path) == solution.cost + 1
+    for ((x, y), (next_x, next_y)) in zip(solution.path, solution.path[1:]):
+        assert maze.is_floor(next_x, next_y)
+        assert abs(next_x - x) + abs(next_y - y) == 1
+
+def test_lpastar_matches_bfs():
+    for seed in range(30):
+        rng = random.Random(seed)
+        maze = Maze(random_maze(15, 10, 0.25, rng), interpret_as_file=False)
+        cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+        (start, goal) = rng.sample(cells, 2)
+
+        planner = LPAStarPlanner(maze, start, goal)
+        for _ in range(10):
+            solution = planner.replan()
+            expected = true_cost(maze, start, goal)
+            if expected == float("inf"):
+                assert solution.path == []
+            else:
+                assert solution.cost == expected
+                assert_valid_path(maze, solution, start, goal)
+
+            # Flip a few cells (sometimes the start or goal) between wall and floor
+            changed = []
+            for _ in range(rng.randint(1, 4)):
+                (x, y) = (rng.randrange(maze.width), rng.randrange(maze.height))
+                if maze.set_floor(x, y, not maze.is_floor(x, y)):
+                    changed.append((x, y))
+            planner.update_cells(changed)
+
+def test_lpastar_set_goal_and_start():
+    rng = random.Random(1)
+    maze = Maze(random_maze(20, 12, 0.2, rng), interpret_as_file=False)
+    cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+    (start, goal) = rng.sample(cells, 2)
+
+    planner = LPAStarPlanner(maze, start, goal)
+    planner.replan()
+    for _ in range(10):
+        if rng.random() < 0.5:
+            goal = rng.choice(cells)
+            planner.set_goal(goal)
+        else:
+            start = rng.choice(cells)
+            planner.set_start(start)
+
+        solution = planner.replan()
+        assert solution.cost == true_cost(maze, start, goal)
+        assert_valid_path(maze, solution, start, goal)
+
+def test_lpastar_repairs_locally():
+    maze = Maze("\n".join(["." * 60] * 60), interpret_as_file=False)
+    planner = LPAStarPlanner(maze, (0, 0), (59, 59))
+    first = planner.replan()
+    assert first.cost == 118
+
+    # A wall on the path only needs a small repair
+    (x, y) = first.path[60]
+    maze.set_floor(x, y, False)
+    planner.update_cells([(x, y)])
+    second = planner.replan()
+
+    assert second.cost == 118
+    assert (x, y) not in second.path
+    assert second.nodes_visited < first.nodes_visited / 4
+
+    # Nothing changed, so nothing to do
+    assert planner.replan().nodes_visited == 0
+
+def test_maze_set_floor():
+    maze = Maze("...\n.#.\n...", interpret_as_file=False)
+    assert maze.num_cells == 8 and maze.distance_map((0, 0))[maze.cell_at(2, 2)] == 4
+    version = maze.version
+
+    assert maze.set_floor(1, 1, True)
+    assert not maze.set_floor(1, 1, True)
+    assert maze.version == version + 1
+    assert maze.num_cells == 9
+    assert str(maze) == "...\n...\n...\n"
+    assert maze.distance_map((0, 0))[maze.cell_at(1, 1)] == 2
@@ -0,0 +1,149 @@
+from Maze import Maze, DIRECTIONS, UNREACHABLE
+import pytest
+
+maze_input = """
+##.#
+#...
+#.#.
+\\robot 1 0
+"""
+
+def test_maze_is_floor():
+    maze = Maze(maze_input, interpret_as_file=False)
+
+    assert maze.width == 4 and maze.height == 3
+    assert maze.is_floor(1, 0)
+    assert maze.is_floor(2, 2)
+    assert not maze.is_floor(0, 0)
+    assert not maze.is_floor(2, 0)
+
+    # Anything outside of the maze is a wall
+    for (x, y) in [(-1, 0), (4, 0), (0, -1), (0, 3), (-5, 10)]:
+        assert not maze.is_floor(x, y)
+
+def test_maze_grid_matches_map():
+    maze = Maze("maze40.maz")
+
+    for x in range(maze.width):
+        for y in range(maze.height):
+            assert maze.is_floor(x, y) == (maze.map[maze.index(x, y)] == ".")
+            assert maze.grid_location(maze.grid_index(x, y)) == (x, y)
+
+def test_maze_cells():
+    maze = Maze(maze_input, interpret_as_file=False)
+
+    assert maze.num_cells == 6
+    for cell in range(maze.num_cells):
+        (x, y) = maze.cell_location(cell)
+        assert maze.is_floor(x, y)
+        assert maze.cell_at(x, y) == cell
+
+    assert maze.cell_at(0, 0) == -1
+    assert maze.cell_at(-1, 0) == -1
+
+    neighbors = maze.cell_neighbors(maze.cell_at(1, 1))
+    assert set(maze.cell_location(n) for n in neighbors) == {(1, 0), (2, 1)}
+
+def test_maze_adjacency():
+    maze = Maze("maze50.maz")
+
+    for cell in range(maze.num_cells):
+        (x, y) = maze.cell_location(cell)
+        expected = [(x + dx, y + dy) for (dx, dy) in DIRECTIONS if maze.is_floor(x + dx, y + dy)]
+        assert [maze.cell_location(n) for n in maze.cell_neighbors(cell)] == expected
+
+def test_maze_distance_map():
+    maze = Maze(maze_input, interpret_as_file=False)
+    distances = maze.distance_map((3, 0))
+
+    assert distances[maze.cell_at(3, 0)] == 0
+    assert distances[maze.cell_at(3, 1)] == 1
+    assert distances[maze.cell_at(1, 0)] == 4
+    assert distances[maze.cell_at(2, 2)] == 3
+
+    # Maps are cached by goal
+    assert maze.distance_map((3, 0)) is distances
+
+def test_maze_distance_map_disconnected():
+    maze = Maze("""
+    ..#.
+    ..#.
+    """, interpret_as_file=False)
+    distances = maze.distance_map((0, 0))
+
+    assert distances[maze.cell_at(1, 1)] == 2
+    assert distances[maze.cell_at(3, 0)] == -1
+
+def test_maze_all_pairs_distances(tmp_path):
+    maze = Maze(maze_input, interpret_as_file=False)
+    table = maze.all_pairs_distances()
+
+    # Each row of the table is the distance map of that cell
+    for a in range(maze.num_cells):
+        distances = maze.distance_map(maze.cell_location(a))
+        assert [table[a * maze.num_cells + b] for b in range(maze.num_cells)] == list(distances)
+
+    assert maze.all_pairs_distances() is table
+
+    # Written out to a file and memory mapped
+    other_maze = Maze(maze_input, interpret_as_file=False)
+    mapped = other_maze.all_pairs_distances(filename=str(tmp_path / "distances.bin"))
+    assert list(mapped) == list(table)
+    assert (tmp_path / "distances.bin").stat().st_size == 2 * maze.num_cells ** 2
+
+def test_maze_all_pairs_distances_disconnected():
+    maze = Maze("""
+    ..#.
+    ..#.
+    """, interpret_as_file=False)
+    table = maze.all_pairs_distances()
+
+    assert table[maze.cell_at(0, 0) * maze.num_cells + maze.cell_at(1, 1)] == 2
+    assert table[maze.cell_at(0, 0) * maze.num_cells + maze.cell_at(3, 0)] == UNREACHABLE
+
+def test_maze_all_pairs_distances_too_large():
+    # Distances are 16 bit, so there can't be UNREACHABLE cells or more
+    maze = Maze("." * UNREACHABLE, interpret_as_file=False)
+    with pytest.raises(ValueError):
+        maze.all_pairs_distances()
+
+def test_maze_binary_round_trip(tmp_path):
+    maze = Maze("maze40.maz")
+    maze.write_binary(str(tmp_path / "maze40.mazb"))
+    loaded = Maze(str(tmp_path / "maze40.mazb"))
+
+    assert (loaded.width, loaded.height, loaded.num_cells) == (maze.width, maze.height, maze.num_cells)
+    assert loaded.robotloc == maze.robotloc
+    assert bytes(loaded.grid) == bytes(maze.grid)
+    assert loaded.map == maze.map
+    assert str(loaded) == str(maze)
+    assert list(loaded.neighbor_ids) == list(maze.neighbor_ids)
+
+def test_maze_sidecar(tmp_path):
+    maze_file = tmp_path / "maze.maz"
+    maze_file.write_text(maze_input)
+
+    maze = Maze(str(maze_file), sidecar=True)
+    assert (tmp_path / "maze.maz.bin").exists()
+
+    # The sidecar is used from then on
+    loaded = Maze(str(maze_file), sidecar=True)
+    assert isinstance(loaded.grid, memoryview)
+    assert str(loaded) == str(maze)
+    assert loaded.robotloc == [(1, 0)]
+
+def test_maze_cell_tables_are_lazy():
+    maze = Maze(maze_input, interpret_as_file=False)
+
+    assert "cell_ids" not in maze.__dict__
+    assert maze.num_cells == 6
+    assert maze.cell_at(1, 0) == maze.cell_ids[maze.grid_index(1, 0)]
+    assert "neighbor_ids" in maze.__dict__
+
+def test_maze_uneven_rows():
+    with pytest.raises(ValueError):
+        Maze("...\n..\n", interpret_as_file=False)
+
+def test_maze_unknown_character():
+    with pytest.raises(ValueError):
+        Maze("...\n.x.\n", interpret_as_file=False)
@@ -0,0 +1,48 @@
+import io
+
+from Maze import Maze, robotchar, goalchar
+from MazeRenderer import MazeRenderer, CLEAR_SCREEN
+
+maze_input = """
+##.#
+#...
+#.#.
+\\robot 1 0
+"""
+
+def test_maze_str():
+    maze = Maze(maze_input, interpret_as_file=False)
+    assert str(maze) == "##.#\n#...\n#A#.\n"
+    assert maze.string_with_goals([(3, 0)]) == "##.#\n#...\n#A#a\n"
+
+def test_renderer_matches_maze_strings():
+    maze = Maze("maze40.maz")
+    renderer = MazeRenderer(maze)
+
+    goals = [(2, 2), (5, 4), (6, 6)]
+    overlay = {location: robotchar(i) for (i, location) in enumerate(maze.robotloc)}
+    overlay.update({location: goalchar(i) for (i, location) in enumerate(goals)})
+    assert renderer.render(overlay) == maze.string_with_goals(goals)
+
+    # Going back to an empty overlay restores the map
+    maze.robotloc = []
+    assert renderer.render({}) == str(maze)
+
+def test_renderer_diff():
+    maze = Maze(maze_input, interpret_as_file=False)
+    renderer = MazeRenderer(maze)
+    renderer.render({(1, 0): "A"})
+
+    # Only the two cells that changed are redrawn, and the cursor ends up below the maze
+    assert renderer.diff({(1, 1): "A"}) == "\x1b[2;2HA\x1b[3;2H.\x1b[4;1H"
+    assert renderer.render() == "##.#\n#A..\n#.#.\n"
+    assert renderer.diff({(1, 1): "A"}) == "\x1b[4;1H"
+
+def test_renderer_animate():
+    maze = Maze(maze_input, interpret_as_file=False)
+    out = io.StringIO()
+    MazeRenderer(maze).animate([{(1, 0): "A"}, {(1, 1): "A"}], ["first", "second"], out=out)
+
+    frames = out.getvalue()
+    assert frames.startswith(CLEAR_SCREEN + "##.#\n#...\n#A#.\n")
+    assert "first" in frames and frames.endswith("second\n")
@@ -4,6 +4,9 @@ from Maze import Maze
 # from uninformed_search import bfs_search
 
 from astar_search import astar_search
+from SearchStats import SearchStats
+import copy
+import json
 
 # null heuristic, useful for testing astar search without heuristic (uniform cost search).
 def null_heuristic(state):
@@ -189,4 +192,69 @@ def test_mazedisconnected():
         as_file=False,
         animate=False)
 
-    assert len(result_manhattan.path) == 0
\ No newline at end of file
+    assert len(result_manhattan.path) == 0
+
+def test_maze2_stats():
+    maze = Maze(maze2_raw, interpret_as_file=False)
+    maze_problem = MazeworldProblem(maze, [(7, 0)])
+
+    stats = SearchStats()
+    result = astar_search(maze_problem, maze_problem.manhattan_heuristic, stats=stats)
+    assert result.stats is stats
+    assert result.cost == 12
+
+    assert stats.expanded == result.nodes_visited - 1
+    assert stats.generated >= stats.expanded
+    assert stats.duplicates > 0
+    assert stats.peak_frontier > 0 and stats.peak_frontier_bytes > 0
+    assert stats.peak_closed > 0 and stats.peak_closed_bytes > 0
+    assert stats.phase_times["heuristic"] > 0
+    assert stats.total_time >= stats.phase_times["successors"] + stats.phase_times["goal_test"]
+
+    exported = json.loads(stats.to_json())
+    assert exported["expanded"] == stats.expanded
+
+    # Without stats, nothing is recorded
+    assert astar_search(maze_problem, maze_problem.manhattan_heuristic).stats is None
+
+    # Instrumented problems can be copied
+    instrumented = copy.copy(SearchStats().instrument(maze_problem))
+    assert instrumented.start_state == maze_problem.start_state
+
+def test_true_distance_heuristic():
+    for (filename, goals) in [("maze40.maz", [(30, 0)]), ("maze41.maz", [(0, 20)]), ("maze50.maz", [(15, 0), (0, 10)])]:
+        maze_problem = MazeworldProblem(Maze(filename), goals)
+        result_manhattan = astar_search(maze_problem, maze_problem.manhattan_heuristic)
+        result_true = astar_search(maze_problem, maze_problem.true_distance_heuristic)
+
+        assert result_true.cost == result_manhattan.cost
+        assert result_true.nodes_visited < result_manhattan.nodes_visited
+
+        # The heuristic never overestimates the cost along the path
+        for (i, state) in enumerate(result_true.path):
+            remaining = sum(1 for j in range(i, len(result_true.path) - 1)
+                            if result_true.path[j].robot_positions != result_true.path[j + 1].robot_positions)
+            assert maze_problem.true_distance_heuristic(state) <= remaining
+
+def test_true_distance_heuristic_unreachable():
+    maze = Maze("""
+    ..##..
+    ..##..
+    \\robot 0 0
+    """, interpret_as_file=False)
+    maze_problem = MazeworldProblem(maze, [(5, 1)])
+    assert maze_problem.true_distance_heuristic(maze_problem.start_state) == float("inf")
+    assert len(astar_search(maze_problem, maze_problem.true_distance_heuristic).path) == 0
+
+def test_true_distance_heuristic_robot_in_wall():
+    maze = Maze("""
+    #..
+    \\robot 0 0
+    """, interpret_as_file=False)
+    maze_problem = MazeworldProblem(maze, [(1, 0)])
+    assert maze_problem.true_distance_heuristic(maze_problem.start_state) == float("inf")
+
+    # Once the robot is out of the wall, its distance is worked out again
+    for (_, successor) in maze_problem.get_successors(maze_problem.start_state):
+        expected = 0 if successor.robot_positions == ((1, 0),) else float("inf")
+        assert maze_problem.true_distance_heuristic(successor) == expected
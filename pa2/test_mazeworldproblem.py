@@ -1,5 +1,4 @@
-
-from MazeworldProblem import Maze, MazeworldProblem, MazeworldProblemState
+from MazeworldProblem import Maze, MazeworldProblem, MazeworldProblemState, MOVES
 
 
 def test_problemstate_makestatewithmove():
@@ -84,4 +83,82 @@ def test_mazeproblem_isgoal():
 
     assert not mazeproblem.is_goal(MazeworldProblemState( [(3, 2), (4, 1), (4, 1)], turn=0) )
     assert mazeproblem.is_goal(MazeworldProblemState( [(3, 1), (4, 1), (4, 2)], turn=2) )
-    
\ No newline at end of file
+    
+def test_problemstate_packed_key():
+    state = MazeworldProblemState([(3, 0), (0, 2), (1, 1)], 1)
+
+    # Moving updates the key to match a freshly packed state, including off the edge
+    for move in [(0, 1, 1), (1, 0, 1), (0, -1, 1), (-1, 0, 1), (0, -3, 1), (0, 0, 0)]:
+        (dx, dy, _) = move
+        next_state = state.make_state_with_move(move)
+        expected = MazeworldProblemState([(3, 0), (0 + dx, 2 + dy), (1, 1)], 2)
+
+        assert next_state == expected and next_state.key == expected.key
+        assert next_state.robot_positions == expected.robot_positions
+        assert next_state.robot_position(1) == (dx, 2 + dy)
+
+    # States with different numbers of robots are never equal
+    assert MazeworldProblemState([(0, 0)], 0) != MazeworldProblemState([(0, 0), (0, 0)], 0)
+
+def test_mazeproblem_islegal():
+    maze = Maze(complexMazeInput, interpret_as_file=False)
+    mazeproblem = MazeworldProblem(maze, [(3, 1), (4, 1), (4, 2)])
+
+    assert mazeproblem.is_legal(mazeproblem.start_state)
+    assert not mazeproblem.is_legal(MazeworldProblemState([(1, 0), (0, 0), (2, 1)], 0))
+    # The second and third robots collide
+    assert not mazeproblem.is_legal(MazeworldProblemState([(1, 0), (2, 1), (2, 1)], 0))
+
+def test_mazeproblem_successors_legal():
+    maze = Maze(complexMazeInput, interpret_as_file=False)
+    mazeproblem = MazeworldProblem(maze, [(3, 1), (3, 3), (1, 2)])
+
+    # Successors (checking only the robot that moved) are exactly the legal moves
+    states = [mazeproblem.start_state]
+    for _ in range(6):
+        next_states = []
+        for state in states:
+            successors = [successor for (_, successor) in mazeproblem.get_successors(state)]
+            expected = [state.make_state_with_move(move) for move in MOVES]
+            assert successors == [successor for successor in expected if mazeproblem.is_legal(successor)]
+            next_states.extend(successors)
+        states = next_states
+
+def test_mazeproblem_heuristic_updates():
+    maze = Maze(complexMazeInput, interpret_as_file=False)
+    mazeproblem = MazeworldProblem(maze, [(3, 1), (3, 3), (1, 2)])
+    mazeproblem.manhattan_heuristic(mazeproblem.start_state)
+    mazeproblem.true_distance_heuristic(mazeproblem.start_state)
+
+    # Successors' heuristics are updated from their parent's, and match recomputing them
+    fresh_problem = MazeworldProblem(maze, [(3, 1), (3, 3), (1, 2)])
+    states = [mazeproblem.start_state]
+    for _ in range(6):
+        next_states = []
+        for state in states:
+            for (_, successor) in mazeproblem.get_successors(state):
+                assert successor._cached_manhattan == fresh_problem.manhattan_heuristic(
+                    MazeworldProblemState(successor.robot_positions, successor.turn))
+                assert successor._cached_true_distance == fresh_problem.true_distance_heuristic(
+                    MazeworldProblemState(successor.robot_positions, successor.turn))
+                assert mazeproblem.manhattan_heuristic(successor) == successor._cached_manhattan
+                next_states.append(successor)
+        states = next_states
+
+    # Values cached by one problem aren't used by another with different goals
+    other_problem = MazeworldProblem(maze, [(1, 0), (1, 1), (2, 1)])
+    assert other_problem.manhattan_heuristic(states[0]) != mazeproblem.manhattan_heuristic(states[0])
+
+def test_mazeproblem_heuristics_follow_maze_changes():
+    maze = Maze("....\n.##.\n....", interpret_as_file=False)
+    mazeproblem = MazeworldProblem(maze, [(3, 0)], start_locations=[(0, 0)])
+    state = mazeproblem.start_state
+    assert mazeproblem.true_distance_heuristic(state) == 3
+    successors = [successor for (_, successor) in mazeproblem.get_successors(state)]
+
+    # Walling off the bottom row makes the robot go round the top
+    maze.set_floor(1, 0, False)
+    assert mazeproblem.true_distance_heuristic(state) == 7
+    assert mazeproblem.true_distance_heuristic(successors[0]) == 7
+    assert [successor for (_, successor) in mazeproblem.get_successors(state)] == \
+        [state, MazeworldProblemState([(0, 1)], 0)]
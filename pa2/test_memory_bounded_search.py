@@ -0,0 +1,101 @@
+from MazeworldProblem import MazeworldProblem
+from SensorlessProblem import SensorlessProblem
+from Maze import Maze
+from astar_search import astar_search
+from memory_bounded_search import idastar_search, smastar_search
+from test_mazeworld import maze2_raw, maze3_raw, maze4_raw
+from test_sensorless import maze1_input
+
+
+def mazeworld_problems():
+    for (maze_raw, goals) in [(maze2_raw, [(7, 0)]), (maze3_raw, [(3, 2), (1, 4)]), (maze4_raw, [(6, 0), (0, 0), (6, 3)])]:
+        yield MazeworldProblem(Maze(maze_raw, interpret_as_file=False), goals)
+
+def assert_valid_path(problem, result):
+    assert result.path[0] == problem.start_state
+    assert problem.is_goal(result.path[-1])
+    cost = 0
+    for (state, next_state) in zip(result.path, result.path[1:]):
+        cost += min(transition_cost for (transition_cost, successor) in problem.get_successors(state)
+                    if successor == next_state)
+    assert cost == result.cost
+
+def test_idastar():
+    for problem in mazeworld_problems():
+        result_astar = astar_search(problem, problem.true_distance_heuristic)
+        result = idastar_search(problem, problem.true_distance_heuristic)
+
+        assert result.cost == result_astar.cost
+        assert_valid_path(problem, result)
+        assert result.max_stored_states >= len(result.path) - 1
+
+def test_smastar():
+    for problem in mazeworld_problems():
+        result_astar = astar_search(problem, problem.true_distance_heuristic)
+
+        # Plenty of memory, and just enough to fit the solution with some room to spare
+        for max_nodes in (10000, 2 * len(result_astar.path) + 10):
+            result = smastar_search(problem, problem.true_distance_heuristic, max_nodes=max_nodes)
+
+            assert result.cost == result_astar.cost
+            assert_valid_path(problem, result)
+            assert result.max_stored_states <= max_nodes
+
+def test_idastar_transpositions():
+    # Two robots in an open maze can reach the same state in many orders, which
+    # IDA* would search over and over again without its transposition table
+    problem = MazeworldProblem(Maze(maze3_raw, interpret_as_file=False), [(3, 2), (1, 4)])
+    result_astar = astar_search(problem, problem.manhattan_heuristic)
+
+    for max_table_size in (100000, 300):
+        result = idastar_search(problem, problem.manhattan_heuristic, max_table_size=max_table_size)
+        assert result.cost == result_astar.cost
+        assert_valid_path(problem, result)
+        assert result.max_stored_states <= len(result.path) + max_table_size
+
+def test_smastar_tight_cap():
+    # Two robots swapping places, which takes a 22 step solution (with some waiting)
+    maze = Maze("""
+    ......
+    #...#.
+    #..#..
+    ..##.#
+    ###...
+    ......
+    \\robot 4 1
+    \\robot 0 5
+    """, interpret_as_file=False)
+    problem = MazeworldProblem(maze, [(0, 5), (4, 1)])
+    result_astar = astar_search(problem, problem.true_distance_heuristic)
+
+    # Room for only a couple of copies of the solution path, so that SMA* keeps
+    # forgetting and regenerating nodes
+    for max_nodes in (50, 75):
+        result = smastar_search(problem, problem.true_distance_heuristic, max_nodes=max_nodes)
+        assert result.cost == result_astar.cost
+        assert_valid_path(problem, result)
+        assert result.max_stored_states <= max_nodes
+
+def test_memory_bounded_sensorless():
+    problem = SensorlessProblem(Maze(maze1_input, interpret_as_file=False), 0, 0)
+    result_astar = astar_search(problem, problem.heuristic_true_composite)
+
+    result_ida = idastar_search(problem, problem.heuristic_true_composite)
+    assert result_ida.cost == result_astar.cost
+    assert_valid_path(problem, result_ida)
+
+    result_sma = smastar_search(problem, problem.heuristic_true_composite, max_nodes=200)
+    assert result_sma.cost == result_astar.cost
+    assert result_sma.max_stored_states <= 200
+    assert_valid_path(problem, result_sma)
+
+def test_memory_bounded_no_solution():
+    maze = Maze("""
+    .....
+    \\robot 1 0
+    \\robot 3 0
+    """, interpret_as_file=False)
+    problem = MazeworldProblem(maze, [(4, 0), (0, 0)])
+
+    assert len(idastar_search(problem, problem.manhattan_heuristic).path) == 0
+    assert len(smastar_search(problem, problem.manhattan_heuristic, max_nodes=50).path) == 0
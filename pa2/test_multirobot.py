@@ -0,0 +1,104 @@
+from MazeworldProblem import MazeworldProblem
+from Maze import Maze
+from astar_search import astar_search
+from multirobot_search import multirobot_search
+from test_mazeworld import maze3_raw, maze4_raw
+import random
+
+
+def assert_valid_path(problem, path):
+    # Same rules as MazeworldProblem: one robot moves per turn, into an empty floor cell
+    assert path[0] == problem.start_state
+    assert problem.is_goal(path[-1])
+
+    for (state, next_state) in zip(path, path[1:]):
+        successors = [successor for (_, successor) in problem.get_successors(state)]
+        assert next_state in successors
+
+def test_multirobot_matches_astar():
+    for (maze_raw, goals) in [(maze3_raw, [(3, 2), (1, 4)]), (maze4_raw, [(6, 0), (0, 0), (6, 3)])]:
+        problem = MazeworldProblem(Maze(maze_raw, interpret_as_file=False), goals)
+
+        result_astar = astar_search(problem, problem.true_distance_heuristic)
+        result = multirobot_search(problem)
+
+        assert_valid_path(problem, result.path)
+        assert result.cost == result_astar.cost
+
+def test_multirobot_no_solution():
+    corridor = Maze("""
+    .....
+    \\robot 1 0
+    \\robot 3 0
+    """, interpret_as_file=False)
+    result = multirobot_search(MazeworldProblem(corridor, [(4, 0), (0, 0)]))
+    assert len(result.path) == 0
+
+    disconnected = Maze("""
+    ..##..
+    ..##..
+    \\robot 0 0
+    \\robot 5 0
+    """, interpret_as_file=False)
+    result = multirobot_search(MazeworldProblem(disconnected, [(4, 1), (5, 1)]))
+    assert len(result.path) == 0
+
+open_maze_raw = """
+................
+....#......#....
+....#......#....
+....####..###...
+................
+.......##.......
+................
+...###..####....
+....#......#....
+....#......#....
+................
+"""
+
+def test_multirobot_ten_robots():
+    maze = Maze(open_maze_raw, interpret_as_file=False)
+    cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+
+    for seed in range(3):
+        rng = random.Random(seed)
+        starts = rng.sample(cells, 10)
+        goals = rng.sample(cells, 10)
+        problem = MazeworldProblem(maze, goals, start_locations=starts)
+        result = multirobot_search(problem)
+
+        assert_valid_path(problem, result.path)
+        assert result.cost == sum(1 for (state, next_state) in zip(result.path, result.path[1:])
+                                  if state.robot_positions != next_state.robot_positions)
+
+        # Most robots never have to be planned together
+        assert sum(result.group_sizes) == 10
+        assert max(result.group_sizes) <= 2
+
+def test_multirobot_crowded_maze():
+    # Ten robots in maze50.maz's corridors get in each other's way too much to plan
+    # in groups of any size. Planned in pairs, most problems are solved (suboptimally),
+    # and the rest give up with no path.
+    maze = Maze("maze50.maz")
+    cells = [(x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y)]
+
+    solved = 0
+    for seed in range(8):
+        rng = random.Random(seed)
+        starts = rng.sample(cells, 10)
+        goals = rng.sample(cells, 10)
+        problem = MazeworldProblem(maze, goals, start_locations=starts)
+        result = multirobot_search(problem, max_group_size=2)
+
+        if len(result.path) == 0:
+            continue
+        solved += 1
+
+        assert_valid_path(problem, result.path)
+        assert result.cost == sum(1 for (state, next_state) in zip(result.path, result.path[1:])
+                                  if state.robot_positions != next_state.robot_positions)
+        assert sum(result.group_sizes) == 10
+        assert max(result.group_sizes) <= 2
+
+    assert solved > 0
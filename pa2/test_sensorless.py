@@ -2,6 +2,7 @@ from functools import partial
 from SensorlessProblem import Maze, SensorlessProblem, HEURISTIC_NONADMISSIBLE_CONVERGANCE_FACTOR, HEURISTIC_NONADMISSIBLE_WEIGHT
 from astar_search import astar_search
 import functools
+import pytest
 
 
 def run_astar(maze_input, goal_x, goal_y, animate=False):
@@ -52,6 +53,75 @@ def test_maze1():
     assert result_weighted.nodes_visited < result_composite.nodes_visited
 
 
+def reference_successor(maze, locations, dx, dy):
+    # Move every location on its own, staying put when there's a wall
+    return set((x + dx, y + dy) if maze.is_floor(x + dx, y + dy) else (x, y) for (x, y) in locations)
+
+def test_bitset_successors():
+    maze = Maze(maze1_input, interpret_as_file=False)
+    problem = SensorlessProblem(maze, 0, 0)
+
+    assert set(problem.state_locations(problem.start_state)) == \
+        set((x, y) for x in range(maze.width) for y in range(maze.height) if maze.is_floor(x, y))
+
+    # Walk a few levels deep, checking each successor against moving every location separately
+    states = [problem.start_state]
+    for _ in range(3):
+        next_states = []
+        for state in states:
+            locations = problem.state_locations(state)
+            successors = problem.get_successors(state)
+            assert len(successors) == 4
+
+            for ((dx, dy), (cost, successor)) in zip(SensorlessProblem.moves, successors):
+                assert cost == 1
+                assert set(problem.state_locations(successor)) == reference_successor(maze, locations, dx, dy)
+                next_states.append(successor)
+        states = next_states
+
+def test_bitset_goal_and_heuristics():
+    maze = Maze(maze1_input, interpret_as_file=False)
+    problem = SensorlessProblem(maze, 0, 0)
+
+    assert problem.is_goal(problem.state_from_locations([(0, 0)]))
+    assert not problem.is_goal(problem.state_from_locations([(0, 0), (1, 0)]))
+
+    state = problem.state_from_locations([(2, 1), (4, 3), (6, 0)])
+    assert problem.heuristic_goal_distance(state) == 6 + 3
+    # Measured from the reference location (2, 1)
+    assert problem.heuristic_convergance_distance(state) == 4 + 2
+
+def test_true_distance_heuristics():
+    maze = Maze(maze1_input, interpret_as_file=False)
+    problem = SensorlessProblem(maze, 0, 0)
+
+    # (6, 0) has to go round the walls through (6, 2) to get to (0, 0)
+    state = problem.state_from_locations([(6, 0), (0, 0)])
+    assert problem.heuristic_goal_distance(state) == 6
+    assert problem.heuristic_true_goal_distance(state) == 10
+    assert problem.heuristic_convergance_distance(state) == 6
+    assert problem.heuristic_true_convergance_distance(state) == 5
+
+    for state in [problem.start_state, state]:
+        assert problem.heuristic_true_composite(state) >= problem.heuristic_composite(state)
+
+def test_goal_on_wall():
+    maze = Maze(maze1_input, interpret_as_file=False)
+    for goal in [(0, 6), (7, 0), (-1, 0)]:
+        with pytest.raises(ValueError):
+            SensorlessProblem(maze, *goal)
+
+def test_true_composite_heuristic():
+    maze = Maze(maze1_input, interpret_as_file=False)
+    problem = SensorlessProblem(maze, 0, 0)
+
+    result_composite = astar_search(problem, problem.heuristic_composite)
+    result_true = astar_search(problem, problem.heuristic_true_composite)
+
+    assert result_true.cost == result_composite.cost
+    assert result_true.nodes_visited < result_composite.nodes_visited
+
+
 maze2_input = """
     ##########
     #........#